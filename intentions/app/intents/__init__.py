@@ -6,18 +6,28 @@ Other domains should only import from this module, not from internal modules.
 """
 
 from .router import router
-from .schemas import IntentCreateRequest, IntentResponse, IntentUpdateDescriptionRequest, IntentUpdateNameRequest
-from .service import create_intent, get_intent, update_intent_description, update_intent_name
+from .schemas import (
+    IntentBatchGetRequest,
+    IntentBatchGetResponse,
+    IntentCreateRequest,
+    IntentResponse,
+    IntentUpdateDescriptionRequest,
+    IntentUpdateNameRequest,
+)
+from .service import create_intent, get_intent, get_intents, update_intent_description, update_intent_name
 
 __all__ = [
     # Service functions (public API)
     "create_intent",
     "get_intent",
+    "get_intents",
     "update_intent_name",
     "update_intent_description",
     # Schemas (API contract)
     "IntentCreateRequest",
     "IntentResponse",
+    "IntentBatchGetRequest",
+    "IntentBatchGetResponse",
     "IntentUpdateNameRequest",
     "IntentUpdateDescriptionRequest",
     # Router
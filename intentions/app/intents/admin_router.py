@@ -0,0 +1,73 @@
+"""
+Admin HTTP router for intents domain (V2).
+
+Bulk NDJSON export/import of intents with full composition.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.shared import ErrorResponse
+from app.shared.database import get_read_session_factory
+from app.shared.dependencies import SessionReleasingRoute, get_intent_repository
+
+from . import transfer
+from .repository import IntentRepository
+from .schemas import IntentImportResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+router = APIRouter(
+    prefix="/admin/intents",
+    tags=["admin"],
+    route_class=SessionReleasingRoute,
+)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    operation_id="exportIntents",
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "One IntentExportRecord per line"},
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+    },
+)
+async def export_intents(
+    batch_size: int = Query(transfer.DEFAULT_BATCH_SIZE, ge=1, le=transfer.MAX_BATCH_SIZE),
+    session_factory: async_sessionmaker = Depends(get_read_session_factory),
+):
+    """Stream all intents with full composition (including examples, prompts and outputs) as NDJSON."""
+
+    async def body():
+        # The body is produced after request dependencies have closed, so the
+        # export reads through a session of its own.
+        async with session_factory() as session:
+            async for line in transfer.export_intents_ndjson(IntentRepository(session), batch_size):
+                yield line
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post(
+    "/import",
+    response_model=IntentImportResponse,
+    operation_id="importIntents",
+    openapi_extra={"requestBody": {"content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}}, "required": True}},
+    responses={
+        400: {"model": ErrorResponse, "description": "Invalid NDJSON record"},
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+    },
+)
+async def import_intents(
+    request: Request,
+    batch_size: int = Query(transfer.DEFAULT_BATCH_SIZE, ge=1, le=transfer.MAX_BATCH_SIZE),
+    repository: IntentRepository = Depends(get_intent_repository),
+):
+    """Import NDJSON intent records (as produced by export). The whole import commits or rolls back together."""
+    try:
+        summary = await transfer.import_intents(transfer.iter_ndjson_lines(request.stream()), repository, batch_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return IntentImportResponse(imported=summary.imported, batches=summary.batches)
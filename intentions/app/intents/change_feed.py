@@ -0,0 +1,126 @@
+"""
+Change feed for intents domain (V2): long-poll and SSE delivery.
+
+Every intent write operation appends one row to intent_changes (see
+IntentRepository); its id is the feed cursor, and change ids become visible
+in id order (on PostgreSQL change rows are inserted at commit, one
+transaction at a time), so a reader never moves past a change that commits
+later. Readers that are waiting for a change are woken through a
+process-local notifier when a session that wrote change rows commits.
+Writes in other worker processes do not reach this notifier, so waiting
+readers also re-query every CHANGE_FEED_RECHECK_SECONDS.
+
+Each query runs in a short session of its own, so a waiting reader does not
+hold a pooled connection.
+"""
+
+import asyncio
+import os
+from typing import AsyncIterator, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.shared.metrics import registry
+
+from . import service
+from .models import IntentChange
+from .repository import CHANGED_INTENTS, IntentRepository
+
+# Fallback for changes committed by other worker processes
+CHANGE_FEED_RECHECK_SECONDS = float(os.getenv("CHANGE_FEED_RECHECK_SECONDS", "10"))
+CHANGE_FEED_MAX_WAIT_SECONDS = float(os.getenv("CHANGE_FEED_MAX_WAIT_SECONDS", "30"))
+CHANGE_FEED_HEARTBEAT_SECONDS = float(os.getenv("CHANGE_FEED_HEARTBEAT_SECONDS", "15"))
+DEFAULT_CHANGES_LIMIT = 100
+MAX_CHANGES_LIMIT = 1000
+
+
+class ChangeNotifier:
+    """Wakes every change-feed reader of this process that is waiting for a change."""
+
+    def __init__(self) -> None:
+        self._waiters: Set[asyncio.Future] = set()
+
+    def register(self) -> asyncio.Future:
+        """Register before querying, so a change during the query is not missed."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        return waiter
+
+    def discard(self, waiter: asyncio.Future) -> None:
+        self._waiters.discard(waiter)
+
+    def notify(self) -> None:
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+
+change_notifier = ChangeNotifier()
+registry.callback(
+    "change_feed_waiting_readers", "Long-poll and stream readers waiting for a change", lambda: len(change_notifier)
+)
+
+
+def _notify_on_commit(session: Session) -> None:
+    if session.info.get(CHANGED_INTENTS):
+        change_notifier.notify()
+
+
+def subscribe_change_notifications() -> None:
+    """Wake waiting change-feed readers when a session that wrote intent changes commits (idempotent)."""
+    if not event.contains(Session, "after_commit", _notify_on_commit):
+        event.listen(Session, "after_commit", _notify_on_commit)
+
+
+async def _query(session_factory: async_sessionmaker, cursor: Optional[int], limit: int) -> Tuple[List[IntentChange], int]:
+    async with session_factory() as session:
+        repository = IntentRepository(session)
+        if cursor is None:
+            return [], await service.get_latest_change_cursor(repository)
+        changes = await service.list_changes(cursor, limit, repository)
+    return changes, changes[-1].cursor if changes else cursor
+
+
+async def wait_for_changes(
+    session_factory: async_sessionmaker,
+    cursor: Optional[int],
+    limit: int = DEFAULT_CHANGES_LIMIT,
+    timeout: float = 0,
+) -> Tuple[List[IntentChange], int]:
+    """
+    Return intents changed after the cursor, waiting up to timeout seconds for the first change.
+
+    A cursor of None starts at the latest change, so only later changes are returned.
+    Returns (changes, cursor to resume from); changes is empty when the timeout expired.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    if cursor is None:
+        _, cursor = await _query(session_factory, None, limit)
+    while True:
+        waiter = change_notifier.register()
+        try:
+            changes, next_cursor = await _query(session_factory, cursor, limit)
+            remaining = deadline - loop.time()
+            if changes or remaining <= 0:
+                return changes, next_cursor
+            await asyncio.wait({waiter}, timeout=min(remaining, CHANGE_FEED_RECHECK_SECONDS))
+        finally:
+            change_notifier.discard(waiter)
+
+
+async def stream_changes(
+    session_factory: async_sessionmaker,
+    cursor: Optional[int],
+    limit: int = DEFAULT_CHANGES_LIMIT,
+) -> AsyncIterator[List[IntentChange]]:
+    """Yield batches of changes as they happen; an empty batch means nothing changed for a heartbeat interval."""
+    while True:
+        changes, cursor = await wait_for_changes(session_factory, cursor, limit, CHANGE_FEED_HEARTBEAT_SECONDS)
+        yield changes
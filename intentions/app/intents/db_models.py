@@ -32,6 +32,8 @@ class IntentDBModel(Base):
     description = Column(Text, nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Incremented on every write to the intent or its child entities (see IntentRepository._touch_intent)
+    revision = Column(Integer, nullable=False, default=1, server_default="1")
 
     aspects = relationship("AspectDBModel", back_populates="intent", cascade="all, delete-orphan")
     inputs = relationship("InputDBModel", back_populates="intent", cascade="all, delete-orphan")
@@ -209,3 +211,16 @@ class InsightDBModel(Base):
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     intent = relationship("IntentDBModel", back_populates="insights")
+
+
+class IntentChangeDBModel(Base):
+    """Change log row: one per write to an intent, read by the change feed."""
+
+    __tablename__ = "intent_changes"
+
+    # Global, monotonically increasing change cursor
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # No foreign key: "deleted" rows outlive the intent
+    intent_id = Column(Integer, nullable=False, index=True)
+    change_type = Column(String(20), nullable=False)  # created, updated, deleted
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
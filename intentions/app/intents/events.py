@@ -106,3 +106,17 @@ class InsightCreatedEvent(DomainEvent):
         self.timestamp = datetime.utcnow()
         self.intent_id = intent_id
         self.insight_id = insight_id
+
+
+@dataclass
+class IntentsImportedEvent(DomainEvent):
+    """Event published when an NDJSON import has inserted intents."""
+
+    imported_count: int
+    batches: int
+
+    def __init__(self, imported_count: int, batches: int):
+        self.event_type = "intents.imported"
+        self.timestamp = datetime.utcnow()
+        self.imported_count = imported_count
+        self.batches = batches
@@ -6,14 +6,18 @@ clients like mcptools get the exact transport behavior they expect.
 """
 
 import os
+from functools import lru_cache
 
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 from mcp.server.transport_security import TransportSecuritySettings
 from starlette.requests import Request
 from starlette.responses import Response
-from starlette.types import Receive, Scope, Send
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.shared.metrics import registry
 
 from .mcp_server import server
+from .mcp_sessions import MCP_STATEFUL_SESSIONS, StatefulSessionManager
 
 # Security: allow all origins in development, restrict in production
 _MCP_ALLOWED_ORIGINS = os.getenv("MCP_ALLOWED_ORIGINS", "*")
@@ -25,74 +29,111 @@ else:
         allowed_origins=[o.strip() for o in _MCP_ALLOWED_ORIGINS.split(",") if o.strip()],
     )
 
+
+def create_session_manager(stateful: bool = MCP_STATEFUL_SESSIONS) -> StreamableHTTPSessionManager:
+    """Build the SDK session manager for the configured mode (stateless by default)."""
+    if stateful:
+        return StatefulSessionManager(app=server, json_response=True, security_settings=_SECURITY_SETTINGS)
+    return StreamableHTTPSessionManager(
+        app=server,
+        json_response=True,
+        stateless=True,
+        security_settings=_SECURITY_SETTINGS,
+    )
+
+
 # One session manager per process; run() is called from app lifespan
-mcp_session_manager = StreamableHTTPSessionManager(
-    app=server,
-    json_response=True,
-    stateless=True,
-    security_settings=_SECURITY_SETTINGS,
+mcp_session_manager = create_session_manager()
+
+registry.callback(
+    "mcp_http_sessions",
+    "Open stateful MCP Streamable HTTP sessions (0 in stateless mode)",
+    lambda: getattr(mcp_session_manager, "session_count", 0),
 )
 
 
-def _normalize_accept_header(scope: Scope) -> Scope:
-    if scope["type"] != "http":
-        return scope
+_MCP_ACCEPT = b"application/json, text/event-stream"
 
-    headers = list(scope.get("headers", []))
-    accept_index = None
-    accept_value = None
+
+@lru_cache(maxsize=256)
+def _normalized_accept(value: bytes) -> bytes | None:
+    """
+    Return the Accept value to hand to the SDK, or None to keep the client's.
+
+    Clients that accept only one of JSON/SSE, or a wildcard, get both so the
+    SDK does not answer 406. Header bytes are ASCII, so lowercasing needs no
+    decode. Cached per distinct Accept value.
+    """
+    lowered = value.lower()
+    has_json = b"application/json" in lowered
+    has_sse = b"text/event-stream" in lowered
+    has_wildcard = b"*/*" in lowered or b"application/*" in lowered
+    if not (has_json and has_sse) and (has_wildcard or has_json or has_sse):
+        return _MCP_ACCEPT
+    return None
+
+
+def _normalize_accept_header(scope: Scope) -> Scope:
+    """Return scope with a normalized Accept header; the original scope when nothing changes."""
+    headers = scope.get("headers", [])
     for i, (key, value) in enumerate(headers):
-        if key.lower() == b"accept":
-            accept_index = i
-            accept_value = value.decode(errors="ignore").lower()
+        # ASGI header names are lowercase
+        if key == b"accept":
+            normalized = _normalized_accept(value)
+            if normalized is None:
+                return scope
+            headers = list(headers)
+            headers[i] = (b"accept", normalized)
             break
-
-    if accept_value is None:
-        headers.append((b"accept", b"application/json, text/event-stream"))
     else:
-        has_json = "application/json" in accept_value
-        has_sse = "text/event-stream" in accept_value
-        has_wildcard = "*/*" in accept_value or "application/*" in accept_value
-        if not (has_json and has_sse) and (has_wildcard or has_json or has_sse):
-            headers[accept_index] = (b"accept", b"application/json, text/event-stream")
+        headers = [*headers, (b"accept", _MCP_ACCEPT)]
+    return {**scope, "headers": headers}
+
+
+class AcceptHeaderMiddleware:
+    """ASGI middleware that normalizes the Accept header for the SDK transport."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            scope = _normalize_accept_header(scope)
+        await self.app(scope, receive, send)
+
+
+async def _handle_sdk_request(scope: Scope, receive: Receive, send: Send) -> None:
+    await mcp_session_manager.handle_request(scope, receive, send)
+
 
-    new_scope = dict(scope)
-    new_scope["headers"] = headers
-    return new_scope
+mcp_sdk_app = AcceptHeaderMiddleware(_handle_sdk_request)
 
 
 async def mcp_sdk_asgi_app(scope: Scope, receive: Receive, send: Send) -> None:
     """ASGI app that forwards /mcp requests to the SDK's Streamable HTTP handler."""
     if scope["type"] != "http":
-        from starlette.responses import Response
-
         response = Response(status_code=404)
         await response(scope, receive, send)
         return
-    await mcp_session_manager.handle_request(_normalize_accept_header(scope), receive, send)
+    await mcp_sdk_app(scope, receive, send)
+
+
+class _SdkPassthroughResponse(Response):
+    """
+    Response that lets the SDK write its ASGI messages straight to the client.
+
+    Nothing is buffered here, so large tool results are not copied a second
+    time and SSE-mode responses stream as the SDK produces them.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await mcp_sdk_app(scope, receive, send)
 
 
 async def mcp_sdk_request_handler(request: Request) -> Response:
     """
     FastAPI-compatible handler for POST /mcp to avoid redirect slashes.
 
-    This adapts the ASGI handler to a Request/Response interface.
+    Returns a response whose ASGI call is delegated to the SDK handler.
     """
-    response_status: int | None = None
-    response_headers: list[tuple[bytes, bytes]] = []
-    body_chunks: list[bytes] = []
-
-    async def _send(message: dict) -> None:
-        nonlocal response_status, response_headers
-        if message["type"] == "http.response.start":
-            response_status = message["status"]
-            response_headers = message.get("headers", [])
-        elif message["type"] == "http.response.body":
-            body_chunks.append(message.get("body", b""))
-
-    scope = _normalize_accept_header(request.scope)
-    await mcp_session_manager.handle_request(scope, request.receive, _send)
-
-    status = response_status or 500
-    headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in response_headers}
-    return Response(content=b"".join(body_chunks), status_code=status, headers=headers)
+    return _SdkPassthroughResponse()
@@ -5,41 +5,70 @@ Exposes intents operations as MCP tools using the service layer as the port.
 Intent responses omit examples per plan.
 """
 
+import functools
 import inspect
 import json
-from typing import Any
+import os
+import time
+from typing import Any, Awaitable, Callable
 
 import mcp.types as types
 from mcp.server.lowlevel import Server
+from mcp.server.streamable_http import MCP_SESSION_ID_HEADER
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.shared.database import get_session_factory
 from app.shared.logging_config import logger
+from app.shared.metrics import METRICS_ENABLED, registry
+from app.shared.tracing import tracer
 
 from . import service
+from .mcp_sessions import SessionIntentCache, get_session_cache
 from .repository import IntentRepository
 from .schemas import (
-    AspectResponse,
-    AssumptionResponse,
-    ChoiceResponse,
-    InputResponse,
     InsightCreateRequest,
-    InsightResponse,
     IntentArticulationUpdateRequest,
+    IntentBatchGetRequest,
     IntentCreateRequest,
-    IntentResponseForMCP,
     IntentUpdateDescriptionRequest,
     IntentUpdateNameRequest,
     OutputCreateRequest,
-    PitfallResponse,
     PromptCreateRequest,
-    PromptResponse,
-    QualityResponse,
 )
+from .serialization import intent_to_mcp_dict
+
+# Tool results are compact JSON by default; set MCP_JSON_INDENT (e.g. 2) for human-readable output
+MCP_JSON_INDENT = int(os.environ["MCP_JSON_INDENT"]) if os.getenv("MCP_JSON_INDENT") else None
 
 # Create MCP server instance
 server = Server("intents-mcp-server")
 
+TOOL_NAMES = frozenset(
+    {
+        "create_intent",
+        "get_intent",
+        "get_intents",
+        "list_intents",
+        "delete_intent",
+        "update_intent_name",
+        "update_intent_description",
+        "update_intent_articulation",
+        "add_prompt",
+        "add_output",
+        "add_insight",
+    }
+)
+
+mcp_tool_calls = registry.counter("mcp_tool_calls_total", "MCP tool calls by tool and outcome", ("tool", "outcome"))
+mcp_tool_duration = registry.histogram("mcp_tool_duration_seconds", "MCP tool call latency", ("tool",))
+
+
+def _to_json(value: Any) -> str:
+    """Serialize a tool result, indented only when MCP_JSON_INDENT is set."""
+    if MCP_JSON_INDENT is None:
+        return json.dumps(value, separators=(",", ":"))
+    return json.dumps(value, indent=MCP_JSON_INDENT)
+
 
 async def _get_repository() -> tuple[IntentRepository, AsyncSession]:
     """Create a repository instance with a database session."""
@@ -49,6 +78,16 @@ async def _get_repository() -> tuple[IntentRepository, AsyncSession]:
     return repository, session
 
 
+def _session_cache() -> SessionIntentCache | None:
+    """Intent cache of the calling MCP session (stateful mode only)."""
+    try:
+        request = server.request_context.request
+    except LookupError:
+        return None
+    session_id = request.headers.get(MCP_SESSION_ID_HEADER) if request is not None else None
+    return get_session_cache(session_id)
+
+
 def _pydantic_to_json_schema(pydantic_model: type) -> dict[str, Any]:
     """Convert a Pydantic model to JSON Schema."""
     return pydantic_model.model_json_schema(mode="serialization")  # type: ignore[no-any-return,attr-defined]
@@ -60,29 +99,15 @@ def _get_function_docstring(func) -> str:
 
 
 def _intent_to_dict_for_mcp(intent) -> dict[str, Any]:
-    """Convert domain model to IntentResponseForMCP (no examples) and dump to dict for MCP."""
-    response = IntentResponseForMCP(
-        id=intent.id,
-        name=intent.name,
-        description=intent.description,
-        created_at=intent.created_at,
-        updated_at=intent.updated_at,
-        aspects=[AspectResponse(id=a.id, name=a.name, description=a.description) for a in intent.aspects],
-        inputs=[InputResponse(id=i.id, name=i.name, description=i.description) for i in intent.inputs],
-        choices=[ChoiceResponse(id=c.id, name=c.name, description=c.description) for c in intent.choices],
-        pitfalls=[PitfallResponse(id=p.id, description=p.description) for p in intent.pitfalls],
-        assumptions=[AssumptionResponse(id=a.id, description=a.description) for a in intent.assumptions],
-        qualities=[QualityResponse(id=q.id, criterion=q.criterion, priority=q.priority) for q in intent.qualities],
-        prompts=[PromptResponse(id=p.id, version=p.version, content=p.content) for p in intent.prompts],
-        insights=[InsightResponse(id=i.id, content=i.content, status=i.status) for i in intent.insights],
-    )
-    return response.model_dump(mode="json")
+    """Convert domain model to the IntentResponseForMCP shape (no examples) as a JSON-ready dict."""
+    return intent_to_mcp_dict(intent)
 
 
 @server.list_tools()
 async def list_tools() -> list[types.Tool]:
     """List available MCP tools for intents operations (V2). Intent as composition; no separate articulation-entity tools."""
     create_intent_schema = _pydantic_to_json_schema(IntentCreateRequest)
+    batch_get_schema = _pydantic_to_json_schema(IntentBatchGetRequest)
     update_name_schema = _pydantic_to_json_schema(IntentUpdateNameRequest)
     update_description_schema = _pydantic_to_json_schema(IntentUpdateDescriptionRequest)
     articulation_schema = _pydantic_to_json_schema(IntentArticulationUpdateRequest)
@@ -101,10 +126,27 @@ async def list_tools() -> list[types.Tool]:
             description="Get an intent by ID. Returns full composition (aspects, inputs, choices, pitfalls, assumptions, qualities, prompts, insights). Examples omitted.",
             inputSchema={
                 "type": "object",
-                "properties": {"intent_id": {"type": "integer", "description": "The intent ID"}},
+                "properties": {
+                    "intent_id": {"type": "integer", "description": "The intent ID"},
+                    "if_revision": {
+                        "type": "integer",
+                        "description": (
+                            "Revision from a previous read; if unchanged, returns "
+                            "{intent_id, revision, not_modified: true} instead of the intent"
+                        ),
+                    },
+                },
                 "required": ["intent_id"],
             },
         ),
+        types.Tool(
+            name="get_intents",
+            description=(
+                "Get several intents by ID in one call. Returns a list in request order of {intent_id, found, intent}; "
+                "intent is null when not found. Examples omitted."
+            ),
+            inputSchema=batch_get_schema,
+        ),
         types.Tool(
             name="list_intents",
             description="List all intents with full composition. Examples omitted.",
@@ -153,6 +195,8 @@ async def list_tools() -> list[types.Tool]:
                     **articulation_schema["properties"],
                 },
                 "required": ["intent_id"],
+                # The entity items are $refs into the request model's definitions
+                "$defs": articulation_schema["$defs"],
             },
         ),
         types.Tool(
@@ -194,13 +238,86 @@ async def list_tools() -> list[types.Tool]:
     ]
 
 
+def _observe_tool_calls(func: Callable[..., Awaitable[list[types.TextContent]]]):
+    """Count, time and trace tool calls; unknown tool names share one label value."""
+
+    @functools.wraps(func)
+    async def wrapper(name: str, arguments: dict[str, Any]) -> list[types.TextContent]:
+        tool = name if name in TOOL_NAMES else "unknown"
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with tracer.start_span(f"mcp.tool {tool}", attributes={"mcp.tool.name": tool}):
+                result = await func(name, arguments)
+            outcome = "ok"
+            return result
+        finally:
+            if METRICS_ENABLED:
+                mcp_tool_duration.observe(time.perf_counter() - started, (tool,))
+                mcp_tool_calls.inc((tool, outcome))
+
+    return wrapper
+
+
+async def _get_intent(arguments: dict[str, Any], repository: IntentRepository) -> list[types.TextContent]:
+    """get_intent: answer not_modified for an unchanged if_revision, else serve from the session cache or the database."""
+    intent_id = arguments.get("intent_id")
+    if intent_id is None:
+        raise ValueError("intent_id is required")
+    if_revision = arguments.get("if_revision")
+    if if_revision is not None:
+        version = await service.get_intent_version(intent_id, repository)
+        if version is None:
+            return [types.TextContent(type="text", text="Intent not found")]
+        if version[0] == if_revision:
+            not_modified = {"intent_id": intent_id, "revision": if_revision, "not_modified": True}
+            return [types.TextContent(type="text", text=_to_json(not_modified))]
+    cache = _session_cache()
+    intent_dict = cache.get(intent_id) if cache is not None else None
+    if intent_dict is None:
+        invalidations = cache.invalidations if cache is not None else None
+        intent_result = await service.get_intent(intent_id, repository)
+        if intent_result is None:
+            return [types.TextContent(type="text", text="Intent not found")]
+        intent_dict = _intent_to_dict_for_mcp(intent_result)
+        if cache is not None:
+            cache.put(intent_id, intent_dict, invalidations)
+    return [types.TextContent(type="text", text=_to_json(intent_dict))]
+
+
+async def _get_intents(arguments: dict[str, Any], repository: IntentRepository) -> list[types.TextContent]:
+    """get_intents: intents from the session cache, the rest in one batched load, in request order."""
+    request = IntentBatchGetRequest(**arguments)
+    cache = _session_cache()
+    found: dict[int, dict[str, Any]] = {}
+    if cache is not None:
+        for intent_id in request.intent_ids:
+            cached = cache.get(intent_id)
+            if cached is not None:
+                found[intent_id] = cached
+    missing = [intent_id for intent_id in request.intent_ids if intent_id not in found]
+    if missing:
+        invalidations = cache.invalidations if cache is not None else None
+        for intent in await service.get_intents(missing, repository):
+            if intent is not None:
+                found[intent.id] = _intent_to_dict_for_mcp(intent)
+                if cache is not None:
+                    cache.put(intent.id, found[intent.id], invalidations)
+    batch = [
+        {"intent_id": intent_id, "found": intent_id in found, "intent": found.get(intent_id)}
+        for intent_id in request.intent_ids
+    ]
+    return [types.TextContent(type="text", text=_to_json(batch))]
+
+
 @server.call_tool()
+@_observe_tool_calls
 async def call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextContent]:
     """Handle MCP tool calls by routing to appropriate service functions (V2)."""
     repository, session = await _get_repository()
 
     def _intent_result(intent) -> list[types.TextContent]:
-        return [types.TextContent(type="text", text=json.dumps(_intent_to_dict_for_mcp(intent), indent=2))]
+        return [types.TextContent(type="text", text=_to_json(_intent_to_dict_for_mcp(intent)))]
 
     try:
         if name == "create_intent":
@@ -210,18 +327,15 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextCont
             return _intent_result(created_intent)
 
         elif name == "get_intent":
-            intent_id = arguments.get("intent_id")
-            if intent_id is None:
-                raise ValueError("intent_id is required")
-            intent_result = await service.get_intent(intent_id, repository)
-            if intent_result is None:
-                return [types.TextContent(type="text", text="Intent not found")]
-            return _intent_result(intent_result)
+            return await _get_intent(arguments, repository)
+
+        elif name == "get_intents":
+            return await _get_intents(arguments, repository)
 
         elif name == "list_intents":
             intents = await service.list_intents(repository)
             result_list = [_intent_to_dict_for_mcp(i) for i in intents]
-            return [types.TextContent(type="text", text=json.dumps(result_list, indent=2))]
+            return [types.TextContent(type="text", text=_to_json(result_list))]
 
         elif name == "delete_intent":
             intent_id = arguments.get("intent_id")
@@ -232,7 +346,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextCont
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps({"deleted": deleted, "intent_id": intent_id}),
+                    text=_to_json({"deleted": deleted, "intent_id": intent_id}),
                 )
             ]
 
@@ -294,14 +408,13 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextCont
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=_to_json(
                         {
                             "id": created.id,
                             "intent_id": intent_id,
                             "version": created.version,
                             "content": created.content,
-                        },
-                        indent=2,
+                        }
                     ),
                 )
             ]
@@ -319,10 +432,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextCont
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(
-                        {"id": created.id, "prompt_id": prompt_id, "content": created.content},
-                        indent=2,
-                    ),
+                    text=_to_json({"id": created.id, "prompt_id": prompt_id, "content": created.content}),
                 )
             ]
 
@@ -346,14 +456,13 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextCont
             return [
                 types.TextContent(
                     type="text",
-                    text=json.dumps(
+                    text=_to_json(
                         {
                             "id": created.id,
                             "intent_id": intent_id,
                             "content": created.content,
                             "status": created.status,
-                        },
-                        indent=2,
+                        }
                     ),
                 )
             ]
@@ -0,0 +1,201 @@
+"""
+Stateful MCP Streamable HTTP sessions with per-session caches.
+
+With MCP_STATEFUL_SESSIONS=true the SDK session manager keeps one server
+instance per Mcp-Session-Id instead of re-initializing on every request.
+StatefulSessionManager adds idle eviction on top of the SDK manager, and each
+session gets a small cache of the intents it has recently read. Cached
+intents are invalidated when a transaction that changed them commits in this
+process; entries also expire after a short TTL because writes committed by
+other worker processes are not seen.
+
+Sessions live in the process that created them, so stateful mode needs a
+single worker or a load balancer with affinity on the Mcp-Session-Id header.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from mcp.server.streamable_http import MCP_SESSION_ID_HEADER
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.types import Message, Receive, Scope, Send
+
+from app.shared.logging_config import logger
+
+from .repository import CHANGED_INTENTS
+
+MCP_STATEFUL_SESSIONS = os.getenv("MCP_STATEFUL_SESSIONS", "false").lower() == "true"
+MCP_SESSION_IDLE_TIMEOUT_SECONDS = float(os.getenv("MCP_SESSION_IDLE_TIMEOUT_SECONDS", "600"))
+MCP_SESSION_REAPER_INTERVAL_SECONDS = float(os.getenv("MCP_SESSION_REAPER_INTERVAL_SECONDS", "60"))
+MCP_SESSION_CACHE_SIZE = int(os.getenv("MCP_SESSION_CACHE_SIZE", "64"))
+MCP_SESSION_CACHE_TTL_SECONDS = float(os.getenv("MCP_SESSION_CACHE_TTL_SECONDS", "30"))
+
+_SESSION_HEADER = MCP_SESSION_ID_HEADER.encode()
+
+
+class SessionIntentCache:
+    """LRU cache of MCP intent dicts read by one session."""
+
+    def __init__(self, max_size: int = MCP_SESSION_CACHE_SIZE, ttl_seconds: float = MCP_SESSION_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[int, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, intent_id: int) -> dict[str, Any] | None:
+        entry = self._entries.get(intent_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            self._entries.pop(intent_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(intent_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, intent_id: int, intent: dict[str, Any], invalidations: int | None = None) -> None:
+        """
+        Cache an intent read from the database.
+
+        Pass the invalidations count taken before the read: when an intent was
+        invalidated meanwhile, the read may predate that commit and is not cached.
+        """
+        if invalidations is not None and invalidations != self.invalidations:
+            return
+        self._entries[intent_id] = (time.monotonic(), intent)
+        self._entries.move_to_end(intent_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, intent_id: int) -> None:
+        self._entries.pop(intent_id, None)
+        self.invalidations += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SessionCaches:
+    """Per-session intent caches for this process, keyed by Mcp-Session-Id."""
+
+    def __init__(self) -> None:
+        self._caches: dict[str, SessionIntentCache] = {}
+
+    def get(self, session_id: str) -> SessionIntentCache:
+        cache = self._caches.get(session_id)
+        if cache is None:
+            cache = self._caches[session_id] = SessionIntentCache()
+        return cache
+
+    def evict(self, session_id: str) -> None:
+        self._caches.pop(session_id, None)
+
+    def invalidate(self, intent_id: int) -> None:
+        for cache in self._caches.values():
+            cache.invalidate(intent_id)
+
+    def clear(self) -> None:
+        self._caches.clear()
+
+    def __len__(self) -> int:
+        return len(self._caches)
+
+
+session_caches = SessionCaches()
+
+
+def _invalidate_on_commit(session: Session) -> None:
+    for intent_id in session.info.get(CHANGED_INTENTS, ()):
+        session_caches.invalidate(intent_id)
+
+
+def subscribe_cache_invalidation() -> None:
+    """Invalidate cached intents when a session that changed them commits (idempotent)."""
+    if not event.contains(Session, "after_commit", _invalidate_on_commit):
+        event.listen(Session, "after_commit", _invalidate_on_commit)
+
+
+def get_session_cache(session_id: str | None) -> SessionIntentCache | None:
+    """Cache for the given MCP session; None outside stateful mode or without a session id."""
+    if not MCP_STATEFUL_SESSIONS or not session_id:
+        return None
+    return session_caches.get(session_id)
+
+
+class StatefulSessionManager(StreamableHTTPSessionManager):
+    """SDK session manager that tracks session activity and evicts idle sessions."""
+
+    def __init__(self, *args: Any, idle_timeout: float = MCP_SESSION_IDLE_TIMEOUT_SECONDS, **kwargs: Any):
+        super().__init__(*args, stateless=False, **kwargs)
+        self.idle_timeout = idle_timeout
+        self._last_activity: dict[str, float] = {}
+
+    async def handle_request(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async def send_tracking_session(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                for key, value in message.get("headers", []):
+                    if key.lower() == _SESSION_HEADER:
+                        self._last_activity[value.decode()] = time.monotonic()
+                        break
+            await send(message)
+
+        await super().handle_request(scope, receive, send_tracking_session)
+        if scope.get("method") == "DELETE":
+            for key, value in scope.get("headers", []):
+                if key == _SESSION_HEADER:
+                    self._forget(value.decode())
+                    break
+
+    def _forget(self, session_id: str) -> None:
+        self._server_instances.pop(session_id, None)
+        self._last_activity.pop(session_id, None)
+        session_caches.evict(session_id)
+
+    async def expire_idle_sessions(self, idle_timeout: float | None = None) -> int:
+        """Terminate sessions without a request within idle_timeout. Returns the count."""
+        timeout = self.idle_timeout if idle_timeout is None else idle_timeout
+        cutoff = time.monotonic() - timeout
+        expired = [session_id for session_id, last in self._last_activity.items() if last < cutoff]
+        for session_id in expired:
+            transport = self._server_instances.get(session_id)
+            self._forget(session_id)
+            if transport is not None:
+                await transport.terminate()
+        if expired:
+            logger.info("Expired idle MCP sessions", extra={"expired_count": len(expired)})
+        return len(expired)
+
+    @property
+    def session_count(self) -> int:
+        return len(self._server_instances)
+
+    async def _reap_idle_sessions(self) -> None:
+        while True:
+            await asyncio.sleep(MCP_SESSION_REAPER_INTERVAL_SECONDS)
+            try:
+                await self.expire_idle_sessions()
+            except Exception as e:
+                logger.error("MCP session reaper failed", extra={"error": str(e)})
+
+    @asynccontextmanager
+    async def run(self) -> AsyncIterator[None]:
+        subscribe_cache_invalidation()
+        async with super().run():
+            reaper = asyncio.create_task(self._reap_idle_sessions())
+            try:
+                yield
+            finally:
+                reaper.cancel()
+                try:
+                    await reaper
+                except asyncio.CancelledError:
+                    pass
+                for session_id in list(self._last_activity):
+                    self._forget(session_id)
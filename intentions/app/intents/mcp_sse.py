@@ -6,7 +6,8 @@ use the deprecated SSE workflow.
 import asyncio
 import json
 import os
-import uuid
+import tempfile
+import time
 from dataclasses import dataclass
 from typing import Any
 
@@ -14,8 +15,10 @@ from fastapi import APIRouter, HTTPException, Request, Response, status
 from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.shared.logging_config import logger
+from app.shared.metrics import registry
 
 from .mcp_http import _handle_mcp_request, _validate_origin
+from .mcp_sse_sessions import LocalSessionRouter, SessionRegistry, SseSession, UnixSocketSessionRouter
 
 MCP_ALLOWED_ORIGINS = os.getenv("MCP_ALLOWED_ORIGINS", "*")
 if MCP_ALLOWED_ORIGINS == "*":
@@ -23,53 +26,221 @@ if MCP_ALLOWED_ORIGINS == "*":
 else:
     ALLOWED_ORIGINS = [origin.strip() for origin in MCP_ALLOWED_ORIGINS.split(",") if origin.strip()]
 
+# Per-session queue bound and what to do when a client is not draining its stream:
+# reject (503 before the request is handled), drop_oldest or drop_newest.
+OVERFLOW_POLICIES = ("reject", "drop_oldest", "drop_newest")
+SSE_QUEUE_MAXSIZE = int(os.getenv("MCP_SSE_QUEUE_MAXSIZE", "100"))
+SSE_OVERFLOW_POLICY = os.getenv("MCP_SSE_OVERFLOW_POLICY", "reject").lower()
+if SSE_OVERFLOW_POLICY not in OVERFLOW_POLICIES:
+    raise ValueError(f"MCP_SSE_OVERFLOW_POLICY must be one of {', '.join(OVERFLOW_POLICIES)}")
+# Sessions whose stream has not made progress for this long are expired by the reaper.
+SSE_IDLE_TIMEOUT_SECONDS = float(os.getenv("MCP_SSE_IDLE_TIMEOUT_SECONDS", "300"))
+SSE_REAPER_INTERVAL_SECONDS = float(os.getenv("MCP_SSE_REAPER_INTERVAL_SECONDS", "30"))
+SSE_HEARTBEAT_SECONDS = 10.0
+# How POSTed messages reach the worker holding the session's stream: local (single process)
+# or unix (forward between `uvicorn --workers N` processes over Unix domain sockets in MCP_SSE_SOCKET_DIR).
+SESSION_ROUTERS = ("local", "unix")
+SSE_SESSION_ROUTER = os.getenv("MCP_SSE_ROUTER", "local").lower()
+if SSE_SESSION_ROUTER not in SESSION_ROUTERS:
+    raise ValueError(f"MCP_SSE_ROUTER must be one of {', '.join(SESSION_ROUTERS)}")
+SSE_SOCKET_DIR = os.getenv("MCP_SSE_SOCKET_DIR", os.path.join(tempfile.gettempdir(), "intentions-mcp-sse"))
+
 
 @dataclass
-class _SseSession:
-    session_id: str
-    queue: asyncio.Queue[str]
+class SseStats:
+    """Counters for the legacy SSE transport (gauges are computed on read)."""
+
+    dropped_messages: int = 0
+    rejected_messages: int = 0
+    expired_sessions: int = 0
+
+    def reset(self) -> None:
+        self.dropped_messages = 0
+        self.rejected_messages = 0
+        self.expired_sessions = 0
+
+
+sse_stats = SseStats()
+
+
+def _enqueue(session: SseSession, payload: str) -> None:
+    """Put a message on a session queue, applying the overflow policy when it is full."""
+    if not session.queue.full():
+        session.queue.put_nowait(payload)
+        return
+    sse_stats.dropped_messages += 1
+    session.dropped += 1
+    if SSE_OVERFLOW_POLICY == "drop_oldest":
+        session.queue.get_nowait()
+        session.queue.put_nowait(payload)
+    # reject already refused new requests while full; anything racing past it is dropped like drop_newest
+    if session.dropped == 1:
+        logger.warning(
+            "SSE session queue full, dropping messages",
+            extra={"session_id": session.session_id, "overflow_policy": SSE_OVERFLOW_POLICY},
+        )
 
 
-_sessions: dict[str, _SseSession] = {}
-_sessions_lock = asyncio.Lock()
+def _create_session_router() -> LocalSessionRouter:
+    if SSE_SESSION_ROUTER == "unix":
+        return UnixSocketSessionRouter(SessionRegistry(), _enqueue, SSE_SOCKET_DIR)
+    return LocalSessionRouter(SessionRegistry(), _enqueue)
+
+
+_session_router: LocalSessionRouter = _create_session_router()
+_reaper_task: asyncio.Task | None = None
 
 router = APIRouter()
 
 
-async def _register_session() -> _SseSession:
-    session_id = str(uuid.uuid4())
-    session = _SseSession(session_id=session_id, queue=asyncio.Queue())
-    async with _sessions_lock:
-        _sessions[session_id] = session
+def get_session_router() -> LocalSessionRouter:
+    return _session_router
+
+
+def set_session_router(session_router: LocalSessionRouter) -> None:
+    """Swap the routing backend (call before start_sse_sessions)."""
+    global _session_router
+    _session_router = session_router
+
+
+def _register_session() -> SseSession:
+    session = SseSession(session_id=_session_router.new_session_id(), queue=asyncio.Queue(maxsize=SSE_QUEUE_MAXSIZE))
+    _session_router.register(session)
     return session
 
 
-async def _unregister_session(session_id: str) -> None:
-    async with _sessions_lock:
-        _sessions.pop(session_id, None)
+def _unregister_session(session_id: str) -> None:
+    _session_router.unregister(session_id)
+
+
+def _get_session(session_id: str) -> SseSession | None:
+    return _session_router.registry.get(session_id)
+
 
+def _expire_shard(shard_index: int, cutoff: float) -> int:
+    expired = _session_router.registry.idle_in_shard(shard_index, cutoff)
+    for session in expired:
+        _session_router.unregister(session.session_id)
+        session.close()
+    sse_stats.expired_sessions += len(expired)
+    return len(expired)
 
-async def _get_session(session_id: str) -> _SseSession | None:
-    async with _sessions_lock:
-        return _sessions.get(session_id)
 
+async def expire_idle_sessions(idle_timeout: float | None = None) -> int:
+    """Expire sessions whose stream has not made progress within idle_timeout. Returns the count."""
+    timeout = SSE_IDLE_TIMEOUT_SECONDS if idle_timeout is None else idle_timeout
+    cutoff = time.monotonic() - timeout
+    expired = 0
+    for shard_index in range(_session_router.registry.shard_count):
+        expired += _expire_shard(shard_index, cutoff)
+        # Scan incrementally so a large registry does not stall the event loop
+        await asyncio.sleep(0)
+    if expired:
+        logger.info("Expired idle SSE sessions", extra={"expired_count": expired})
+    return expired
 
-async def _sse_stream(session: _SseSession):
+
+async def _reap_idle_sessions() -> None:
+    while True:
+        await asyncio.sleep(SSE_REAPER_INTERVAL_SECONDS)
+        try:
+            await expire_idle_sessions()
+        except Exception as e:
+            logger.error("SSE session reaper failed", extra={"error": str(e)})
+
+
+async def start_sse_sessions() -> None:
+    """Start the session router and the background task that expires idle SSE sessions."""
+    global _reaper_task
+    await _session_router.start()
+    if _reaper_task is None or _reaper_task.done():
+        _reaper_task = asyncio.create_task(_reap_idle_sessions())
+
+
+async def stop_sse_sessions() -> None:
+    """Stop the idle-session reaper and the session router."""
+    global _reaper_task
+    if _reaper_task is not None:
+        _reaper_task.cancel()
+        try:
+            await _reaper_task
+        except asyncio.CancelledError:
+            pass
+        _reaper_task = None
+    await _session_router.stop()
+
+
+def get_sse_stats() -> dict[str, Any]:
+    """Return session count, queue depth gauges and overflow/expiry counters."""
+    depths = [session.queue.qsize() for session in _session_router.registry]
+    return {
+        "sessions": len(depths),
+        "queued_messages": sum(depths),
+        "max_queue_depth": max(depths, default=0),
+        "queue_maxsize": SSE_QUEUE_MAXSIZE,
+        "overflow_policy": SSE_OVERFLOW_POLICY,
+        "dropped_messages": sse_stats.dropped_messages,
+        "rejected_messages": sse_stats.rejected_messages,
+        "expired_sessions": sse_stats.expired_sessions,
+    }
+
+
+registry.callback("mcp_sse_sessions", "Open legacy SSE sessions", lambda: len(_session_router.registry))
+registry.callback(
+    "mcp_sse_queued_messages", "Messages queued across legacy SSE sessions", lambda: get_sse_stats()["queued_messages"]
+)
+registry.callback(
+    "mcp_sse_dropped_messages_total",
+    "Messages dropped on full SSE queues",
+    lambda: sse_stats.dropped_messages,
+    metric_type="counter",
+)
+registry.callback(
+    "mcp_sse_rejected_messages_total",
+    "Messages rejected on full SSE queues",
+    lambda: sse_stats.rejected_messages,
+    metric_type="counter",
+)
+registry.callback(
+    "mcp_sse_expired_sessions_total", "Idle SSE sessions expired", lambda: sse_stats.expired_sessions, metric_type="counter"
+)
+
+
+async def _next_message(session: SseSession) -> str | None:
+    """Wait for the next queued message; None on heartbeat timeout or when the session is closed."""
+    get = asyncio.ensure_future(session.queue.get())
+    closed = asyncio.ensure_future(session.closed.wait())
+    done, pending = await asyncio.wait({get, closed}, timeout=SSE_HEARTBEAT_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    if get in done:
+        return get.result()
+    return None
+
+
+async def _sse_stream(session: SseSession):
     """
     Yield SSE events:
     - endpoint: tells client where to POST JSON-RPC messages
     - message: JSON-RPC responses (JSON encoded)
+
+    Each resumption after a yield means the previous event was handed to the
+    server, so it counts as stream activity for idle expiry.
     """
     try:
         yield f"event: endpoint\ndata: /mcp/message?sessionId={session.session_id}\n\n"
-        while True:
-            try:
-                payload = await asyncio.wait_for(session.queue.get(), timeout=10)
-                yield f"event: message\ndata: {payload}\n\n"
-            except asyncio.TimeoutError:
+        session.touch()
+        while not session.closed.is_set():
+            payload = await _next_message(session)
+            if session.closed.is_set():
+                break
+            if payload is None:
                 yield ": heartbeat\n\n"
+            else:
+                yield f"event: message\ndata: {payload}\n\n"
+            session.touch()
     finally:
-        await _unregister_session(session.session_id)
+        _unregister_session(session.session_id)
 
 
 @router.get("/mcp")
@@ -80,7 +251,7 @@ async def sse_endpoint(request: Request) -> Response:
         logger.warning("Invalid origin for SSE endpoint", extra={"origin": origin, "allowed_origins": ALLOWED_ORIGINS})
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid origin")
 
-    session = await _register_session()
+    session = _register_session()
     return StreamingResponse(
         _sse_stream(session),
         media_type="text/event-stream",
@@ -107,9 +278,19 @@ async def sse_message_endpoint(request: Request) -> Response:
     if not session_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing sessionId")
 
-    session = await _get_session(session_id)
-    if session is None:
+    if not await _session_router.is_known(session_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown session")
+    # Queue depth is only visible for streams held by this worker
+    session = _get_session(session_id)
+    if SSE_OVERFLOW_POLICY == "reject" and session is not None and session.queue.full():
+        # Back-pressure: refuse before handling so the client can retry without side effects
+        sse_stats.rejected_messages += 1
+        logger.warning("SSE session queue full, request rejected", extra={"session_id": session_id})
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Session queue full",
+            headers={"Retry-After": "1"},
+        )
 
     try:
         body: dict[str, Any] = await request.json()
@@ -123,10 +304,11 @@ async def sse_message_endpoint(request: Request) -> Response:
     if response is None:
         return Response(status_code=status.HTTP_202_ACCEPTED)
 
-    await session.queue.put(json.dumps(response))
+    if not await _session_router.deliver(session_id, json.dumps(response)):
+        logger.warning("SSE session closed before response delivery", extra={"session_id": session_id})
     return Response(status_code=status.HTTP_202_ACCEPTED)
 
 
 @router.get("/mcp/sse/health")
 async def sse_health() -> Response:
-    return JSONResponse(content={"status": "ok", "transport": "sse"})
+    return JSONResponse(content={"status": "ok", "transport": "sse", **get_sse_stats()})
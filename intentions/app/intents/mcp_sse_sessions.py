@@ -0,0 +1,392 @@
+"""
+Session registry and message routing for the legacy MCP HTTP+SSE transport.
+
+The registry is only touched from the event loop thread and none of its
+operations await, so it needs no lock. Sessions are sharded by id so the
+idle reaper can scan one shard at a time and yield to the loop in between.
+
+A session router decides where a POSTed message goes: LocalSessionRouter
+delivers to sessions held by this process; BrokerSessionRouter shares session
+ownership between workers through a broker. InProcessBroker is a local
+stand-in for an external broker, used by tests and benchmarks to run several
+workers in one process. UnixSocketSessionRouter routes between real worker
+processes on the same host (``uvicorn --workers N``) over Unix domain sockets.
+"""
+
+import asyncio
+import os
+import struct
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from app.shared.logging_config import logger
+
+DEFAULT_SHARD_COUNT = 16
+
+
+@dataclass
+class SseSession:
+    session_id: str
+    queue: asyncio.Queue[str]
+    last_activity: float = field(default_factory=time.monotonic)
+    dropped: int = 0
+    closed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def touch(self) -> None:
+        self.last_activity = time.monotonic()
+
+    def close(self) -> None:
+        """Drop queued messages and tell the stream to finish."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.closed.set()
+
+
+class SessionRegistry:
+    """Sharded map of session id to SseSession for one process."""
+
+    def __init__(self, shard_count: int = DEFAULT_SHARD_COUNT):
+        self._shards: list[dict[str, SseSession]] = [{} for _ in range(shard_count)]
+
+    @property
+    def shard_count(self) -> int:
+        return len(self._shards)
+
+    def _shard(self, session_id: str) -> dict[str, SseSession]:
+        return self._shards[hash(session_id) % len(self._shards)]
+
+    def add(self, session: SseSession) -> None:
+        self._shard(session.session_id)[session.session_id] = session
+
+    def remove(self, session_id: str) -> SseSession | None:
+        return self._shard(session_id).pop(session_id, None)
+
+    def get(self, session_id: str) -> SseSession | None:
+        return self._shard(session_id).get(session_id)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def __iter__(self) -> Iterator[SseSession]:
+        for shard in self._shards:
+            yield from list(shard.values())
+
+    def idle_in_shard(self, shard_index: int, cutoff: float) -> list[SseSession]:
+        """Return sessions in one shard whose last activity is before cutoff."""
+        return [session for session in self._shards[shard_index].values() if session.last_activity < cutoff]
+
+
+DeliverLocal = Callable[[SseSession, str], None]
+
+
+class LocalSessionRouter:
+    """Routes messages to sessions whose SSE stream is held by this process."""
+
+    def __init__(self, registry: SessionRegistry, deliver_local: DeliverLocal):
+        self.registry = registry
+        self._deliver_local = deliver_local
+
+    def new_session_id(self) -> str:
+        return str(uuid.uuid4())
+
+    def register(self, session: SseSession) -> None:
+        self.registry.add(session)
+
+    def unregister(self, session_id: str) -> SseSession | None:
+        return self.registry.remove(session_id)
+
+    async def is_known(self, session_id: str) -> bool:
+        """Whether a message for this session can be routed."""
+        return self.registry.get(session_id) is not None
+
+    async def deliver(self, session_id: str, payload: str) -> bool:
+        """Deliver a message to the session's queue. Returns False if the session is unknown."""
+        session = self.registry.get(session_id)
+        if session is None:
+            return False
+        self._deliver_local(session, payload)
+        return True
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class InProcessBroker:
+    """
+    Stand-in for an external message broker (e.g. Redis pub/sub).
+
+    Tracks which worker owns each session and gives every worker an inbox.
+    Everything lives in one process, so it is only useful for simulating
+    several workers in tests and benchmarks.
+    """
+
+    def __init__(self) -> None:
+        self._owners: dict[str, str] = {}
+        self._inboxes: dict[str, asyncio.Queue[tuple[str, str]]] = {}
+
+    def attach(self, worker_id: str) -> asyncio.Queue[tuple[str, str]]:
+        inbox: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._inboxes[worker_id] = inbox
+        return inbox
+
+    def detach(self, worker_id: str) -> None:
+        self._inboxes.pop(worker_id, None)
+        for session_id in [sid for sid, owner in self._owners.items() if owner == worker_id]:
+            del self._owners[session_id]
+
+    def claim(self, session_id: str, worker_id: str) -> None:
+        self._owners[session_id] = worker_id
+
+    def release(self, session_id: str) -> None:
+        self._owners.pop(session_id, None)
+
+    def owner(self, session_id: str) -> str | None:
+        return self._owners.get(session_id)
+
+    def publish(self, worker_id: str, session_id: str, payload: str) -> bool:
+        inbox = self._inboxes.get(worker_id)
+        if inbox is None:
+            return False
+        inbox.put_nowait((session_id, payload))
+        return True
+
+
+class BrokerSessionRouter(LocalSessionRouter):
+    """Shares session ownership through a broker so any worker can accept a session's messages."""
+
+    def __init__(self, registry: SessionRegistry, deliver_local: DeliverLocal, broker: InProcessBroker, worker_id: str):
+        super().__init__(registry, deliver_local)
+        self.broker = broker
+        self.worker_id = worker_id
+        self._pump: asyncio.Task | None = None
+
+    def register(self, session: SseSession) -> None:
+        super().register(session)
+        self.broker.claim(session.session_id, self.worker_id)
+
+    def unregister(self, session_id: str) -> SseSession | None:
+        self.broker.release(session_id)
+        return super().unregister(session_id)
+
+    async def is_known(self, session_id: str) -> bool:
+        return self.broker.owner(session_id) is not None
+
+    async def deliver(self, session_id: str, payload: str) -> bool:
+        owner = self.broker.owner(session_id)
+        if owner is None:
+            return False
+        if owner == self.worker_id:
+            return await super().deliver(session_id, payload)
+        return self.broker.publish(owner, session_id, payload)
+
+    async def _consume(self, inbox: asyncio.Queue[tuple[str, str]]) -> None:
+        while True:
+            session_id, payload = await inbox.get()
+            if not await super().deliver(session_id, payload):
+                logger.warning("Routed SSE message for unknown session", extra={"session_id": session_id})
+
+    async def start(self) -> None:
+        self._pump = asyncio.create_task(self._consume(self.broker.attach(self.worker_id)))
+
+    async def stop(self) -> None:
+        self.broker.detach(self.worker_id)
+        if self._pump is not None:
+            self._pump.cancel()
+            try:
+                await self._pump
+            except asyncio.CancelledError:
+                pass
+            self._pump = None
+
+
+# Frame: kind (1 byte), session id length (2 bytes), payload length (4 bytes), then both
+# UTF-8 strings. A message frame is delivered to the session; a probe frame (empty payload)
+# asks whether the session is held. The owning worker answers each frame with one byte:
+# 1 delivered / held, 0 unknown session.
+_FRAME_HEADER = struct.Struct("!BHI")
+_FRAME_MESSAGE = 0
+_FRAME_PROBE = 1
+_ACK_DELIVERED = b"\x01"
+_ACK_UNKNOWN = b"\x00"
+
+
+class _PeerConnection:
+    """Persistent connection to another worker's socket; one frame in flight at a time."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.lock = asyncio.Lock()
+        self.closed = False
+
+    async def send(self, kind: int, session_id: str, payload: str = "") -> bool:
+        sid = session_id.encode()
+        body = payload.encode()
+        async with self.lock:
+            if self.closed:
+                raise ConnectionResetError("Peer connection is closed")
+            try:
+                self.writer.write(_FRAME_HEADER.pack(kind, len(sid), len(body)) + sid + body)
+                await self.writer.drain()
+                return await self.reader.readexactly(1) == _ACK_DELIVERED
+            except BaseException:
+                # Cancelled or failed mid-frame: an ack may still be in flight, so the
+                # stream is out of step and must not carry another frame
+                self.closed = True
+                self.writer.close()
+                raise
+
+    async def close(self) -> None:
+        self.closed = True
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+
+
+class UnixSocketSessionRouter(LocalSessionRouter):
+    """
+    Routes messages between worker processes on one host over Unix domain sockets.
+
+    Each worker gets a random token, embeds it in every session id it creates
+    and listens on ``{socket_dir}/{token}.sock``. A worker that receives a
+    POST for a session it does not hold reads the owner's token from the id
+    and forwards the message to that socket, so no shared session table is
+    needed. The owner confirms delivery per message and answers probes for
+    is_known. Sockets left behind by workers that died are removed at start.
+    """
+
+    def __init__(self, registry: SessionRegistry, deliver_local: DeliverLocal, socket_dir: str):
+        super().__init__(registry, deliver_local)
+        self.socket_dir = socket_dir
+        self.token = uuid.uuid4().hex[:12]
+        self._server: asyncio.AbstractServer | None = None
+        self._peers: dict[str, _PeerConnection] = {}
+        self._inbound: set[asyncio.StreamWriter] = set()
+
+    def _socket_path(self, token: str) -> str:
+        return os.path.join(self.socket_dir, f"{token}.sock")
+
+    @staticmethod
+    def _owner_token(session_id: str) -> str | None:
+        token, sep, _ = session_id.partition("-")
+        if not sep or not token.isalnum():
+            return None
+        return token
+
+    def new_session_id(self) -> str:
+        return f"{self.token}-{uuid.uuid4()}"
+
+    async def is_known(self, session_id: str) -> bool:
+        if self.registry.get(session_id) is not None:
+            return True
+        token = self._owner_token(session_id)
+        if token is None or token == self.token:
+            return False
+        return await self._send(token, _FRAME_PROBE, session_id)
+
+    async def deliver(self, session_id: str, payload: str) -> bool:
+        token = self._owner_token(session_id)
+        if token is None or token == self.token:
+            return await super().deliver(session_id, payload)
+        return await self._send(token, _FRAME_MESSAGE, session_id, payload)
+
+    async def _send(self, token: str, kind: int, session_id: str, payload: str = "") -> bool:
+        """Send one frame to the owning worker; False when it is unreachable."""
+        if not os.path.exists(self._socket_path(token)):
+            return False
+        peer = None
+        try:
+            peer = await self._peer(token)
+            return await peer.send(kind, session_id, payload)
+        except (OSError, asyncio.IncompleteReadError) as e:
+            # Owner went away or restarted; reconnect on the next frame
+            logger.warning("SSE message forwarding failed", extra={"session_id": session_id, "error": str(e)})
+            return False
+        finally:
+            if peer is not None and peer.closed and self._peers.get(token) is peer:
+                del self._peers[token]
+
+    async def _peer(self, token: str) -> _PeerConnection:
+        peer = self._peers.get(token)
+        if peer is None or peer.closed:
+            reader, writer = await asyncio.open_unix_connection(self._socket_path(token))
+            peer = _PeerConnection(reader, writer)
+            existing = self._peers.get(token)
+            if existing is None or existing.closed:
+                self._peers[token] = peer
+            else:
+                # Another request connected while we were awaiting
+                await peer.close()
+                peer = existing
+        return peer
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._inbound.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(_FRAME_HEADER.size)
+                kind, sid_len, body_len = _FRAME_HEADER.unpack(header)
+                session_id = (await reader.readexactly(sid_len)).decode()
+                payload = (await reader.readexactly(body_len)).decode()
+                if kind == _FRAME_PROBE:
+                    held = self.registry.get(session_id) is not None
+                else:
+                    held = await super().deliver(session_id, payload)
+                writer.write(_ACK_DELIVERED if held else _ACK_UNKNOWN)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._inbound.discard(writer)
+            writer.close()
+
+    async def _remove_stale_sockets(self) -> None:
+        """Unlink sockets in socket_dir that nobody listens on (workers that died without stop)."""
+        for name in os.listdir(self.socket_dir):
+            if not name.endswith(".sock"):
+                continue
+            path = os.path.join(self.socket_dir, name)
+            try:
+                _, writer = await asyncio.open_unix_connection(path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                logger.info("Removed stale SSE session socket", extra={"socket_path": path})
+            except OSError:
+                continue
+            else:
+                writer.close()
+
+    async def start(self) -> None:
+        os.makedirs(self.socket_dir, mode=0o700, exist_ok=True)
+        await self._remove_stale_sockets()
+        path = self._socket_path(self.token)
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = await asyncio.start_unix_server(self._serve, path=path)
+        logger.info("SSE session router listening", extra={"socket_path": path})
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Peers hold persistent connections; drop them so they stop routing here
+            for writer in list(self._inbound):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        try:
+            os.unlink(self._socket_path(self.token))
+        except FileNotFoundError:
+            pass
+        peers, self._peers = list(self._peers.values()), {}
+        for peer in peers:
+            await peer.close()
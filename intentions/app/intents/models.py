@@ -38,6 +38,7 @@ class Intent:
         examples: Optional[List["Example"]] = None,
         prompts: Optional[List["Prompt"]] = None,
         insights: Optional[List["Insight"]] = None,
+        revision: int = 1,
     ):
         self.id = id
         self.name = _require_non_empty(name, "Name")
@@ -54,6 +55,8 @@ class Intent:
         self.examples = examples if examples is not None else []
         self.prompts = prompts if prompts is not None else []
         self.insights = insights if insights is not None else []
+        # Bumped by every write to the intent or any entity it owns
+        self.revision = revision
 
 
 class Aspect:
@@ -306,3 +309,13 @@ class Insight:
         now = datetime.utcnow()
         self.created_at = created_at or now
         self.updated_at = updated_at or now
+
+
+class IntentChange:
+    """Latest change to an intent since a change-feed cursor; intent is None when it was deleted."""
+
+    def __init__(self, cursor: int, intent_id: int, change_type: str, intent: Optional[Intent] = None):
+        self.cursor = cursor
+        self.intent_id = intent_id
+        self.change_type = change_type
+        self.intent = intent
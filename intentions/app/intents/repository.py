@@ -4,11 +4,15 @@ Repository layer for intents domain (V2).
 Handles data access and conversion between DB models and domain models using SQLAlchemy.
 """
 
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 
-from sqlalchemy import inspect, select
+from sqlalchemy import bindparam, event, func, insert, inspect, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import Session, SessionTransaction, selectinload
+
+from app.shared.metrics import instrument_repository
 
 from .db_models import (
     AspectDBModel,
@@ -17,13 +21,123 @@ from .db_models import (
     ExampleDBModel,
     InputDBModel,
     InsightDBModel,
+    IntentChangeDBModel,
     IntentDBModel,
     OutputDBModel,
     PitfallDBModel,
     PromptDBModel,
     QualityDBModel,
 )
-from .models import Aspect, Assumption, Choice, Example, Input, Insight, Intent, Output, Pitfall, Prompt, Quality
+from .models import Aspect, Assumption, Choice, Example, Input, Insight, Intent, IntentChange, Output, Pitfall, Prompt, Quality
+
+# Loader options for the full intent composition (one SELECT ... IN per relationship)
+_INTENT_COMPOSITION = (
+    selectinload(IntentDBModel.aspects),
+    selectinload(IntentDBModel.inputs),
+    selectinload(IntentDBModel.choices),
+    selectinload(IntentDBModel.pitfalls),
+    selectinload(IntentDBModel.assumptions),
+    selectinload(IntentDBModel.qualities),
+    selectinload(IntentDBModel.examples),
+    selectinload(IntentDBModel.prompts),
+    selectinload(IntentDBModel.insights),
+)
+
+# Hot statements are built once at import time and executed with bound parameters,
+# so each call skips constructing the select() and its loader options. Their
+# compiled form is reused from the engine's compiled cache (query_cache_size).
+_FIND_INTENT_BY_ID = select(IntentDBModel).options(*_INTENT_COMPOSITION).where(IntentDBModel.id == bindparam("intent_id"))
+_FIND_INTENTS_BY_IDS = (
+    select(IntentDBModel).options(*_INTENT_COMPOSITION).where(IntentDBModel.id.in_(bindparam("intent_ids", expanding=True)))
+)
+_INTENTS_PAGE = (
+    select(IntentDBModel)
+    .options(*_INTENT_COMPOSITION)
+    .where(IntentDBModel.id > bindparam("after_id"))
+    .order_by(IntentDBModel.id)
+    .limit(bindparam("limit"))
+)
+_OUTPUTS_BY_PROMPT_IDS = (
+    select(OutputDBModel)
+    .where(OutputDBModel.prompt_id.in_(bindparam("prompt_ids", expanding=True)))
+    .order_by(OutputDBModel.id)
+)
+_LIST_INTENTS = select(IntentDBModel).options(*_INTENT_COMPOSITION).order_by(IntentDBModel.id)
+_INTENT_VERSION = select(IntentDBModel.revision, IntentDBModel.updated_at).where(IntentDBModel.id == bindparam("intent_id"))
+# Child-entity writes bump the owning intent's revision and updated_at; "fetch" keeps loaded intents in sync
+_TOUCH_INTENT = (
+    update(IntentDBModel)
+    .where(IntentDBModel.id == bindparam("intent_id"))
+    .values(revision=IntentDBModel.revision + 1, updated_at=bindparam("touched_at"))
+    .execution_options(synchronize_session="fetch")
+)
+_TOUCH_INTENT_OF_PROMPT = (
+    update(IntentDBModel)
+    .where(
+        IntentDBModel.id == select(PromptDBModel.intent_id).where(PromptDBModel.id == bindparam("prompt_id")).scalar_subquery()
+    )
+    .values(revision=IntentDBModel.revision + 1, updated_at=bindparam("touched_at"))
+    .returning(IntentDBModel.id)
+    .execution_options(synchronize_session="fetch")
+)
+# Every intent write also appends to intent_changes, whose id is the change-feed cursor
+_RECORD_CHANGE = insert(IntentChangeDBModel)
+# PostgreSQL hands out ids before commit, so a reader could see id N+1 while N is still in
+# flight and move its cursor past N for good. There, change rows are queued on the session
+# and inserted just before commit under this transaction-level lock, so change ids become
+# visible in id order while the lock is held only for those inserts and the commit. SQLite
+# already runs one write transaction at a time and inserts them right away.
+_CHANGE_FEED_LOCK_KEY = 0x696E74656E74  # "intent"
+_LOCK_CHANGE_FEED = select(func.pg_advisory_xact_lock(_CHANGE_FEED_LOCK_KEY))
+_DEFERRED_CHANGES_DIALECTS = {"postgresql"}
+# Session.info key of the (statement, params) change inserts queued until commit
+_PENDING_CHANGES = "intent_changes_pending"
+# Session.info key: ids of the intents the session's transaction wrote change rows for, read by
+# after_commit listeners (change_feed, mcp_sessions) and dropped when the transaction ends
+CHANGED_INTENTS = "intent_changes_intent_ids"
+_LATEST_CHANGE_PER_INTENT = (
+    select(func.max(IntentChangeDBModel.id).label("cursor"))
+    .where(IntentChangeDBModel.id > bindparam("after"))
+    .group_by(IntentChangeDBModel.intent_id)
+    .subquery()
+)
+_LIST_CHANGES = (
+    select(IntentChangeDBModel.id, IntentChangeDBModel.intent_id, IntentChangeDBModel.change_type)
+    .join(_LATEST_CHANGE_PER_INTENT, IntentChangeDBModel.id == _LATEST_CHANGE_PER_INTENT.c.cursor)
+    .order_by(IntentChangeDBModel.id)
+    .limit(bindparam("limit"))
+)
+_LATEST_CHANGE_CURSOR = select(func.coalesce(func.max(IntentChangeDBModel.id), 0))
+_INTENT_EXISTS = select(IntentDBModel.id).where(IntentDBModel.id == bindparam("intent_id"))
+_PROMPT_EXISTS = select(PromptDBModel.id).where(PromptDBModel.id == bindparam("prompt_id"))
+_NEXT_PROMPT_VERSION = select(func.coalesce(func.max(PromptDBModel.version), 0)).where(
+    PromptDBModel.intent_id == bindparam("intent_id")
+)
+_PROMPT_ID_FOR_OUTPUT = select(OutputDBModel.prompt_id).where(OutputDBModel.id == bindparam("output_id"))
+
+
+def _child_by_id(model, parent_column: str = "intent_id"):
+    """Build the cached lookup of one child entity scoped to its parent."""
+    return select(model).where(
+        model.id == bindparam("entity_id"),
+        getattr(model, parent_column) == bindparam("parent_id"),
+    )
+
+
+_FIND_ASPECT = _child_by_id(AspectDBModel)
+_FIND_INPUT = _child_by_id(InputDBModel)
+_FIND_CHOICE = _child_by_id(ChoiceDBModel)
+_FIND_PITFALL = _child_by_id(PitfallDBModel)
+_FIND_ASSUMPTION = _child_by_id(AssumptionDBModel)
+_FIND_QUALITY = _child_by_id(QualityDBModel)
+_FIND_EXAMPLE = _child_by_id(ExampleDBModel)
+_FIND_PROMPT = _child_by_id(PromptDBModel)
+_FIND_OUTPUT = _child_by_id(OutputDBModel, parent_column="prompt_id")
+_FIND_INSIGHT = _child_by_id(InsightDBModel)
+
+
+def _timestamps(entity) -> Dict[str, Any]:
+    return {"created_at": entity.created_at, "updated_at": entity.updated_at}
 
 
 def _safe_relation_list(db_obj, rel_name: str) -> list:
@@ -40,82 +154,264 @@ def _safe_relation_list(db_obj, rel_name: str) -> list:
         return []
 
 
+@instrument_repository
 class IntentRepository:
     """Repository for intent and V2 entity data access."""
 
     def __init__(self, db: AsyncSession):
         self.db = db
+        # Inside batch_changes(): change type per written intent, and intents whose children were written
+        self._pending_changes: Optional[Dict[int, str]] = None
+        self._pending_touches: Set[int] = set()
+
+    @asynccontextmanager
+    async def batch_changes(self) -> AsyncIterator[None]:
+        """
+        Group the writes of one operation into a single intent revision.
+
+        Child-entity writes inside the block bump each touched intent's revision
+        and updated_at once on exit, and every written intent gets one
+        intent_changes row (the first change type wins, so an intent created in
+        the block stays "created" at revision 1). Nothing is written when the
+        block raises; the caller rolls the transaction back.
+        """
+        if self._pending_changes is not None:
+            yield
+            return
+        self._pending_changes = {}
+        try:
+            yield
+            touched_at = datetime.utcnow()
+            for intent_id in self._pending_touches:
+                if self._pending_changes[intent_id] != "created":
+                    await self.db.execute(_TOUCH_INTENT, {"intent_id": intent_id, "touched_at": touched_at})
+            if self._pending_changes:
+                await self._write_changes(
+                    _RECORD_CHANGE,
+                    [
+                        {"intent_id": intent_id, "change_type": change_type, "created_at": touched_at}
+                        for intent_id, change_type in self._pending_changes.items()
+                    ],
+                )
+        finally:
+            self._pending_changes = None
+            self._pending_touches = set()
 
     async def find_by_id(self, intent_id: int) -> Optional[Intent]:
-        result = await self.db.execute(
-            select(IntentDBModel)
-            .options(
-                selectinload(IntentDBModel.aspects),
-                selectinload(IntentDBModel.inputs),
-                selectinload(IntentDBModel.choices),
-                selectinload(IntentDBModel.pitfalls),
-                selectinload(IntentDBModel.assumptions),
-                selectinload(IntentDBModel.qualities),
-                selectinload(IntentDBModel.examples),
-                selectinload(IntentDBModel.prompts),
-                selectinload(IntentDBModel.insights),
-            )
-            .where(IntentDBModel.id == intent_id)
-        )
+        result = await self.db.execute(_FIND_INTENT_BY_ID, {"intent_id": intent_id})
         db_intent = result.scalar_one_or_none()
         if db_intent:
             return self._to_intent_domain_model(db_intent)
         return None
 
+    async def find_by_ids(self, intent_ids: List[int]) -> List[Intent]:
+        """Load several intents with full composition (one IN query plus one per relationship). Order is unspecified."""
+        if not intent_ids:
+            return []
+        result = await self.db.execute(_FIND_INTENTS_BY_IDS, {"intent_ids": list(set(intent_ids))})
+        return [self._to_intent_domain_model(db_intent) for db_intent in result.scalars().all()]
+
+    async def get_version(self, intent_id: int) -> Optional[Tuple[int, datetime]]:
+        """Return (revision, updated_at) without loading the composition, or None if the intent does not exist."""
+        result = await self.db.execute(_INTENT_VERSION, {"intent_id": intent_id})
+        row = result.one_or_none()
+        return (row.revision, row.updated_at) if row else None
+
     async def list_all(self) -> List[Intent]:
         """List all intents with full composition (aspects, inputs, etc.)."""
-        result = await self.db.execute(
-            select(IntentDBModel)
-            .options(
-                selectinload(IntentDBModel.aspects),
-                selectinload(IntentDBModel.inputs),
-                selectinload(IntentDBModel.choices),
-                selectinload(IntentDBModel.pitfalls),
-                selectinload(IntentDBModel.assumptions),
-                selectinload(IntentDBModel.qualities),
-                selectinload(IntentDBModel.examples),
-                selectinload(IntentDBModel.prompts),
-                selectinload(IntentDBModel.insights),
-            )
-            .order_by(IntentDBModel.id)
-        )
+        result = await self.db.execute(_LIST_INTENTS)
         rows = result.scalars().all()
         return [self._to_intent_domain_model(db_intent) for db_intent in rows]
 
+    async def list_page(self, after_id: int, limit: int) -> List[Intent]:
+        """List up to `limit` intents with id > after_id, ordered by id (keyset pagination)."""
+        result = await self.db.execute(_INTENTS_PAGE, {"after_id": after_id, "limit": limit})
+        return [self._to_intent_domain_model(db_intent) for db_intent in result.scalars().all()]
+
+    async def list_outputs_by_prompt_ids(self, prompt_ids: List[int]) -> List[Output]:
+        """List outputs of several prompts in one IN query."""
+        if not prompt_ids:
+            return []
+        result = await self.db.execute(_OUTPUTS_BY_PROMPT_IDS, {"prompt_ids": prompt_ids})
+        return [self._to_output_domain_model(db) for db in result.scalars().all()]
+
+    async def list_changes(self, after: int, limit: int) -> List[IntentChange]:
+        """
+        List the latest change of each intent changed after the cursor, ordered by cursor.
+
+        Earlier changes to the same intent are folded into its latest one, so a
+        client that resumes from the last returned cursor never misses an intent.
+        The intent itself is not loaded.
+        """
+        result = await self.db.execute(_LIST_CHANGES, {"after": after, "limit": limit})
+        return [IntentChange(cursor=row.id, intent_id=row.intent_id, change_type=row.change_type) for row in result]
+
+    async def get_latest_change_cursor(self) -> int:
+        """Cursor of the most recent change (0 when nothing has changed yet)."""
+        result = await self.db.execute(_LATEST_CHANGE_CURSOR)
+        return result.scalar_one()
+
+    async def bulk_create(self, entries: List[Tuple[Intent, List[Output]]]) -> List[int]:
+        """
+        Insert intents with their full composition, one multi-row INSERT per table.
+
+        Entity ids on the input are ids from the source database. New ids are assigned,
+        and aspect_id, output prompt_id and insight source_*_id references are remapped
+        within each intent. References that do not resolve are stored as NULL; outputs
+        whose prompt does not resolve are skipped. Returns the new intent ids in order.
+        """
+        if not entries:
+            return []
+        intents = [intent for intent, _ in entries]
+        result = await self.db.scalars(
+            insert(IntentDBModel).returning(IntentDBModel.id, sort_by_parameter_order=True),
+            [{"name": i.name, "description": i.description, **_timestamps(i)} for i in intents],
+        )
+        intent_ids = list(result.all())
+        changed_at = datetime.utcnow()
+        await self._write_changes(
+            _RECORD_CHANGE,
+            [{"intent_id": intent_id, "change_type": "created", "created_at": changed_at} for intent_id in intent_ids],
+        )
+
+        def owned(entity, n: int) -> Dict[str, Any]:
+            return {"intent_id": intent_ids[n], **_timestamps(entity)}
+
+        aspect_ids = await self._bulk_insert(
+            AspectDBModel,
+            [i.aspects for i in intents],
+            lambda a, n: {**owned(a, n), "name": a.name, "description": a.description},
+            map_ids=True,
+        )
+
+        def aspect(entity, n: int) -> Dict[str, Any]:
+            return {**owned(entity, n), "aspect_id": aspect_ids[n].get(entity.aspect_id)}
+
+        await self._bulk_insert(
+            InputDBModel,
+            [i.inputs for i in intents],
+            lambda e, n: {
+                **aspect(e, n),
+                "name": e.name,
+                "description": e.description,
+                "format": e.format,
+                "required": e.required,
+            },
+        )
+        await self._bulk_insert(
+            ChoiceDBModel,
+            [i.choices for i in intents],
+            lambda e, n: {
+                **aspect(e, n),
+                "name": e.name,
+                "description": e.description,
+                "options": e.options,
+                "selected_option": e.selected_option,
+                "rationale": e.rationale,
+            },
+        )
+        await self._bulk_insert(
+            PitfallDBModel,
+            [i.pitfalls for i in intents],
+            lambda e, n: {**aspect(e, n), "description": e.description, "mitigation": e.mitigation},
+        )
+        assumption_ids = await self._bulk_insert(
+            AssumptionDBModel,
+            [i.assumptions for i in intents],
+            lambda e, n: {**aspect(e, n), "description": e.description, "confidence": e.confidence},
+            map_ids=True,
+        )
+        await self._bulk_insert(
+            QualityDBModel,
+            [i.qualities for i in intents],
+            lambda e, n: {**aspect(e, n), "criterion": e.criterion, "measurement": e.measurement, "priority": e.priority},
+        )
+        await self._bulk_insert(
+            ExampleDBModel,
+            [i.examples for i in intents],
+            lambda e, n: {**aspect(e, n), "sample": e.sample, "explanation": e.explanation, "source": e.source},
+        )
+        prompt_ids = await self._bulk_insert(
+            PromptDBModel,
+            [i.prompts for i in intents],
+            lambda e, n: {**owned(e, n), "content": e.content, "version": e.version},
+            map_ids=True,
+        )
+        output_ids = await self._bulk_insert(
+            OutputDBModel,
+            [outputs for _, outputs in entries],
+            lambda e, n: (
+                {"prompt_id": prompt_ids[n][e.prompt_id], "content": e.content, **_timestamps(e)}
+                if e.prompt_id in prompt_ids[n]
+                else None
+            ),
+            map_ids=True,
+        )
+        await self._bulk_insert(
+            InsightDBModel,
+            [i.insights for i in intents],
+            lambda e, n: {
+                **owned(e, n),
+                "content": e.content,
+                "source_type": e.source_type,
+                "source_output_id": output_ids[n].get(e.source_output_id),
+                "source_prompt_id": prompt_ids[n].get(e.source_prompt_id),
+                "source_assumption_id": assumption_ids[n].get(e.source_assumption_id),
+                "status": e.status,
+            },
+        )
+        return intent_ids
+
+    async def _bulk_insert(
+        self,
+        model,
+        entities_per_intent: List[list],
+        to_row: Callable[[Any, int], Optional[Dict[str, Any]]],
+        map_ids: bool = False,
+    ) -> List[Dict[int, int]]:
+        """
+        Insert the children of every intent in the batch with one multi-row INSERT.
+
+        to_row(entity, n) builds the row for an entity of the n-th intent (None skips it).
+        With map_ids, returns per-intent {source id: new id} maps for reference remapping.
+        """
+        id_maps: List[Dict[int, int]] = [{} for _ in entities_per_intent]
+        rows, sources = [], []
+        for n, entities in enumerate(entities_per_intent):
+            for entity in entities:
+                row = to_row(entity, n)
+                if row is not None:
+                    rows.append(row)
+                    sources.append((n, entity.id))
+        if not rows:
+            return id_maps
+        if not map_ids:
+            await self.db.execute(insert(model), rows)
+            return id_maps
+        result = await self.db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+        for (n, source_id), new_id in zip(sources, result.all()):
+            if source_id is not None:
+                id_maps[n][source_id] = new_id
+        return id_maps
+
     async def create(self, intent: Intent) -> Intent:
         db_intent = self._to_intent_db_model(intent)
         self.db.add(db_intent)
         await self.db.flush()
+        await self._record_change(db_intent.id, "created")
         await self.db.refresh(db_intent)
         return self._to_intent_domain_model(db_intent)
 
     async def update(self, intent_id: int, intent: Intent) -> Optional[Intent]:
-        result = await self.db.execute(
-            select(IntentDBModel)
-            .options(
-                selectinload(IntentDBModel.aspects),
-                selectinload(IntentDBModel.inputs),
-                selectinload(IntentDBModel.choices),
-                selectinload(IntentDBModel.pitfalls),
-                selectinload(IntentDBModel.assumptions),
-                selectinload(IntentDBModel.qualities),
-                selectinload(IntentDBModel.examples),
-                selectinload(IntentDBModel.prompts),
-                selectinload(IntentDBModel.insights),
-            )
-            .where(IntentDBModel.id == intent_id)
-        )
+        result = await self.db.execute(_FIND_INTENT_BY_ID, {"intent_id": intent_id})
         db_intent = result.scalar_one_or_none()
         if not db_intent:
             return None
         db_intent.name = intent.name
         db_intent.description = intent.description
+        db_intent.revision = IntentDBModel.revision + 1
         await self.db.flush()
+        await self._record_change(intent_id, "updated")
         await self.db.refresh(db_intent)
         return self._to_intent_domain_model(db_intent)
 
@@ -124,7 +420,10 @@ class IntentRepository:
 
         result = await self.db.execute(sql_delete(IntentDBModel).where(IntentDBModel.id == intent_id))
         await self.db.flush()
-        return bool(result.rowcount and result.rowcount > 0)
+        deleted = bool(result.rowcount and result.rowcount > 0)
+        if deleted:
+            await self._record_change(intent_id, "deleted")
+        return deleted
 
     def _to_intent_domain_model(self, db_intent: IntentDBModel) -> Intent:
         aspects = _safe_relation_list(db_intent, "aspects")
@@ -142,6 +441,7 @@ class IntentRepository:
             description=db_intent.description,
             created_at=db_intent.created_at,
             updated_at=db_intent.updated_at,
+            revision=db_intent.revision,
             aspects=[self._to_aspect_domain_model(a) for a in aspects],
             inputs=[self._to_input_domain_model(i) for i in inputs],
             choices=[self._to_choice_domain_model(c) for c in choices],
@@ -160,6 +460,7 @@ class IntentRepository:
             description=intent.description,
             created_at=intent.created_at,
             updated_at=intent.updated_at,
+            revision=intent.revision,
         )
 
     # --- Aspect ---
@@ -170,15 +471,11 @@ class IntentRepository:
         self.db.add(db)
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_aspect_domain_model(db)
 
     async def find_aspect_by_id(self, intent_id: int, aspect_id: int) -> Optional[Aspect]:
-        result = await self.db.execute(
-            select(AspectDBModel).where(
-                AspectDBModel.id == aspect_id,
-                AspectDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_ASPECT, {"entity_id": aspect_id, "parent_id": intent_id})
         row = result.scalar_one_or_none()
         return self._to_aspect_domain_model(row) if row else None
 
@@ -187,12 +484,7 @@ class IntentRepository:
         return [self._to_aspect_domain_model(r) for r in result.scalars().all()]
 
     async def update_aspect(self, intent_id: int, aspect_id: int, aspect: Aspect) -> Optional[Aspect]:
-        result = await self.db.execute(
-            select(AspectDBModel).where(
-                AspectDBModel.id == aspect_id,
-                AspectDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_ASPECT, {"entity_id": aspect_id, "parent_id": intent_id})
         db = result.scalar_one_or_none()
         if not db:
             return None
@@ -200,6 +492,7 @@ class IntentRepository:
         db.description = aspect.description
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_aspect_domain_model(db)
 
     async def delete_aspect(self, intent_id: int, aspect_id: int) -> bool:
@@ -212,7 +505,10 @@ class IntentRepository:
             )
         )
         await self.db.flush()
-        return bool(result.rowcount and result.rowcount > 0)
+        deleted = bool(result.rowcount and result.rowcount > 0)
+        if deleted:
+            await self._touch_intent(intent_id)
+        return deleted
 
     def _to_aspect_domain_model(self, db: AspectDBModel) -> Aspect:
         return Aspect(
@@ -242,15 +538,11 @@ class IntentRepository:
         self.db.add(db)
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_input_domain_model(db)
 
     async def find_input_by_id(self, intent_id: int, input_id: int) -> Optional[Input]:
-        result = await self.db.execute(
-            select(InputDBModel).where(
-                InputDBModel.id == input_id,
-                InputDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_INPUT, {"entity_id": input_id, "parent_id": intent_id})
         row = result.scalar_one_or_none()
         return self._to_input_domain_model(row) if row else None
 
@@ -259,12 +551,7 @@ class IntentRepository:
         return [self._to_input_domain_model(r) for r in result.scalars().all()]
 
     async def update_input(self, intent_id: int, input_id: int, entity: Input) -> Optional[Input]:
-        result = await self.db.execute(
-            select(InputDBModel).where(
-                InputDBModel.id == input_id,
-                InputDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_INPUT, {"entity_id": input_id, "parent_id": intent_id})
         db = result.scalar_one_or_none()
         if not db:
             return None
@@ -275,6 +562,7 @@ class IntentRepository:
         db.required = entity.required
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_input_domain_model(db)
 
     async def delete_input(self, intent_id: int, input_id: int) -> bool:
@@ -287,7 +575,10 @@ class IntentRepository:
             )
         )
         await self.db.flush()
-        return bool(result.rowcount and result.rowcount > 0)
+        deleted = bool(result.rowcount and result.rowcount > 0)
+        if deleted:
+            await self._touch_intent(intent_id)
+        return deleted
 
     def _to_input_domain_model(self, db: InputDBModel) -> Input:
         return Input(
@@ -323,15 +614,11 @@ class IntentRepository:
         self.db.add(db)
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_choice_domain_model(db)
 
     async def find_choice_by_id(self, intent_id: int, choice_id: int) -> Optional[Choice]:
-        result = await self.db.execute(
-            select(ChoiceDBModel).where(
-                ChoiceDBModel.id == choice_id,
-                ChoiceDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_CHOICE, {"entity_id": choice_id, "parent_id": intent_id})
         row = result.scalar_one_or_none()
         return self._to_choice_domain_model(row) if row else None
 
@@ -340,12 +627,7 @@ class IntentRepository:
         return [self._to_choice_domain_model(r) for r in result.scalars().all()]
 
     async def update_choice(self, intent_id: int, choice_id: int, entity: Choice) -> Optional[Choice]:
-        result = await self.db.execute(
-            select(ChoiceDBModel).where(
-                ChoiceDBModel.id == choice_id,
-                ChoiceDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_CHOICE, {"entity_id": choice_id, "parent_id": intent_id})
         db = result.scalar_one_or_none()
         if not db:
             return None
@@ -357,6 +639,7 @@ class IntentRepository:
         db.rationale = entity.rationale
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_choice_domain_model(db)
 
     async def delete_choice(self, intent_id: int, choice_id: int) -> bool:
@@ -369,7 +652,10 @@ class IntentRepository:
             )
         )
         await self.db.flush()
-        return bool(result.rowcount and result.rowcount > 0)
+        deleted = bool(result.rowcount and result.rowcount > 0)
+        if deleted:
+            await self._touch_intent(intent_id)
+        return deleted
 
     def _to_choice_domain_model(self, db: ChoiceDBModel) -> Choice:
         return Choice(
@@ -407,15 +693,11 @@ class IntentRepository:
         self.db.add(db)
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_pitfall_domain_model(db)
 
     async def find_pitfall_by_id(self, intent_id: int, pitfall_id: int) -> Optional[Pitfall]:
-        result = await self.db.execute(
-            select(PitfallDBModel).where(
-                PitfallDBModel.id == pitfall_id,
-                PitfallDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_PITFALL, {"entity_id": pitfall_id, "parent_id": intent_id})
         row = result.scalar_one_or_none()
         return self._to_pitfall_domain_model(row) if row else None
 
@@ -424,12 +706,7 @@ class IntentRepository:
         return [self._to_pitfall_domain_model(r) for r in result.scalars().all()]
 
     async def update_pitfall(self, intent_id: int, pitfall_id: int, entity: Pitfall) -> Optional[Pitfall]:
-        result = await self.db.execute(
-            select(PitfallDBModel).where(
-                PitfallDBModel.id == pitfall_id,
-                PitfallDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_PITFALL, {"entity_id": pitfall_id, "parent_id": intent_id})
         db = result.scalar_one_or_none()
         if not db:
             return None
@@ -438,6 +715,7 @@ class IntentRepository:
         db.mitigation = entity.mitigation
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_pitfall_domain_model(db)
 
     async def delete_pitfall(self, intent_id: int, pitfall_id: int) -> bool:
@@ -450,7 +728,10 @@ class IntentRepository:
             )
         )
         await self.db.flush()
-        return bool(result.rowcount and result.rowcount > 0)
+        deleted = bool(result.rowcount and result.rowcount > 0)
+        if deleted:
+            await self._touch_intent(intent_id)
+        return deleted
 
     def _to_pitfall_domain_model(self, db: PitfallDBModel) -> Pitfall:
         return Pitfall(
@@ -482,15 +763,11 @@ class IntentRepository:
         self.db.add(db)
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_assumption_domain_model(db)
 
     async def find_assumption_by_id(self, intent_id: int, assumption_id: int) -> Optional[Assumption]:
-        result = await self.db.execute(
-            select(AssumptionDBModel).where(
-                AssumptionDBModel.id == assumption_id,
-                AssumptionDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_ASSUMPTION, {"entity_id": assumption_id, "parent_id": intent_id})
         row = result.scalar_one_or_none()
         return self._to_assumption_domain_model(row) if row else None
 
@@ -499,12 +776,7 @@ class IntentRepository:
         return [self._to_assumption_domain_model(r) for r in result.scalars().all()]
 
     async def update_assumption(self, intent_id: int, assumption_id: int, entity: Assumption) -> Optional[Assumption]:
-        result = await self.db.execute(
-            select(AssumptionDBModel).where(
-                AssumptionDBModel.id == assumption_id,
-                AssumptionDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_ASSUMPTION, {"entity_id": assumption_id, "parent_id": intent_id})
         db = result.scalar_one_or_none()
         if not db:
             return None
@@ -513,6 +785,7 @@ class IntentRepository:
         db.confidence = entity.confidence
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_assumption_domain_model(db)
 
     async def delete_assumption(self, intent_id: int, assumption_id: int) -> bool:
@@ -525,7 +798,10 @@ class IntentRepository:
             )
         )
         await self.db.flush()
-        return bool(result.rowcount and result.rowcount > 0)
+        deleted = bool(result.rowcount and result.rowcount > 0)
+        if deleted:
+            await self._touch_intent(intent_id)
+        return deleted
 
     def _to_assumption_domain_model(self, db: AssumptionDBModel) -> Assumption:
         return Assumption(
@@ -557,15 +833,11 @@ class IntentRepository:
         self.db.add(db)
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_quality_domain_model(db)
 
     async def find_quality_by_id(self, intent_id: int, quality_id: int) -> Optional[Quality]:
-        result = await self.db.execute(
-            select(QualityDBModel).where(
-                QualityDBModel.id == quality_id,
-                QualityDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_QUALITY, {"entity_id": quality_id, "parent_id": intent_id})
         row = result.scalar_one_or_none()
         return self._to_quality_domain_model(row) if row else None
 
@@ -574,12 +846,7 @@ class IntentRepository:
         return [self._to_quality_domain_model(r) for r in result.scalars().all()]
 
     async def update_quality(self, intent_id: int, quality_id: int, entity: Quality) -> Optional[Quality]:
-        result = await self.db.execute(
-            select(QualityDBModel).where(
-                QualityDBModel.id == quality_id,
-                QualityDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_QUALITY, {"entity_id": quality_id, "parent_id": intent_id})
         db = result.scalar_one_or_none()
         if not db:
             return None
@@ -589,6 +856,7 @@ class IntentRepository:
         db.priority = entity.priority
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_quality_domain_model(db)
 
     async def delete_quality(self, intent_id: int, quality_id: int) -> bool:
@@ -601,7 +869,10 @@ class IntentRepository:
             )
         )
         await self.db.flush()
-        return bool(result.rowcount and result.rowcount > 0)
+        deleted = bool(result.rowcount and result.rowcount > 0)
+        if deleted:
+            await self._touch_intent(intent_id)
+        return deleted
 
     def _to_quality_domain_model(self, db: QualityDBModel) -> Quality:
         return Quality(
@@ -635,15 +906,11 @@ class IntentRepository:
         self.db.add(db)
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_example_domain_model(db)
 
     async def find_example_by_id(self, intent_id: int, example_id: int) -> Optional[Example]:
-        result = await self.db.execute(
-            select(ExampleDBModel).where(
-                ExampleDBModel.id == example_id,
-                ExampleDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_EXAMPLE, {"entity_id": example_id, "parent_id": intent_id})
         row = result.scalar_one_or_none()
         return self._to_example_domain_model(row) if row else None
 
@@ -652,12 +919,7 @@ class IntentRepository:
         return [self._to_example_domain_model(r) for r in result.scalars().all()]
 
     async def update_example(self, intent_id: int, example_id: int, entity: Example) -> Optional[Example]:
-        result = await self.db.execute(
-            select(ExampleDBModel).where(
-                ExampleDBModel.id == example_id,
-                ExampleDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_EXAMPLE, {"entity_id": example_id, "parent_id": intent_id})
         db = result.scalar_one_or_none()
         if not db:
             return None
@@ -667,6 +929,7 @@ class IntentRepository:
         db.source = entity.source
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_example_domain_model(db)
 
     async def delete_example(self, intent_id: int, example_id: int) -> bool:
@@ -679,7 +942,10 @@ class IntentRepository:
             )
         )
         await self.db.flush()
-        return bool(result.rowcount and result.rowcount > 0)
+        deleted = bool(result.rowcount and result.rowcount > 0)
+        if deleted:
+            await self._touch_intent(intent_id)
+        return deleted
 
     def _to_example_domain_model(self, db: ExampleDBModel) -> Example:
         return Example(
@@ -713,24 +979,16 @@ class IntentRepository:
         self.db.add(db)
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_prompt_domain_model(db)
 
     async def get_next_prompt_version(self, intent_id: int) -> int:
-        from sqlalchemy import func
-
-        result = await self.db.execute(
-            select(func.coalesce(func.max(PromptDBModel.version), 0)).where(PromptDBModel.intent_id == intent_id)
-        )
+        result = await self.db.execute(_NEXT_PROMPT_VERSION, {"intent_id": intent_id})
         row = result.scalar_one_or_none()
         return (row or 0) + 1
 
     async def find_prompt_by_id(self, intent_id: int, prompt_id: int) -> Optional[Prompt]:
-        result = await self.db.execute(
-            select(PromptDBModel).where(
-                PromptDBModel.id == prompt_id,
-                PromptDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_PROMPT, {"entity_id": prompt_id, "parent_id": intent_id})
         row = result.scalar_one_or_none()
         return self._to_prompt_domain_model(row) if row else None
 
@@ -766,15 +1024,11 @@ class IntentRepository:
         self.db.add(db)
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent_of_prompt(prompt_id)
         return self._to_output_domain_model(db)
 
     async def find_output_by_id(self, prompt_id: int, output_id: int) -> Optional[Output]:
-        result = await self.db.execute(
-            select(OutputDBModel).where(
-                OutputDBModel.id == output_id,
-                OutputDBModel.prompt_id == prompt_id,
-            )
-        )
+        result = await self.db.execute(_FIND_OUTPUT, {"entity_id": output_id, "parent_id": prompt_id})
         row = result.scalar_one_or_none()
         return self._to_output_domain_model(row) if row else None
 
@@ -784,9 +1038,9 @@ class IntentRepository:
 
     async def get_prompt_id_for_output(self, output_id: int) -> Optional[int]:
         """Return the prompt_id for an output, or None if output does not exist."""
-        result = await self.db.execute(select(OutputDBModel.prompt_id).where(OutputDBModel.id == output_id))
-        row = result.scalar_one_or_none()
-        return int(row[0]) if row else None
+        result = await self.db.execute(_PROMPT_ID_FOR_OUTPUT, {"output_id": output_id})
+        prompt_id = result.scalar_one_or_none()
+        return int(prompt_id) if prompt_id is not None else None
 
     def _to_output_domain_model(self, db: OutputDBModel) -> Output:
         return Output(
@@ -814,15 +1068,11 @@ class IntentRepository:
         self.db.add(db)
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_insight_domain_model(db)
 
     async def find_insight_by_id(self, intent_id: int, insight_id: int) -> Optional[Insight]:
-        result = await self.db.execute(
-            select(InsightDBModel).where(
-                InsightDBModel.id == insight_id,
-                InsightDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_INSIGHT, {"entity_id": insight_id, "parent_id": intent_id})
         row = result.scalar_one_or_none()
         return self._to_insight_domain_model(row) if row else None
 
@@ -831,12 +1081,7 @@ class IntentRepository:
         return [self._to_insight_domain_model(r) for r in result.scalars().all()]
 
     async def update_insight(self, intent_id: int, insight_id: int, entity: Insight) -> Optional[Insight]:
-        result = await self.db.execute(
-            select(InsightDBModel).where(
-                InsightDBModel.id == insight_id,
-                InsightDBModel.intent_id == intent_id,
-            )
-        )
+        result = await self.db.execute(_FIND_INSIGHT, {"entity_id": insight_id, "parent_id": intent_id})
         db = result.scalar_one_or_none()
         if not db:
             return None
@@ -848,6 +1093,7 @@ class IntentRepository:
         db.status = entity.status
         await self.db.flush()
         await self.db.refresh(db)
+        await self._touch_intent(intent_id)
         return self._to_insight_domain_model(db)
 
     async def delete_insight(self, intent_id: int, insight_id: int) -> bool:
@@ -860,7 +1106,10 @@ class IntentRepository:
             )
         )
         await self.db.flush()
-        return bool(result.rowcount and result.rowcount > 0)
+        deleted = bool(result.rowcount and result.rowcount > 0)
+        if deleted:
+            await self._touch_intent(intent_id)
+        return deleted
 
     def _to_insight_domain_model(self, db: InsightDBModel) -> Insight:
         return Insight(
@@ -890,12 +1139,64 @@ class IntentRepository:
             updated_at=e.updated_at,
         )
 
+    async def _touch_intent(self, intent_id: int) -> None:
+        if self._pending_changes is not None:
+            self._pending_touches.add(intent_id)
+            self._pending_changes.setdefault(intent_id, "updated")
+            return
+        touched_at = datetime.utcnow()
+        await self.db.execute(_TOUCH_INTENT, {"intent_id": intent_id, "touched_at": touched_at})
+        await self._write_changes(_RECORD_CHANGE, {"intent_id": intent_id, "change_type": "updated", "created_at": touched_at})
+
+    async def _touch_intent_of_prompt(self, prompt_id: int) -> None:
+        touched_at = datetime.utcnow()
+        result = await self.db.execute(_TOUCH_INTENT_OF_PROMPT, {"prompt_id": prompt_id, "touched_at": touched_at})
+        intent_id = result.scalar_one()
+        await self._write_changes(_RECORD_CHANGE, {"intent_id": intent_id, "change_type": "updated", "created_at": touched_at})
+
+    async def _record_change(self, intent_id: int, change_type: str) -> None:
+        if self._pending_changes is not None:
+            self._pending_changes.setdefault(intent_id, change_type)
+            return
+        await self._write_changes(
+            _RECORD_CHANGE, {"intent_id": intent_id, "change_type": change_type, "created_at": datetime.utcnow()}
+        )
+
+    async def _write_changes(self, statement, params) -> None:
+        rows = params if isinstance(params, list) else [params]
+        self.db.info.setdefault(CHANGED_INTENTS, set()).update(row["intent_id"] for row in rows)
+        if self.db.get_bind().dialect.name in _DEFERRED_CHANGES_DIALECTS:
+            self.db.info.setdefault(_PENDING_CHANGES, []).append((statement, params))
+            return
+        await self.db.execute(statement, params)
+
     async def _ensure_intent_exists(self, intent_id: int) -> None:
-        result = await self.db.execute(select(IntentDBModel).where(IntentDBModel.id == intent_id))
+        result = await self.db.execute(_INTENT_EXISTS, {"intent_id": intent_id})
         if result.scalar_one_or_none() is None:
             raise ValueError(f"Intent with id {intent_id} not found")
 
     async def _ensure_prompt_exists(self, prompt_id: int) -> None:
-        result = await self.db.execute(select(PromptDBModel).where(PromptDBModel.id == prompt_id))
+        result = await self.db.execute(_PROMPT_EXISTS, {"prompt_id": prompt_id})
         if result.scalar_one_or_none() is None:
             raise ValueError(f"Prompt with id {prompt_id} not found")
+
+
+def _write_pending_changes(session: Session) -> None:
+    """Insert the change rows queued by _write_changes as the last statements of the transaction."""
+    pending = session.info.pop(_PENDING_CHANGES, None)
+    if not pending:
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(_LOCK_CHANGE_FEED)
+    for statement, params in pending:
+        session.execute(statement, params)
+
+
+def _forget_changes(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_PENDING_CHANGES, None)
+        session.info.pop(CHANGED_INTENTS, None)
+
+
+event.listen(Session, "before_commit", _write_pending_changes)
+event.listen(Session, "after_transaction_end", _forget_changes)
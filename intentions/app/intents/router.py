@@ -4,32 +4,35 @@ HTTP router for intents domain (V2).
 Defines HTTP endpoints and handles request/response serialization.
 """
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, status
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Path, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from app.shared import ErrorResponse
-from app.shared.dependencies import get_intent_repository
+from app.shared.database import get_read_session_factory
+from app.shared.dependencies import SessionReleasingRoute, get_intent_repository, get_read_intent_repository
 
-from . import service
+from . import change_feed, service
 from .repository import IntentRepository
 from .schemas import (
-    AspectResponse,
-    AssumptionResponse,
-    ChoiceResponse,
-    ExampleResponse,
-    InputResponse,
-    InsightResponse,
+    IntentBatchGetRequest,
+    IntentBatchGetResponse,
+    IntentChangesResponse,
     IntentCreateRequest,
     IntentResponse,
     IntentUpdateDescriptionRequest,
     IntentUpdateNameRequest,
-    PitfallResponse,
-    PromptResponse,
-    QualityResponse,
 )
+from .serialization import batch_get_to_dict, change_to_dict, intent_to_dict, json_response
 
 router = APIRouter(
     prefix="/intents",
     tags=["intents"],
+    route_class=SessionReleasingRoute,
 )
 
 
@@ -50,7 +53,69 @@ async def create_intent(
 ):
     """Create a new intent (V2)."""
     intent = await service.create_intent(request, repository)
-    return _to_intent_response(intent)
+    return json_response(intent_to_dict(intent), status_code=status.HTTP_201_CREATED)
+
+
+# The change feed reads through sessions of its own (see change_feed), so a
+# long-poll or stream does not hold a pooled connection while it waits.
+@router.get(
+    "/changes",
+    response_model=IntentChangesResponse,
+    operation_id="listIntentChanges",
+    responses={
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+        422: {"model": ErrorResponse, "description": "Validation Error"},
+    },
+)
+async def list_intent_changes(
+    cursor: Optional[int] = Query(
+        None, ge=0, description="Cursor from a previous response. Omit to receive only future changes; 0 replays all."
+    ),
+    limit: int = Query(change_feed.DEFAULT_CHANGES_LIMIT, ge=1, le=change_feed.MAX_CHANGES_LIMIT),
+    timeout: float = Query(
+        0, ge=0, le=change_feed.CHANGE_FEED_MAX_WAIT_SECONDS, description="Seconds to wait for a change (long-poll)."
+    ),
+    session_factory: async_sessionmaker = Depends(get_read_session_factory),
+):
+    """List intents changed after the cursor, one entry per intent. With timeout, waits for the first change."""
+    changes, next_cursor = await change_feed.wait_for_changes(session_factory, cursor, limit, timeout)
+    return json_response({"changes": [change_to_dict(change) for change in changes], "cursor": next_cursor})
+
+
+@router.get(
+    "/changes/stream",
+    response_class=StreamingResponse,
+    operation_id="streamIntentChanges",
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": "One IntentChangeItem per event; the event id is its cursor",
+        },
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+    },
+)
+async def stream_intent_changes(
+    cursor: Optional[int] = Query(
+        None, ge=0, description="Cursor to start after. Omit to receive only future changes; 0 replays all."
+    ),
+    last_event_id: Optional[int] = Header(None, ge=0, description="Resume cursor sent by EventSource on reconnect."),
+    session_factory: async_sessionmaker = Depends(get_read_session_factory),
+):
+    """Subscribe to intent changes as Server-Sent Events."""
+    start = last_event_id if last_event_id is not None else cursor
+
+    async def body():
+        async for changes in change_feed.stream_changes(session_factory, start):
+            if not changes:
+                yield ": heartbeat\n\n"
+            for change in changes:
+                yield f"id: {change.cursor}\ndata: {to_json(change_to_dict(change)).decode()}\n\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get(
@@ -58,19 +123,47 @@ async def create_intent(
     response_model=IntentResponse,
     operation_id="getIntent",
     responses={
+        304: {"description": "Not Modified (If-None-Match matches the current ETag)"},
         404: {"model": ErrorResponse, "description": "Intent not found"},
         401: {"model": ErrorResponse, "description": "Unauthorized"},
     },
 )
 async def get_intent(
     intent_id: int = Path(..., description="The unique identifier of the intent to retrieve"),
-    repository: IntentRepository = Depends(get_intent_repository),
+    if_none_match: Optional[str] = Header(None, description="ETag from a previous response"),
+    repository: IntentRepository = Depends(get_read_intent_repository),
 ):
-    """Get a specific intent by ID."""
+    """Get a specific intent by ID. Supports conditional reads with ETag / If-None-Match."""
+    if if_none_match:
+        # Compare against the stored revision before loading the full composition
+        version = await service.get_intent_version(intent_id, repository)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Intent not found")
+        etag = _intent_etag(*version)
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
     intent = await service.get_intent(intent_id, repository)
     if not intent:
         raise HTTPException(status_code=404, detail="Intent not found")
-    return _to_intent_response(intent)
+    return json_response(intent_to_dict(intent), headers={"ETag": _intent_etag(intent.revision, intent.updated_at)})
+
+
+@router.post(
+    ":batchGet",
+    response_model=IntentBatchGetResponse,
+    operation_id="batchGetIntents",
+    responses={
+        401: {"model": ErrorResponse, "description": "Unauthorized"},
+        422: {"model": ErrorResponse, "description": "Validation Error"},
+    },
+)
+async def batch_get_intents(
+    request: IntentBatchGetRequest,
+    repository: IntentRepository = Depends(get_read_intent_repository),
+):
+    """Get several intents by ID. Results follow request order; missing IDs have found=false."""
+    intents = await service.get_intents(request.intent_ids, repository)
+    return json_response(batch_get_to_dict(request.intent_ids, intents))
 
 
 @router.patch(
@@ -92,7 +185,7 @@ async def update_intent_name(
     intent = await service.update_intent_name(intent_id, request.name, repository)
     if not intent:
         raise HTTPException(status_code=404, detail="Intent not found")
-    return _to_intent_response(intent)
+    return json_response(intent_to_dict(intent))
 
 
 @router.patch(
@@ -114,24 +207,15 @@ async def update_intent_description(
     intent = await service.update_intent_description(intent_id, request.description, repository)
     if not intent:
         raise HTTPException(status_code=404, detail="Intent not found")
-    return _to_intent_response(intent)
-
-
-def _to_intent_response(intent) -> IntentResponse:
-    """Convert domain model to response DTO (V2)."""
-    return IntentResponse(
-        id=intent.id,
-        name=intent.name,
-        description=intent.description,
-        created_at=intent.created_at,
-        updated_at=intent.updated_at,
-        aspects=[AspectResponse(id=a.id, name=a.name, description=a.description) for a in intent.aspects],
-        inputs=[InputResponse(id=i.id, name=i.name, description=i.description) for i in intent.inputs],
-        choices=[ChoiceResponse(id=c.id, name=c.name, description=c.description) for c in intent.choices],
-        pitfalls=[PitfallResponse(id=p.id, description=p.description) for p in intent.pitfalls],
-        assumptions=[AssumptionResponse(id=a.id, description=a.description) for a in intent.assumptions],
-        qualities=[QualityResponse(id=q.id, criterion=q.criterion, priority=q.priority) for q in intent.qualities],
-        examples=[ExampleResponse(id=e.id, sample=e.sample) for e in intent.examples],
-        prompts=[PromptResponse(id=p.id, version=p.version, content=p.content) for p in intent.prompts],
-        insights=[InsightResponse(id=i.id, content=i.content, status=i.status) for i in intent.insights],
-    )
+    return json_response(intent_to_dict(intent))
+
+
+def _intent_etag(revision: int, updated_at: datetime) -> str:
+    """Strong ETag from the intent revision and last update time."""
+    return f'"{revision}-{updated_at:%Y%m%d%H%M%S%f}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored and * matches any current representation."""
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(candidate == "*" or candidate.removeprefix("W/") == etag for candidate in candidates)
@@ -16,6 +16,8 @@ AssumptionConfidence = Literal["verified", "likely", "uncertain"]
 QualityPriority = Literal["must_have", "should_have", "nice_to_have"]
 InsightSourceType = Literal["sharpening", "output", "prompt", "assumption"]
 InsightStatus = Literal["pending", "incorporated", "dismissed"]
+ExampleSource = Literal["user_provided", "llm_generated", "from_output"]
+IntentChangeType = Literal["created", "updated", "deleted"]
 
 
 # --- Nested create types for intent composition (no Example) ---
@@ -225,6 +227,7 @@ class IntentResponse(BaseModel):
     )
     created_at: datetime
     updated_at: datetime
+    revision: int = Field(..., description="Incremented on every change to the intent or its entities.")
     aspects: List[AspectResponse] = Field(default_factory=list, description="Aspects (domains of consideration).")
     inputs: List[InputResponse] = Field(default_factory=list, description="Inputs the user provides.")
     choices: List[ChoiceResponse] = Field(default_factory=list, description="Decision points and choices.")
@@ -244,6 +247,7 @@ class IntentResponse(BaseModel):
                     "description": "Generate a summary of the given document.",
                     "created_at": "2025-01-01T12:00:00Z",
                     "updated_at": "2025-01-01T12:00:00Z",
+                    "revision": 1,
                     "aspects": [],
                     "inputs": [],
                     "choices": [],
@@ -275,6 +279,50 @@ class IntentUpdateDescriptionRequest(BaseModel):
     )
 
 
+MAX_BATCH_GET_IDS = 100
+
+
+class IntentBatchGetRequest(BaseModel):
+    """Request schema for fetching several intents by ID in one call."""
+
+    intent_ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_GET_IDS,
+        description=f"Intent IDs to fetch (1-{MAX_BATCH_GET_IDS}). Results follow this order.",
+    )
+
+
+class IntentBatchGetItem(BaseModel):
+    """One batch get result; intent is null when the ID was not found."""
+
+    intent_id: int = Field(..., description="The requested intent ID.")
+    found: bool = Field(..., description="Whether an intent with this ID exists.")
+    intent: Optional[IntentResponse] = Field(None, description="The intent, when found.")
+
+
+class IntentBatchGetResponse(BaseModel):
+    """Response schema for batch get, one result per requested ID in request order."""
+
+    results: List[IntentBatchGetItem]
+
+
+class IntentChangeItem(BaseModel):
+    """Latest change to one intent since the requested cursor."""
+
+    intent_id: int = Field(..., description="The changed intent ID.")
+    cursor: int = Field(..., description="Change-feed position of this change.")
+    change_type: IntentChangeType = Field(..., description="Latest kind of change to the intent.")
+    intent: Optional[IntentResponse] = Field(None, description="Current intent; null when it was deleted.")
+
+
+class IntentChangesResponse(BaseModel):
+    """Response schema for the change feed."""
+
+    changes: List[IntentChangeItem] = Field(..., description="Changed intents, ordered by cursor.")
+    cursor: int = Field(..., description="Pass as cursor on the next request to receive only later changes.")
+
+
 class IntentResponseForMCP(BaseModel):
     """Intent response for MCP (full composition, examples omitted)."""
 
@@ -283,6 +331,9 @@ class IntentResponseForMCP(BaseModel):
     description: str = Field(..., description="Full articulation of what the user wants to accomplish.")
     created_at: datetime
     updated_at: datetime
+    revision: int = Field(
+        ..., description="Incremented on every change; pass as if_revision to get_intent to skip unchanged reads."
+    )
     aspects: List[AspectResponse] = Field(default_factory=list)
     inputs: List[InputResponse] = Field(default_factory=list)
     choices: List[ChoiceResponse] = Field(default_factory=list)
@@ -324,3 +375,104 @@ class InsightCreateRequest(BaseModel):
         None,
         description="Processing state: pending, incorporated, dismissed.",
     )
+
+
+# --- Bulk transfer (NDJSON export/import) ---
+# One IntentExportRecord per line. Entity ids are the source database ids; on import
+# they are only used to remap aspect_id and insight source_*_id references.
+
+
+class _ExportEntity(BaseModel):
+    id: Optional[int] = Field(None, description="Id in the source database (used for reference remapping).")
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class AspectExport(_ExportEntity):
+    name: str = Field(..., min_length=1)
+    description: Optional[str] = None
+
+
+class InputExport(_ExportEntity):
+    name: str = Field(..., min_length=1)
+    description: str = Field(..., min_length=1)
+    aspect_id: Optional[int] = None
+    format: Optional[str] = None
+    required: bool = True
+
+
+class ChoiceExport(_ExportEntity):
+    name: str = Field(..., min_length=1)
+    description: str = Field(..., min_length=1)
+    aspect_id: Optional[int] = None
+    options: Optional[str] = None
+    selected_option: Optional[str] = None
+    rationale: Optional[str] = None
+
+
+class PitfallExport(_ExportEntity):
+    description: str = Field(..., min_length=1)
+    aspect_id: Optional[int] = None
+    mitigation: Optional[str] = None
+
+
+class AssumptionExport(_ExportEntity):
+    description: str = Field(..., min_length=1)
+    aspect_id: Optional[int] = None
+    confidence: Optional[AssumptionConfidence] = None
+
+
+class QualityExport(_ExportEntity):
+    criterion: str = Field(..., min_length=1)
+    aspect_id: Optional[int] = None
+    measurement: Optional[str] = None
+    priority: Optional[QualityPriority] = None
+
+
+class ExampleExport(_ExportEntity):
+    sample: str = Field(..., min_length=1)
+    aspect_id: Optional[int] = None
+    explanation: Optional[str] = None
+    source: Optional[ExampleSource] = None
+
+
+class OutputExport(_ExportEntity):
+    content: str = Field(..., min_length=1)
+
+
+class PromptExport(_ExportEntity):
+    content: str = Field(..., min_length=1)
+    version: int
+    outputs: List[OutputExport] = Field(default_factory=list)
+
+
+class InsightExport(_ExportEntity):
+    content: str = Field(..., min_length=1)
+    source_type: Optional[InsightSourceType] = None
+    source_output_id: Optional[int] = None
+    source_prompt_id: Optional[int] = None
+    source_assumption_id: Optional[int] = None
+    status: Optional[InsightStatus] = None
+
+
+class IntentExportRecord(_ExportEntity):
+    """One NDJSON line: an intent with its full composition, including examples, prompts and outputs."""
+
+    name: str = Field(..., min_length=1)
+    description: str = Field(..., min_length=1)
+    aspects: List[AspectExport] = Field(default_factory=list)
+    inputs: List[InputExport] = Field(default_factory=list)
+    choices: List[ChoiceExport] = Field(default_factory=list)
+    pitfalls: List[PitfallExport] = Field(default_factory=list)
+    assumptions: List[AssumptionExport] = Field(default_factory=list)
+    qualities: List[QualityExport] = Field(default_factory=list)
+    examples: List[ExampleExport] = Field(default_factory=list)
+    prompts: List[PromptExport] = Field(default_factory=list)
+    insights: List[InsightExport] = Field(default_factory=list)
+
+
+class IntentImportResponse(BaseModel):
+    """Response schema for an NDJSON import."""
+
+    imported: int = Field(..., description="Number of intents created.")
+    batches: int = Field(..., description="Number of multi-row insert batches executed.")
@@ -0,0 +1,83 @@
+"""
+Fast response serialization for intents domain (V2).
+
+Intents come from the repository already validated by the domain models, so
+responses are built as plain dicts in the field order of the response schemas
+and encoded once by pydantic-core. This skips constructing and validating one
+Pydantic model per child entity, and FastAPI's second validation against
+response_model (endpoints return the encoded Response directly).
+
+The schemas in schemas.py remain the API contract and the OpenAPI source;
+tests compare this output with theirs. Building the models with
+model_construct was measured slower than full validation for these small
+child models, which is why dicts are used.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import Response
+from pydantic_core import to_json, to_jsonable_python
+
+from .models import Intent, IntentChange
+
+
+class JSONBytesResponse(Response):
+    """Response whose content is already JSON-encoded bytes."""
+
+    media_type = "application/json"
+
+
+def intent_to_dict(intent: Intent, include_examples: bool = True) -> Dict[str, Any]:
+    """IntentResponse (or IntentResponseForMCP without examples) as a dict; datetimes are left to the encoder."""
+    result: Dict[str, Any] = {
+        "id": intent.id,
+        "name": intent.name,
+        "description": intent.description,
+        "created_at": intent.created_at,
+        "updated_at": intent.updated_at,
+        "revision": intent.revision,
+        "aspects": [{"id": a.id, "name": a.name, "description": a.description} for a in intent.aspects],
+        "inputs": [{"id": i.id, "name": i.name, "description": i.description} for i in intent.inputs],
+        "choices": [{"id": c.id, "name": c.name, "description": c.description} for c in intent.choices],
+        "pitfalls": [{"id": p.id, "description": p.description} for p in intent.pitfalls],
+        "assumptions": [{"id": a.id, "description": a.description} for a in intent.assumptions],
+        "qualities": [{"id": q.id, "criterion": q.criterion, "priority": q.priority} for q in intent.qualities],
+    }
+    if include_examples:
+        result["examples"] = [{"id": e.id, "sample": e.sample} for e in intent.examples]
+    result["prompts"] = [{"id": p.id, "version": p.version, "content": p.content} for p in intent.prompts]
+    result["insights"] = [{"id": i.id, "content": i.content, "status": i.status} for i in intent.insights]
+    return result
+
+
+def intent_to_mcp_dict(intent: Intent) -> Dict[str, Any]:
+    """IntentResponseForMCP as a JSON-ready dict (examples omitted, datetimes as ISO strings)."""
+    result = intent_to_dict(intent, include_examples=False)
+    result["created_at"] = to_jsonable_python(intent.created_at)
+    result["updated_at"] = to_jsonable_python(intent.updated_at)
+    return result
+
+
+def change_to_dict(change: IntentChange) -> Dict[str, Any]:
+    """IntentChangeItem as a dict."""
+    return {
+        "intent_id": change.intent_id,
+        "cursor": change.cursor,
+        "change_type": change.change_type,
+        "intent": intent_to_dict(change.intent) if change.intent else None,
+    }
+
+
+def batch_get_to_dict(intent_ids: List[int], intents: List[Optional[Intent]]) -> Dict[str, Any]:
+    """IntentBatchGetResponse as a dict."""
+    return {
+        "results": [
+            {"intent_id": intent_id, "found": intent is not None, "intent": intent_to_dict(intent) if intent else None}
+            for intent_id, intent in zip(intent_ids, intents)
+        ]
+    }
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> JSONBytesResponse:
+    """Encode content once with pydantic-core and wrap it in a response."""
+    return JSONBytesResponse(content=to_json(content), status_code=status_code, headers=headers)
@@ -4,10 +4,12 @@ Service layer for intents domain (V2).
 Contains business logic and serves as the public API for this domain.
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 
 from app.shared.events import event_bus
 from app.shared.logging_config import logger
+from app.shared.tracing import traced
 
 from .events import (
     InsightCreatedEvent,
@@ -18,7 +20,7 @@ from .events import (
     OutputCreatedEvent,
     PromptCreatedEvent,
 )
-from .models import Aspect, Assumption, Choice, Input, Insight, Intent, Output, Pitfall, Prompt, Quality
+from .models import Aspect, Assumption, Choice, Input, Insight, Intent, IntentChange, Output, Pitfall, Prompt, Quality
 from .repository import IntentRepository
 from .schemas import (
     AspectCreate,
@@ -95,6 +97,7 @@ def _create_quality_domain(intent_id: int, dto: QualityCreate) -> Quality:
     )
 
 
+@traced()
 async def create_intent(request: IntentCreateRequest, repository: IntentRepository) -> Intent:
     """Create a new intent (V2) with optional articulation (aspects, inputs, etc.)."""
     logger.info(
@@ -106,22 +109,24 @@ async def create_intent(request: IntentCreateRequest, repository: IntentReposito
         name=request.name,
         description=request.description,
     )
-    created_intent = await repository.create(intent)
-    assert created_intent.id is not None, "Intent ID should be set after creation"
-    intent_id = created_intent.id
-
-    for dto in request.aspects or []:
-        await repository.add_aspect(intent_id, _create_aspect_domain(intent_id, dto))
-    for dto in request.inputs or []:
-        await repository.add_input(intent_id, _create_input_domain(intent_id, dto))
-    for dto in request.choices or []:
-        await repository.add_choice(intent_id, _create_choice_domain(intent_id, dto))
-    for dto in request.pitfalls or []:
-        await repository.add_pitfall(intent_id, _create_pitfall_domain(intent_id, dto))
-    for dto in request.assumptions or []:
-        await repository.add_assumption(intent_id, _create_assumption_domain(intent_id, dto))
-    for dto in request.qualities or []:
-        await repository.add_quality(intent_id, _create_quality_domain(intent_id, dto))
+    # One revision and one change-feed entry for the intent and all its children
+    async with repository.batch_changes():
+        created_intent = await repository.create(intent)
+        assert created_intent.id is not None, "Intent ID should be set after creation"
+        intent_id = created_intent.id
+
+        for dto in request.aspects or []:
+            await repository.add_aspect(intent_id, _create_aspect_domain(intent_id, dto))
+        for dto in request.inputs or []:
+            await repository.add_input(intent_id, _create_input_domain(intent_id, dto))
+        for dto in request.choices or []:
+            await repository.add_choice(intent_id, _create_choice_domain(intent_id, dto))
+        for dto in request.pitfalls or []:
+            await repository.add_pitfall(intent_id, _create_pitfall_domain(intent_id, dto))
+        for dto in request.assumptions or []:
+            await repository.add_assumption(intent_id, _create_assumption_domain(intent_id, dto))
+        for dto in request.qualities or []:
+            await repository.add_quality(intent_id, _create_quality_domain(intent_id, dto))
 
     await event_bus.publish(
         IntentCreatedEvent(
@@ -137,12 +142,14 @@ async def create_intent(request: IntentCreateRequest, repository: IntentReposito
     return await repository.find_by_id(intent_id)
 
 
+@traced()
 async def list_intents(repository: IntentRepository) -> List[Intent]:
     """List all intents with full composition."""
     logger.info("Listing all intents")
     return await repository.list_all()
 
 
+@traced()
 async def delete_intent(intent_id: int, repository: IntentRepository) -> bool:
     """Delete an intent by ID. Returns True if deleted."""
     logger.info("Deleting intent", extra={"intent_id": intent_id})
@@ -157,6 +164,7 @@ async def delete_intent(intent_id: int, repository: IntentRepository) -> bool:
     return deleted
 
 
+@traced()
 async def get_intent(intent_id: int, repository: IntentRepository) -> Optional[Intent]:
     """Get a specific intent by ID."""
     logger.info("Looking for intent", extra={"intent_id": intent_id})
@@ -171,12 +179,52 @@ async def get_intent(intent_id: int, repository: IntentRepository) -> Optional[I
     return intent
 
 
+@traced()
+async def get_intent_version(intent_id: int, repository: IntentRepository) -> Optional[Tuple[int, datetime]]:
+    """Get an intent's (revision, updated_at) without loading its composition. None if not found."""
+    return await repository.get_version(intent_id)
+
+
+@traced()
+async def get_intents(intent_ids: List[int], repository: IntentRepository) -> List[Optional[Intent]]:
+    """Get several intents by ID. Returns one entry per requested ID in order, None where not found."""
+    logger.info("Looking for intents", extra={"intent_ids": intent_ids})
+    found = {intent.id: intent for intent in await repository.find_by_ids(intent_ids)}
+    missing = [intent_id for intent_id in intent_ids if intent_id not in found]
+    if missing:
+        logger.warning("Intents not found", extra={"intent_ids": missing})
+    return [found.get(intent_id) for intent_id in intent_ids]
+
+
+@traced()
+async def list_changes(cursor: int, limit: int, repository: IntentRepository) -> List[IntentChange]:
+    """
+    List intents changed after the change-feed cursor, one entry per intent, ordered by cursor.
+
+    Each entry carries the current intent; intent is None for deleted intents.
+    """
+    changes = await repository.list_changes(cursor, limit)
+    if changes:
+        found = {intent.id: intent for intent in await repository.find_by_ids([c.intent_id for c in changes])}
+        for change in changes:
+            change.intent = found.get(change.intent_id)
+    return changes
+
+
+@traced()
+async def get_latest_change_cursor(repository: IntentRepository) -> int:
+    """Cursor of the most recent intent change; a client starting from it only sees later changes."""
+    return await repository.get_latest_change_cursor()
+
+
+@traced()
 async def update_intent_name(intent_id: int, name: str, repository: IntentRepository) -> Optional[Intent]:
     """Update an intent's name."""
     logger.info("Updating intent name", extra={"intent_id": intent_id})
     return await _update_intent_field(intent_id, "name", lambda i: setattr(i, "name", name), repository)
 
 
+@traced()
 async def update_intent_description(intent_id: int, description: str, repository: IntentRepository) -> Optional[Intent]:
     """Update an intent's description."""
     logger.info("Updating intent description", extra={"intent_id": intent_id})
@@ -209,6 +257,7 @@ async def _update_intent_field(
     return updated
 
 
+@traced()
 async def update_intent_articulation(
     intent_id: int,
     payload: IntentArticulationUpdateRequest,
@@ -231,42 +280,45 @@ async def update_intent_articulation(
         return None
 
     # Replace only the entity types that were supplied. Articulation entities are owned by intent; aspect_id is optional.
-    if payload.inputs is not None:
-        for i in existing.inputs:
-            await repository.delete_input(intent_id, i.id)
-        for dto in payload.inputs:
-            await repository.add_input(intent_id, _create_input_domain(intent_id, dto))
-    if payload.choices is not None:
-        for c in existing.choices:
-            await repository.delete_choice(intent_id, c.id)
-        for dto in payload.choices:
-            await repository.add_choice(intent_id, _create_choice_domain(intent_id, dto))
-    if payload.pitfalls is not None:
-        for p in existing.pitfalls:
-            await repository.delete_pitfall(intent_id, p.id)
-        for dto in payload.pitfalls:
-            await repository.add_pitfall(intent_id, _create_pitfall_domain(intent_id, dto))
-    if payload.assumptions is not None:
-        for a in existing.assumptions:
-            await repository.delete_assumption(intent_id, a.id)
-        for dto in payload.assumptions:
-            await repository.add_assumption(intent_id, _create_assumption_domain(intent_id, dto))
-    if payload.qualities is not None:
-        for q in existing.qualities:
-            await repository.delete_quality(intent_id, q.id)
-        for dto in payload.qualities:
-            await repository.add_quality(intent_id, _create_quality_domain(intent_id, dto))
-    if payload.aspects is not None:
-        for a in existing.aspects:
-            await repository.delete_aspect(intent_id, a.id)
-        for dto in payload.aspects:
-            await repository.add_aspect(intent_id, _create_aspect_domain(intent_id, dto))
+    # The whole replacement is one revision bump and one change-feed entry.
+    async with repository.batch_changes():
+        if payload.inputs is not None:
+            for i in existing.inputs:
+                await repository.delete_input(intent_id, i.id)
+            for dto in payload.inputs:
+                await repository.add_input(intent_id, _create_input_domain(intent_id, dto))
+        if payload.choices is not None:
+            for c in existing.choices:
+                await repository.delete_choice(intent_id, c.id)
+            for dto in payload.choices:
+                await repository.add_choice(intent_id, _create_choice_domain(intent_id, dto))
+        if payload.pitfalls is not None:
+            for p in existing.pitfalls:
+                await repository.delete_pitfall(intent_id, p.id)
+            for dto in payload.pitfalls:
+                await repository.add_pitfall(intent_id, _create_pitfall_domain(intent_id, dto))
+        if payload.assumptions is not None:
+            for a in existing.assumptions:
+                await repository.delete_assumption(intent_id, a.id)
+            for dto in payload.assumptions:
+                await repository.add_assumption(intent_id, _create_assumption_domain(intent_id, dto))
+        if payload.qualities is not None:
+            for q in existing.qualities:
+                await repository.delete_quality(intent_id, q.id)
+            for dto in payload.qualities:
+                await repository.add_quality(intent_id, _create_quality_domain(intent_id, dto))
+        if payload.aspects is not None:
+            for a in existing.aspects:
+                await repository.delete_aspect(intent_id, a.id)
+            for dto in payload.aspects:
+                await repository.add_aspect(intent_id, _create_aspect_domain(intent_id, dto))
 
     await event_bus.publish(IntentArticulationUpdatedEvent(intent_id=intent_id))
     logger.info("Intent articulation updated", extra={"intent_id": intent_id})
     return await repository.find_by_id(intent_id)
 
 
+@traced()
 async def add_prompt(
     intent_id: int,
     request: PromptCreateRequest,
@@ -285,6 +337,7 @@ async def add_prompt(
     return created
 
 
+@traced()
 async def add_output(
     prompt_id: int,
     request: OutputCreateRequest,
@@ -302,6 +355,7 @@ async def add_output(
     return created
 
 
+@traced()
 async def add_insight(
     intent_id: int,
     request: InsightCreateRequest,
@@ -0,0 +1,242 @@
+"""
+Bulk transfer for intents domain (V2): NDJSON export and import.
+
+Export streams every intent with its full composition (including examples,
+prompts and outputs), one IntentExportRecord per line, paging through the
+table by id. Import parses NDJSON incrementally and inserts intents in
+batches with one multi-row INSERT per table, remapping entity references.
+Used by the admin router and the intents_transfer CLI.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Tuple, Union
+
+from app.shared.events import event_bus
+from app.shared.logging_config import logger
+
+from .events import IntentsImportedEvent
+from .models import Aspect, Assumption, Choice, Example, Input, Insight, Intent, Output, Pitfall, Prompt, Quality
+from .repository import IntentRepository
+from .schemas import IntentExportRecord, OutputExport
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+
+
+@dataclass
+class ImportSummary:
+    """Result of an NDJSON import."""
+
+    imported: int
+    batches: int
+
+
+def _to_export_record(intent: Intent, outputs_by_prompt: Dict[int, List[Output]]) -> IntentExportRecord:
+    record = IntentExportRecord.model_validate(intent, from_attributes=True)
+    for prompt in record.prompts:
+        prompt.outputs = [
+            OutputExport.model_validate(output, from_attributes=True) for output in outputs_by_prompt.get(prompt.id, [])
+        ]
+    return record
+
+
+def _stamps(entity) -> Dict[str, Any]:
+    return {"created_at": entity.created_at, "updated_at": entity.updated_at}
+
+
+def _to_domain(record: IntentExportRecord) -> Tuple[Intent, List[Output]]:
+    # Child ids stay the source ids so the repository can remap references;
+    # intent_id is assigned on insert.
+    source_id = record.id or 0
+    intent = Intent(
+        id=None,
+        name=record.name,
+        description=record.description,
+        **_stamps(record),
+        aspects=[
+            Aspect(id=a.id, intent_id=source_id, name=a.name, description=a.description, **_stamps(a)) for a in record.aspects
+        ],
+        inputs=[
+            Input(
+                id=e.id,
+                intent_id=source_id,
+                name=e.name,
+                description=e.description,
+                aspect_id=e.aspect_id,
+                format=e.format,
+                required=e.required,
+                **_stamps(e),
+            )
+            for e in record.inputs
+        ],
+        choices=[
+            Choice(
+                id=e.id,
+                intent_id=source_id,
+                name=e.name,
+                description=e.description,
+                aspect_id=e.aspect_id,
+                options=e.options,
+                selected_option=e.selected_option,
+                rationale=e.rationale,
+                **_stamps(e),
+            )
+            for e in record.choices
+        ],
+        pitfalls=[
+            Pitfall(
+                id=e.id,
+                intent_id=source_id,
+                description=e.description,
+                aspect_id=e.aspect_id,
+                mitigation=e.mitigation,
+                **_stamps(e),
+            )
+            for e in record.pitfalls
+        ],
+        assumptions=[
+            Assumption(
+                id=e.id,
+                intent_id=source_id,
+                description=e.description,
+                aspect_id=e.aspect_id,
+                confidence=e.confidence,
+                **_stamps(e),
+            )
+            for e in record.assumptions
+        ],
+        qualities=[
+            Quality(
+                id=e.id,
+                intent_id=source_id,
+                criterion=e.criterion,
+                aspect_id=e.aspect_id,
+                measurement=e.measurement,
+                priority=e.priority,
+                **_stamps(e),
+            )
+            for e in record.qualities
+        ],
+        examples=[
+            Example(
+                id=e.id,
+                intent_id=source_id,
+                sample=e.sample,
+                aspect_id=e.aspect_id,
+                explanation=e.explanation,
+                source=e.source,
+                **_stamps(e),
+            )
+            for e in record.examples
+        ],
+        prompts=[
+            Prompt(id=p.id, intent_id=source_id, content=p.content, version=p.version, **_stamps(p)) for p in record.prompts
+        ],
+        insights=[
+            Insight(
+                id=e.id,
+                intent_id=source_id,
+                content=e.content,
+                source_type=e.source_type,
+                source_output_id=e.source_output_id,
+                source_prompt_id=e.source_prompt_id,
+                source_assumption_id=e.source_assumption_id,
+                status=e.status,
+                **_stamps(e),
+            )
+            for e in record.insights
+        ],
+    )
+    outputs = [
+        Output(id=o.id, prompt_id=p.id, content=o.content, **_stamps(o)) for p in record.prompts for o in p.outputs if p.id
+    ]
+    return intent, outputs
+
+
+async def export_intents(
+    repository: IntentRepository, batch_size: int = DEFAULT_BATCH_SIZE
+) -> AsyncIterator[IntentExportRecord]:
+    """Yield every intent with full composition in id order, loading batch_size intents per page."""
+    logger.info("Exporting intents", extra={"batch_size": batch_size})
+    after_id, exported = 0, 0
+    while True:
+        page = await repository.list_page(after_id, batch_size)
+        if not page:
+            break
+        outputs_by_prompt: Dict[int, List[Output]] = defaultdict(list)
+        prompt_ids = [prompt.id for intent in page for prompt in intent.prompts]
+        for output in await repository.list_outputs_by_prompt_ids(prompt_ids):
+            outputs_by_prompt[output.prompt_id].append(output)
+        for intent in page:
+            yield _to_export_record(intent, outputs_by_prompt)
+        exported += len(page)
+        after_id = page[-1].id
+        if len(page) < batch_size:
+            break
+    logger.info("Intents exported", extra={"exported_count": exported})
+
+
+async def export_intents_ndjson(repository: IntentRepository, batch_size: int = DEFAULT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """Yield the export as NDJSON lines."""
+    async for record in export_intents(repository, batch_size):
+        yield record.model_dump_json().encode() + b"\n"
+
+
+async def iter_ndjson_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Split a stream of byte chunks into lines without buffering the whole body."""
+    # Pieces of the unfinished last line; only new chunks are split, so long lines stay linear
+    pending: List[bytes] = []
+    async for chunk in chunks:
+        first, newline, rest = chunk.partition(b"\n")
+        if not newline:
+            pending.append(chunk)
+            continue
+        pending.append(first)
+        yield b"".join(pending)
+        *lines, tail = rest.split(b"\n")
+        for line in lines:
+            yield line
+        pending = [tail] if tail else []
+    if pending:
+        yield b"".join(pending)
+
+
+async def import_intents(
+    lines: AsyncIterable[Union[str, bytes]],
+    repository: IntentRepository,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ImportSummary:
+    """
+    Import NDJSON intent records, inserting batch_size intents per round of multi-row INSERTs.
+
+    Blank lines are skipped. Raises ValueError naming the first invalid line; the caller's
+    transaction decides whether earlier batches are kept.
+    """
+    logger.info("Importing intents", extra={"batch_size": batch_size})
+    summary = ImportSummary(imported=0, batches=0)
+    batch: List[Tuple[Intent, List[Output]]] = []
+
+    async def flush() -> None:
+        summary.imported += len(await repository.bulk_create(batch))
+        summary.batches += 1
+        batch.clear()
+
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            batch.append(_to_domain(IntentExportRecord.model_validate_json(line)))
+        except ValueError as e:
+            logger.warning("Invalid intent import record", extra={"line_number": line_number})
+            raise ValueError(f"Invalid intent record on line {line_number}: {e}") from e
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+
+    await event_bus.publish(IntentsImportedEvent(imported_count=summary.imported, batches=summary.batches))
+    logger.info("Intents imported", extra={"imported_count": summary.imported, "batches": summary.batches})
+    return summary
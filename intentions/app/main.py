@@ -5,20 +5,29 @@ FastAPI Application Entry Point
 import os
 from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.intents import mcp_sdk_http
+from app.intents.admin_router import router as intents_admin_router
+from app.intents.change_feed import subscribe_change_notifications
 from app.intents.mcp_sse import router as mcp_sse_router
 from app.intents.mcp_sse import sse_endpoint as mcp_sse_endpoint
 from app.intents.mcp_sse import sse_message_endpoint as mcp_sse_message_endpoint
+from app.intents.mcp_sse import start_sse_sessions, stop_sse_sessions
 from app.intents.router import router as intents_router
+from app.shared.compression import RESPONSE_COMPRESSION, CompressionMiddleware
 from app.shared.database import close_db, init_db
 from app.shared.dependencies import verify_api_key
 from app.shared.exception_handlers import authentication_exception_handler, validation_exception_handler
-from app.shared.logging_config import logger
-from app.shared.middleware import log_requests_middleware
+from app.shared.logging_config import logger, start_log_pipeline, stop_log_pipeline
+from app.shared.metrics import CONTENT_TYPE, METRICS_ENABLED, registry
+from app.shared.middleware import RequestLoggingMiddleware
+from app.shared.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from app.shared.profiling import router as profiling_router
+from app.shared.query_tracking import QUERY_TRACKING, QueryTrackingMiddleware
+from app.shared.tracing import TRACING_ENABLED, TracingMiddleware
 from app.users.router import router as users_router
 
 # Get configuration from environment
@@ -44,6 +53,7 @@ CORS_ORIGINS = [
 @asynccontextmanager
 async def app_lifespan(app: FastAPI):
     """Application lifespan: init DB, run MCP session manager, then cleanup."""
+    start_log_pipeline()
     logger.info(
         "Application starting",
         extra={
@@ -54,11 +64,15 @@ async def app_lifespan(app: FastAPI):
     )
     await init_db()
     logger.info("Database initialized")
+    subscribe_change_notifications()
+    await start_sse_sessions()
     async with mcp_sdk_http.mcp_session_manager.run():
         logger.info("MCP Streamable HTTP session manager started")
         yield
+    await stop_sse_sessions()
     await close_db()
     logger.info("Application shutting down")
+    stop_log_pipeline()
 
 
 def create_application() -> FastAPI:
@@ -85,7 +99,18 @@ def create_application() -> FastAPI:
     )
 
     # Add custom middleware
-    app.middleware("http")(log_requests_middleware)
+    if QUERY_TRACKING:
+        app.add_middleware(QueryTrackingMiddleware)
+    if PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware)
+    app.add_middleware(RequestLoggingMiddleware)
+    # Outside request logging, so its log lines carry the request's trace id
+    if TRACING_ENABLED:
+        app.add_middleware(TracingMiddleware)
+
+    # Outermost, so every response (REST, both MCP transports, SSE streams) is covered
+    if RESPONSE_COMPRESSION:
+        app.add_middleware(CompressionMiddleware)
 
     # Add exception handlers
     # Note: authentication_exception_handler handles 401 errors specifically,
@@ -102,6 +127,7 @@ def create_application() -> FastAPI:
 
     app.include_router(users_router, dependencies=router_dependencies)
     app.include_router(intents_router, dependencies=router_dependencies)
+    app.include_router(intents_admin_router, dependencies=router_dependencies)
 
     # MCP Streamable HTTP endpoint.
     # Handle POST /mcp directly to avoid 307 redirects from mounted sub-app.
@@ -112,9 +138,22 @@ def create_application() -> FastAPI:
     app.mount("/mcp", mcp_sdk_http.mcp_sdk_asgi_app)
     app.include_router(mcp_sse_router)
 
+    # Prometheus scrape target; behind the API key like the routers when auth is enabled
+    if METRICS_ENABLED:
+        app.add_api_route("/metrics", metrics, methods=["GET"], dependencies=router_dependencies, include_in_schema=False)
+
+    # Sampling profiler and per-request profile downloads, behind the API key like the admin routers
+    if PROFILING_ENABLED:
+        app.include_router(profiling_router, dependencies=router_dependencies)
+
     return app
 
 
+async def metrics() -> Response:
+    """Expose in-process metrics in the Prometheus text format"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+
 # Create the application instance
 app = create_application()
 
@@ -0,0 +1,224 @@
+"""
+Response compression middleware.
+
+Pure ASGI, so streaming responses (SSE from both MCP transports, the change
+feed, the NDJSON export) stay streaming: every body chunk of a streamed
+response is compressed and flushed on its own, so an event reaches the client
+as soon as the app sends it. Complete responses smaller than the minimum size
+are sent unchanged.
+
+gzip is always available. zstd and br are offered when the optional
+zstandard / brotli packages are installed; the server's preference order
+(RESPONSE_COMPRESSION_ENCODINGS) decides among encodings the client accepts.
+"""
+
+import os
+import zlib
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _split(value: str) -> Tuple[str, ...]:
+    return tuple(item.strip().lower() for item in value.split(",") if item.strip())
+
+
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true"
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", "1024"))
+RESPONSE_COMPRESSION_ENCODINGS = _split(os.getenv("RESPONSE_COMPRESSION_ENCODINGS", "zstd,br,gzip"))
+RESPONSE_COMPRESSION_CONTENT_TYPES = _split(
+    os.getenv(
+        "RESPONSE_COMPRESSION_CONTENT_TYPES",
+        "application/json,application/x-ndjson,text/event-stream,text/plain,text/html",
+    )
+)
+# Path prefixes whose responses are never compressed (per-route opt-out)
+RESPONSE_COMPRESSION_EXCLUDED_PATHS = _split(os.getenv("RESPONSE_COMPRESSION_EXCLUDED_PATHS", ""))
+GZIP_LEVEL = int(os.getenv("RESPONSE_COMPRESSION_GZIP_LEVEL", "6"))
+ZSTD_LEVEL = int(os.getenv("RESPONSE_COMPRESSION_ZSTD_LEVEL", "3"))
+BROTLI_QUALITY = int(os.getenv("RESPONSE_COMPRESSION_BROTLI_QUALITY", "4"))
+
+
+class _GzipCompressor:
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _ZstdCompressor:
+    def __init__(self) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self) -> None:
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+COMPRESSORS: Dict[str, Callable[[], object]] = {"gzip": _GzipCompressor}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _ZstdCompressor
+if brotli is not None:
+    COMPRESSORS["br"] = _BrotliCompressor
+
+
+@lru_cache(maxsize=256)
+def select_encoding(accept_encoding: str, encodings: Tuple[str, ...] = RESPONSE_COMPRESSION_ENCODINGS) -> Optional[str]:
+    """First available encoding in server preference order that the Accept-Encoding value allows."""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip()] = quality
+    for encoding in encodings:
+        if encoding in COMPRESSORS and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """Compress eligible HTTP responses with the best encoding the client accepts."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = RESPONSE_COMPRESSION_MIN_SIZE,
+        encodings: Sequence[str] = RESPONSE_COMPRESSION_ENCODINGS,
+        content_types: Sequence[str] = RESPONSE_COMPRESSION_CONTENT_TYPES,
+        excluded_paths: Sequence[str] = RESPONSE_COMPRESSION_EXCLUDED_PATHS,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = tuple(encodings)
+        self.content_types = frozenset(content_types)
+        self.excluded_paths = tuple(excluded_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (self.excluded_paths and scope["path"].startswith(self.excluded_paths)):
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("accept-encoding")
+        encoding = select_encoding(accept_encoding, self.encodings) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSender(send, encoding, self.minimum_size, self.content_types))
+
+
+class _CompressingSender:
+    """send() wrapper that decides on the first body message whether and how to compress."""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int, content_types: frozenset) -> None:
+        self._send = send
+        self._encoding = encoding
+        self._minimum_size = minimum_size
+        self._content_types = content_types
+        self._start: Optional[Message] = None
+        self._compressor = None
+        self._passthrough = False
+
+    def _eligible(self, message: Message) -> bool:
+        if message["status"] in (204, 304) or message["status"] < 200:
+            return False
+        headers = Headers(raw=message.get("headers", []))
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+        return content_type in self._content_types
+
+    def _mark_encoded(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self._encoding
+        headers.add_vary_header("Accept-Encoding")
+        # A strong ETag promises identical bytes; the encoded body is a different representation
+        etag = headers.get("etag")
+        if etag is not None and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    async def __call__(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            if self._eligible(message):
+                self._start = message
+            else:
+                self._passthrough = True
+                await self._send(message)
+            return
+        if message_type != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._start is not None:
+            start, self._start = self._start, None
+            start = {**start, "headers": list(start.get("headers", []))}
+            headers = MutableHeaders(raw=start["headers"])
+            if not more_body and len(body) < self._minimum_size:
+                # Sent as is, but a larger body for the same URL would be encoded, so caches must still key on it
+                headers.add_vary_header("Accept-Encoding")
+                self._passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+            self._mark_encoded(headers)
+            self._compressor = COMPRESSORS[self._encoding]()
+            if not more_body:
+                body = self._compressor.compress(body) + self._compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            del headers["Content-Length"]
+            await self._send(start)
+
+        # Streamed response: flush each chunk so the client can decode it right away
+        if more_body:
+            chunk = self._compressor.compress(body) + self._compressor.flush()
+        else:
+            chunk = self._compressor.compress(body) + self._compressor.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -2,17 +2,23 @@
 Database configuration and session management.
 
 Handles SQLAlchemy async engine setup, session management, and database initialization.
-Supports SQLite (in-memory) for development and PostgreSQL for production.
+Supports SQLite (in-memory or file-backed) for development and small deployments,
+and PostgreSQL for production.
 """
 
 import os
-from typing import AsyncGenerator
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncGenerator, Dict, Optional
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import Session, declarative_base
 from sqlalchemy.pool import StaticPool
 
 from .logging_config import logger
+from .metrics import METRICS_ENABLED, current_repository_method, db_queries, db_query_duration, registry
 
 # Base class for all ORM models
 Base = declarative_base()
@@ -20,6 +26,151 @@ Base = declarative_base()
 # Global variables for engine and session factory
 _engine = None
 _session_factory = None
+_read_engine = None
+_read_session_factory = None
+
+# Session opened by get_db for the current request (None outside a request)
+_request_session: ContextVar[Optional[AsyncSession]] = ContextVar("request_session", default=None)
+
+
+@dataclass
+class PoolStats:
+    """
+    Connection pool occupancy counters.
+
+    Checkout counters are fed by pool events on the engine; the session counters
+    are fed by LazySession, which only holds a connection between its first
+    statement and the end of its transaction.
+    """
+
+    checkouts: int = 0
+    checkins: int = 0
+    checked_out: int = 0
+    peak_checked_out: int = 0
+    connection_holds: int = 0
+    sessions_without_connection: int = 0
+    connection_hold_seconds_total: float = 0.0
+    connection_hold_seconds_max: float = 0.0
+
+    def record_checkout(self) -> None:
+        self.checkouts += 1
+        self.checked_out += 1
+        if self.checked_out > self.peak_checked_out:
+            self.peak_checked_out = self.checked_out
+
+    def record_checkin(self) -> None:
+        self.checkins += 1
+        self.checked_out = max(0, self.checked_out - 1)
+
+    def record_connection_hold(self, seconds: float) -> None:
+        self.connection_holds += 1
+        self.connection_hold_seconds_total += seconds
+        if seconds > self.connection_hold_seconds_max:
+            self.connection_hold_seconds_max = seconds
+
+    def reset(self) -> None:
+        """Reset all counters (used by tests and benchmarks)."""
+        for key, value in asdict(PoolStats()).items():
+            setattr(self, key, value)
+
+
+pool_stats = PoolStats()
+
+registry.callback("db_pool_checked_out", "Connections currently checked out", lambda: pool_stats.checked_out)
+registry.callback(
+    "db_pool_checked_out_peak", "Highest number of connections checked out at once", lambda: pool_stats.peak_checked_out
+)
+registry.callback("db_pool_checkouts_total", "Connection checkouts", lambda: pool_stats.checkouts, metric_type="counter")
+registry.callback(
+    "db_connection_hold_seconds_total",
+    "Time sessions held a connection (first statement to end of transaction)",
+    lambda: pool_stats.connection_hold_seconds_total,
+    metric_type="counter",
+)
+registry.callback(
+    "db_connection_holds_total",
+    "Transactions that held a connection",
+    lambda: pool_stats.connection_holds,
+    metric_type="counter",
+)
+registry.callback(
+    "db_sessions_without_connection_total",
+    "Request sessions that finished without touching the database",
+    lambda: pool_stats.sessions_without_connection,
+    metric_type="counter",
+)
+
+
+class LazySession(Session):
+    """
+    Sync session class behind every AsyncSession created by the session factory.
+
+    SQLAlchemy only checks a connection out of the pool when the first statement
+    runs; this class records when that happens so the time a request actually
+    pins a connection can be measured. The hold time of the last transaction is
+    kept in ``session.info["connection_hold_seconds"]``.
+    """
+
+
+@event.listens_for(LazySession, "after_begin")
+def _on_connection_acquired(session: Session, transaction: Any, connection: Any) -> None:
+    session.info.setdefault("connection_acquired_at", time.perf_counter())
+
+
+@event.listens_for(LazySession, "after_transaction_end")
+def _on_transaction_end(session: Session, transaction: Any) -> None:
+    if transaction.parent is not None:
+        return
+    acquired_at = session.info.pop("connection_acquired_at", None)
+    if acquired_at is None:
+        return
+    held = time.perf_counter() - acquired_at
+    session.info["connection_hold_seconds"] = held
+    pool_stats.record_connection_hold(held)
+
+
+def _register_pool_listeners(engine) -> None:
+    """Attach checkout/checkin listeners feeding pool_stats."""
+    event.listen(engine.sync_engine, "checkout", lambda *args: pool_stats.record_checkout())
+    event.listen(engine.sync_engine, "checkin", lambda *args: pool_stats.record_checkin())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    labels = (current_repository_method.get(),)
+    db_queries.inc(labels)
+    db_query_duration.observe(time.perf_counter() - context._metrics_started, labels)
+
+
+def _register_query_listeners(engine) -> None:
+    """Attach statement listeners feeding the db_queries metrics (labelled by repository method)."""
+    if METRICS_ENABLED:
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Get a snapshot of connection pool occupancy.
+
+    Returns:
+        Dictionary of pool and session counters
+    """
+    return asdict(pool_stats)
+
+
+def get_sqlite_path() -> Optional[str]:
+    """
+    Get the SQLite database file path for the file-backed profile.
+
+    Returns:
+        Path from SQLITE_PATH, or None for the in-memory profile
+    """
+    path = os.getenv("SQLITE_PATH", "").strip()
+    return path or None
 
 
 def get_database_url() -> str:
@@ -41,10 +192,69 @@ def get_database_url() -> str:
             return database_url.replace("postgres://", "postgresql+asyncpg://", 1)
         return database_url
 
+    # Small deployments: file-backed SQLite in WAL mode
+    sqlite_path = get_sqlite_path()
+    if sqlite_path:
+        return f"sqlite+aiosqlite:///{sqlite_path}"
+
     # Development/Test: Use in-memory SQLite
     return "sqlite+aiosqlite:///:memory:"
 
 
+def _query_cache_size() -> int:
+    """Size of the engine's compiled-statement LRU cache (SQLAlchemy default: 500)."""
+    return int(os.getenv("DATABASE_QUERY_CACHE_SIZE", "500"))
+
+
+def _sqlite_pragmas(read_only: bool) -> list[str]:
+    """Build the PRAGMA statements applied to every file-backed SQLite connection."""
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))}",
+        f"PRAGMA cache_size={int(os.getenv('SQLITE_CACHE_SIZE', '-64000'))}",
+        f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', '268435456'))}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def _create_sqlite_file_engine(database_url: str, read_only: bool):
+    """
+    Create an engine for the file-backed SQLite profile.
+
+    The write engine owns exactly one connection. aiosqlite runs each connection
+    on its own thread, so all writes are serialized through a single writer and
+    concurrent writers queue on the pool instead of failing with SQLITE_BUSY.
+    The read engine keeps a small pool of query-only connections that read the
+    last committed WAL snapshot without blocking the writer.
+    """
+    pool_size = int(os.getenv("SQLITE_READ_POOL_SIZE", "4")) if read_only else 1
+    engine = create_async_engine(
+        database_url,
+        echo=False,  # Set to True for SQL query logging
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=float(os.getenv("SQLITE_POOL_TIMEOUT", "30")),
+        query_cache_size=_query_cache_size(),
+        connect_args={"check_same_thread": False},
+    )
+    pragmas = _sqlite_pragmas(read_only)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return engine
+
+
 def get_engine():
     """
     Get or create the async SQLAlchemy engine.
@@ -56,13 +266,17 @@ def get_engine():
     if _engine is None:
         database_url = get_database_url()
         is_sqlite = database_url.startswith("sqlite")
+        sqlite_path = get_sqlite_path() if is_sqlite else None
 
         # SQLite-specific configuration
-        if is_sqlite:
+        if sqlite_path:
+            _engine = _create_sqlite_file_engine(database_url, read_only=False)
+        elif is_sqlite:
             _engine = create_async_engine(
                 database_url,
                 echo=False,  # Set to True for SQL query logging
                 poolclass=StaticPool,
+                query_cache_size=_query_cache_size(),
                 connect_args={"check_same_thread": False},
             )
         else:
@@ -73,19 +287,50 @@ def get_engine():
                 pool_pre_ping=True,  # Verify connections before using
                 pool_size=5,
                 max_overflow=10,
+                query_cache_size=_query_cache_size(),
+                # asyncpg keeps server-side prepared statements per connection
+                connect_args={
+                    "prepared_statement_cache_size": int(os.getenv("DATABASE_PREPARED_STATEMENT_CACHE_SIZE", "100")),
+                },
             )
+        _register_pool_listeners(_engine)
+        _register_query_listeners(_engine)
 
         logger.info(
             "Database engine created",
             extra={
                 "database_type": "sqlite" if is_sqlite else "postgresql",
-                "database_url": database_url.split("@")[-1] if "@" in database_url else "in-memory",
+                "database_url": database_url.split("@")[-1] if "@" in database_url else sqlite_path or "in-memory",
             },
         )
 
     return _engine
 
 
+def get_read_engine():
+    """
+    Get or create the engine used for read-only work.
+
+    Only the file-backed SQLite profile has a separate read pool; every other
+    profile reads through the main engine.
+
+    Returns:
+        AsyncEngine instance
+    """
+    global _read_engine
+    if _read_engine is None:
+        if not (get_database_url().startswith("sqlite") and get_sqlite_path()):
+            return get_engine()
+        # Create the write engine first so the schema owner exists before readers connect
+        get_engine()
+        _read_engine = _create_sqlite_file_engine(get_database_url(), read_only=True)
+        _register_pool_listeners(_read_engine)
+        _register_query_listeners(_read_engine)
+        logger.info("Database read engine created", extra={"database_type": "sqlite"})
+
+    return _read_engine
+
+
 def get_session_factory() -> async_sessionmaker[AsyncSession]:
     """
     Get or create the session factory.
@@ -99,6 +344,7 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
         _session_factory = async_sessionmaker(
             engine,
             class_=AsyncSession,
+            sync_session_class=LazySession,
             expire_on_commit=False,
             autocommit=False,
             autoflush=False,
@@ -108,6 +354,31 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
     return _session_factory
 
 
+def get_read_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Get or create the session factory for read-only sessions.
+
+    Returns:
+        AsyncSessionMaker instance bound to the read engine
+    """
+    global _read_session_factory
+    if _read_session_factory is None:
+        read_engine = get_read_engine()
+        if read_engine is get_engine():
+            return get_session_factory()
+        _read_session_factory = async_sessionmaker(
+            read_engine,
+            class_=AsyncSession,
+            sync_session_class=LazySession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+        )
+        logger.info("Read session factory created")
+
+    return _read_session_factory
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency function for FastAPI to get database session.
@@ -119,6 +390,12 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     - For complex operations requiring multiple operations in a single transaction,
       all operations within a single request will share the same session and transaction
 
+    **Connection Lifetime:**
+    - The session is lazy: a pooled connection is only checked out when the first
+      statement runs, so requests that fail validation or never query hold none
+    - Routes using ``SessionReleasingRoute`` commit via ``release_db_session()`` as
+      soon as the endpoint returns, before the response body is serialized
+
     **Note:** The auto-commit behavior means that each HTTP request gets its own
     transaction boundary. If you need to perform multiple operations atomically
     across multiple requests, you'll need to implement a different transaction
@@ -129,13 +406,55 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     session_factory = get_session_factory()
     async with session_factory() as session:
+        _request_session.set(session)
         try:
             yield session
-            await session.commit()
+            if session.in_transaction():
+                await session.commit()
         except Exception:
-            await session.rollback()
+            if session.in_transaction():
+                await session.rollback()
             raise
         finally:
+            _request_session.set(None)
+            if "connection_hold_seconds" not in session.info:
+                pool_stats.sessions_without_connection += 1
+            await session.close()
+
+
+async def release_db_session() -> None:
+    """
+    Commit the current request's session and return its connection to the pool.
+
+    Safe to call when no request session is active or nothing was executed;
+    the session stays usable and lazily checks out a new connection if needed.
+    """
+    session = _request_session.get()
+    if session is not None and session.in_transaction():
+        await session.commit()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function for FastAPI to get a read-only database session.
+
+    Uses the read pool of the file-backed SQLite profile and the regular
+    engine otherwise. Nothing is committed; the transaction is simply ended.
+
+    Yields:
+        AsyncSession instance
+    """
+    session_factory = get_read_session_factory()
+    async with session_factory() as session:
+        _request_session.set(session)
+        try:
+            yield session
+        finally:
+            _request_session.set(None)
+            if session.in_transaction():
+                await session.rollback()
+            if "connection_hold_seconds" not in session.info:
+                pool_stats.sessions_without_connection += 1
             await session.close()
 
 
@@ -164,8 +483,13 @@ async def close_db() -> None:
 
     This should be called on application shutdown.
     """
-    global _engine
+    global _engine, _session_factory, _read_engine, _read_session_factory
+    if _read_engine:
+        await _read_engine.dispose()
+        _read_engine = None
+        _read_session_factory = None
     if _engine:
         await _engine.dispose()
         _engine = None
+        _session_factory = None
         logger.info("Database engine closed")
@@ -6,14 +6,17 @@ with database sessions. This allows the service layer to be infrastructure-agnos
 by receiving repositories as dependencies rather than database sessions.
 """
 
+import functools
+import inspect
 import os
 import secrets
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 from fastapi import Depends, Header, HTTPException, status
+from fastapi.routing import APIRoute
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .database import get_db
+from .database import get_db, get_read_db, release_db_session
 
 if TYPE_CHECKING:
     from app.intents.repository import IntentRepository
@@ -50,6 +53,49 @@ def get_intent_repository(db: AsyncSession = Depends(get_db)) -> "IntentReposito
     return IntentRepository(db)
 
 
+def get_read_intent_repository(db: AsyncSession = Depends(get_read_db)) -> "IntentRepository":
+    """
+    Dependency function to get an IntentRepository for read-only endpoints.
+
+    Args:
+        db: Read-only database session (injected by FastAPI)
+
+    Returns:
+        IntentRepository instance configured with a read-only session
+    """
+    from app.intents.repository import IntentRepository
+
+    return IntentRepository(db)
+
+
+def _release_session_after(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an async endpoint so the request session is committed when it returns."""
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = await endpoint(*args, **kwargs)
+        await release_db_session()
+        return result
+
+    return wrapper
+
+
+class SessionReleasingRoute(APIRoute):
+    """
+    APIRoute that releases the request's database connection before serialization.
+
+    FastAPI closes yield dependencies (and therefore commits in ``get_db``) only
+    after the response model has been validated and encoded. Routers using this
+    route class commit as soon as the endpoint returns instead, so the pooled
+    connection is not pinned while the response body is built.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = _release_session_after(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
 def verify_api_key(authorization: Optional[str] = Header(None)) -> Optional[str]:
     """
     Verify API key from Authorization header.
@@ -5,12 +5,25 @@ All significant business actions must publish domain events.
 """
 
 import asyncio
+import time
 from abc import ABC
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Callable, Dict, List
 
 from .logging_config import logger
+from .metrics import METRICS_ENABLED, registry
+from .tracing import tracer
+
+event_publish_duration = registry.histogram(
+    "event_bus_publish_duration_seconds", "Time to publish an event to all its handlers", ("event_type",)
+)
+event_handler_duration = registry.histogram(
+    "event_bus_handler_duration_seconds", "Event handler latency", ("event_type", "handler")
+)
+event_handler_failures = registry.counter(
+    "event_bus_handler_failures_total", "Event handlers that raised", ("event_type", "handler")
+)
 
 
 @dataclass
@@ -67,21 +80,33 @@ class EventBus:
         Args:
             event: The domain event to publish
         """
+        published = time.perf_counter()
         logger.info("Domain event published", extra={"event_type": event.event_type, "event_data": event.to_dict()})
 
         handlers = self._handlers.get(event.event_type, [])
         for handler in handlers:
+            started = time.perf_counter()
             try:
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(event)
-                else:
-                    handler(event)
+                with tracer.start_span(
+                    f"event {event.event_type} {handler.__name__}",
+                    attributes={"event.type": event.event_type, "event.handler": handler.__name__},
+                ):
+                    if asyncio.iscoroutinefunction(handler):
+                        await handler(event)
+                    else:
+                        handler(event)
             except Exception as e:
+                if METRICS_ENABLED:
+                    event_handler_failures.inc((event.event_type, handler.__name__))
                 logger.error(
                     "Event handler failed",
                     extra={"event_type": event.event_type, "handler": handler.__name__, "error_message": str(e)},
                     exc_info=True,
                 )
+            if METRICS_ENABLED:
+                event_handler_duration.observe(time.perf_counter() - started, (event.event_type, handler.__name__))
+        if METRICS_ENABLED:
+            event_publish_duration.observe(time.perf_counter() - published, (event.event_type,))
 
 
 # Global event bus instance
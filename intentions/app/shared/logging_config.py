@@ -1,58 +1,139 @@
 """
 Structured logging configuration for cloud-native environments.
+
+By default (LOG_ASYNC=true) records are handed to a bounded queue and
+formatted and written by a background thread (LogPipeline), so logging calls
+on the event loop do not block on JSON encoding or stdout. When the queue is
+full, records are dropped and counted instead of blocking the caller.
+
+StructuredFormatter encodes with orjson when it is installed and falls back
+to the standard library json module otherwise.
 """
 
+import atexit
+import copy
 import json
 import logging
 import os
-from datetime import datetime
-from typing import Any, Dict
+import queue
+import time
+from datetime import date, datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .metrics import registry
+from .tracing import TraceContextFilter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# How long stop() waits for the listener to make room for its stop sentinel
+LOG_STOP_TIMEOUT_SECONDS = float(os.getenv("LOG_STOP_TIMEOUT_SECONDS", "5"))
+# "orjson" (used when the orjson package is installed) or "json"
+LOG_JSON_ENCODER = os.getenv("LOG_JSON_ENCODER", "orjson").lower()
+
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_STANDARD_ATTRS = frozenset(
+    {
+        "name",
+        "msg",
+        "args",
+        "created",
+        "filename",
+        "funcName",
+        "levelname",
+        "levelno",
+        "lineno",
+        "module",
+        "msecs",
+        "message",
+        "pathname",
+        "process",
+        "processName",
+        "relativeCreated",
+        "thread",
+        "threadName",
+        "taskName",
+        "exc_info",
+        "exc_text",
+        "stack_info",
+        "getMessage",
+        "asctime",
+    }
+)
+
+
+def _json_default(value: Any) -> Any:
+    """Fallback for extras the encoder cannot serialize: never raise, log something readable."""
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return repr(value)
+
+
+# Built once: json.dumps() with any non-default argument constructs a new encoder per call
+_stdlib_dumps = json.JSONEncoder(default=_json_default, separators=(",", ":"), ensure_ascii=False).encode
+
+
+def _orjson_dumps(data: Dict[str, Any]) -> str:
+    try:
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    except orjson.JSONEncodeError:
+        # Values orjson rejects outright, e.g. integers wider than 64 bits
+        return _stdlib_dumps(data)
+
+
+JSON_ENCODERS: Dict[str, Callable[[Dict[str, Any]], str]] = {"json": _stdlib_dumps}
+if orjson is not None:
+    JSON_ENCODERS["orjson"] = _orjson_dumps
 
 
 class StructuredFormatter(logging.Formatter):
     """
     JSON formatter for structured logging.
     Perfect for cloud-native environments and log aggregation tools.
+
+    The timestamp comes from record.created (the time of the logging call, not
+    of formatting, which may happen later on the pipeline thread). Extras that
+    are not JSON-serializable are written as strings instead of failing.
     """
 
+    def __init__(self, encoder: str = LOG_JSON_ENCODER):
+        super().__init__()
+        if encoder not in JSON_ENCODERS:
+            encoder = "orjson" if orjson is not None else "json"
+        self.encoder = encoder
+        self._dumps = JSON_ENCODERS[encoder]
+        self._second: Tuple[int, str] = (-1, "")
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        cached_second, prefix = self._second
+        if second != cached_second:
+            # Records arrive in bursts within the same second; render the date part once
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}Z"
+
     def format(self, record: logging.LogRecord) -> str:
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
 
-        # Standard logging attributes to exclude from extra fields
-        standard_attrs = {
-            "name",
-            "msg",
-            "args",
-            "created",
-            "filename",
-            "funcName",
-            "levelname",
-            "levelno",
-            "lineno",
-            "module",
-            "msecs",
-            "message",
-            "pathname",
-            "process",
-            "processName",
-            "relativeCreated",
-            "thread",
-            "threadName",
-            "exc_info",
-            "exc_text",
-            "stack_info",
-            "getMessage",
-            "asctime",
-        }
-
         # Add all extra fields from the record (anything not in standard attributes)
         for key, value in record.__dict__.items():
-            if key not in standard_attrs and not key.startswith("_"):
+            if key not in _STANDARD_ATTRS and key[0] != "_":
                 # Rename 'duration' to 'duration_seconds' for clarity
                 if key == "duration":
                     log_data["duration_seconds"] = value
@@ -61,13 +142,103 @@ class StructuredFormatter(logging.Formatter):
 
         # Add exception info if present
         if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
             log_data["exception"] = {
                 "type": record.exc_info[0].__name__ if record.exc_info[0] else None,
                 "message": str(record.exc_info[1]) if record.exc_info[1] else None,
-                "traceback": self.formatException(record.exc_info),
+                "traceback": record.exc_text,
             }
 
-        return json.dumps(log_data)
+        return self._dumps(log_data)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args into the message now (they may change before the listener runs),
+        # but leave formatting and exc_info to the real formatter on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _BlockingStopQueueListener(QueueListener):
+    """QueueListener whose stop sentinel waits for room in a full queue (QueueListener uses put_nowait)."""
+
+    def __init__(self, log_queue: queue.Queue, handler: logging.Handler, stop_timeout: float):
+        super().__init__(log_queue, handler, respect_handler_level=True)
+        self.stop_timeout = stop_timeout
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel, timeout=self.stop_timeout)
+
+
+class LogPipeline:
+    """Moves formatting and output of a logger's records to a background thread."""
+
+    def __init__(self, logger: logging.Logger, handler: logging.Handler, queue_size: int = LOG_QUEUE_SIZE):
+        self.logger = logger
+        self.handler = handler
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = BoundedQueueHandler(self.queue)
+        self._listener: Optional[QueueListener] = None
+
+    @property
+    def running(self) -> bool:
+        return self._listener is not None
+
+    @property
+    def dropped(self) -> int:
+        return self.queue_handler.dropped
+
+    def start(self) -> None:
+        """Route the logger through the queue (idempotent)."""
+        if self._listener is not None:
+            return
+        self._listener = _BlockingStopQueueListener(self.queue, self.handler, LOG_STOP_TIMEOUT_SECONDS)
+        self._listener.start()
+        self.logger.removeHandler(self.handler)
+        self.logger.addHandler(self.queue_handler)
+
+    def stop(self) -> None:
+        """Write every queued record, then log synchronously again (idempotent)."""
+        if self._listener is None:
+            return
+        listener, self._listener = self._listener, None
+        # Stop enqueueing first, so the listener can make room for its sentinel in a full queue
+        self.logger.removeHandler(self.queue_handler)
+        self.logger.addHandler(self.handler)
+        try:
+            listener.stop()
+        except queue.Full:
+            # The handler is stuck for longer than the timeout; leave the (daemon) listener thread behind
+            pass
+        # Records enqueued after the listener's stop sentinel
+        while True:
+            try:
+                self.handler.handle(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            self.handler.flush()
+        except (OSError, ValueError):
+            # The stream may already be closed at interpreter exit (same as logging.shutdown)
+            pass
+        if self.dropped:
+            self.logger.warning("Log records dropped (queue full)", extra={"dropped_count": self.dropped})
 
 
 def setup_logger(name: str = "fastapi_app") -> logging.Logger:
@@ -89,6 +260,7 @@ def setup_logger(name: str = "fastapi_app") -> logging.Logger:
 
     logger = logging.getLogger(name)
     logger.addHandler(handler)
+    logger.addFilter(TraceContextFilter())
     logger.setLevel(log_level)
     logger.propagate = False  # Don't pass to root logger
 
@@ -97,3 +269,29 @@ def setup_logger(name: str = "fastapi_app") -> logging.Logger:
 
 # Create global logger instance
 logger = setup_logger()
+log_pipeline = LogPipeline(logger, logger.handlers[0])
+
+
+registry.callback(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+    lambda: log_pipeline.dropped,
+    metric_type="counter",
+)
+registry.callback("log_queue_depth", "Log records waiting for the log pipeline thread", lambda: log_pipeline.queue.qsize())
+
+
+def start_log_pipeline() -> None:
+    """Start background log output when LOG_ASYNC is enabled."""
+    if LOG_ASYNC:
+        log_pipeline.start()
+
+
+def stop_log_pipeline() -> None:
+    """Flush queued log records and return to synchronous output."""
+    log_pipeline.stop()
+
+
+start_log_pipeline()
+# Scripts without the app lifespan (CLI, stdio MCP server) still flush at exit
+atexit.register(stop_log_pipeline)
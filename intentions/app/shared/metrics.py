@@ -0,0 +1,289 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+No client library or external service: counters and histograms are plain
+objects updated on the event loop thread without locks. A label set's state
+is allocated on its first observation; after that an update is one dict
+lookup and a couple of additions (histogram buckets are found with bisect).
+
+State that already exists elsewhere (pool occupancy, SSE sessions, dropped
+log records, ...) is not copied into metrics on the hot path: modules
+register callbacks that are read when /metrics is scraped.
+"""
+
+import functools
+import inspect
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple, Union
+
+from .tracing import tracer
+
+# When false, /metrics and the SQL statement listeners are not installed and nothing is recorded
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Seconds; from sub-millisecond repository calls to slow requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+CallbackResult = Union[float, Dict[LabelValues, float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.type}"]
+
+    @abstractmethod
+    def lines(self) -> Iterator[str]:
+        """Sample lines of the exposition, without the HELP and TYPE header."""
+
+    def reset(self) -> None:
+        pass
+
+
+class Counter(_Metric):
+    """Monotonic counter per label set."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        values = self._values
+        values[labels] = values.get(labels, 0) + amount
+
+    def value(self, labels: LabelValues = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def lines(self) -> Iterator[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+    def reset(self) -> None:
+        self._values.clear()
+
+
+class Histogram(_Metric):
+    """
+    Histogram per label set.
+
+    Each label set keeps one preallocated list: a (non-cumulative) count per
+    bucket plus +Inf, followed by the sum. Buckets are made cumulative only
+    when rendered.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def count(self, labels: LabelValues = ()) -> int:
+        state = self._values.get(labels)
+        return int(sum(state[:-1])) if state else 0
+
+    def sum(self, labels: LabelValues = ()) -> float:
+        state = self._values.get(labels)
+        return state[-1] if state else 0.0
+
+    def lines(self) -> Iterator[str]:
+        bounds = [f'le="{_format_value(bound)}"' for bound in self.buckets] + ['le="+Inf"']
+        for labels, state in sorted(self._values.items()):
+            label_text = _format_labels(self.labelnames, labels)
+            # Bucket lines reuse the rendered label set: {a="x",le="0.1"}
+            bucket_prefix = f"{self.name}_bucket{label_text[:-1]}," if label_text else f"{self.name}_bucket{{"
+            cumulative = 0
+            for bound, count in zip(bounds, state):
+                cumulative += count
+                yield f"{bucket_prefix}{bound}}} {int(cumulative)}"
+            yield f"{self.name}_sum{label_text} {_format_value(state[-1])}"
+            yield f"{self.name}_count{label_text} {int(cumulative)}"
+
+    def reset(self) -> None:
+        self._values.clear()
+
+
+class CallbackMetric(_Metric):
+    """Gauge or counter whose value is read from existing state when scraped."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], CallbackResult],
+        labelnames: Sequence[str] = (),
+        metric_type: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.type = metric_type
+        self.callback = callback
+
+    def lines(self) -> Iterator[str]:
+        result = self.callback()
+        values = result if isinstance(result, dict) else {(): result}
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """Named metrics rendered together; registering an existing name returns the same metric."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name} is already registered as {existing.type}")
+            if isinstance(existing, CallbackMetric):
+                existing.callback = metric.callback
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], CallbackResult],
+        labelnames: Sequence[str] = (),
+        metric_type: str = "gauge",
+    ) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, callback, labelnames, metric_type))
+
+    def get(self, name: str) -> _Metric:
+        return self._metrics[name]
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            lines.extend(metric.header())
+            lines.extend(metric.lines())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Clear recorded values (used by tests and benchmarks)."""
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the last body chunk, by route template and status",
+    ("method", "route", "status"),
+)
+repository_call_duration = registry.histogram("repository_call_duration_seconds", "Repository method latency", ("method",))
+db_queries = registry.counter("db_queries_total", "SQL statements executed, by calling repository method", ("method",))
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "SQL statement latency, by calling repository method", ("method",)
+)
+
+# Repository method currently running (feeds the method label of SQL statement metrics)
+current_repository_method: ContextVar[str] = ContextVar("current_repository_method", default="other")
+# Function that called the outermost running repository method, e.g. "intents.service.get_intent".
+# Only looked up (one frame access per repository call) while query tracking is enabled.
+current_repository_caller: ContextVar[str] = ContextVar("current_repository_caller", default="other")
+_caller_tracking = False
+
+
+def set_caller_tracking(enabled: bool) -> None:
+    """Record the calling service function of repository methods (used by query_tracking)."""
+    global _caller_tracking
+    _caller_tracking = enabled
+
+
+def _caller_name(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module[4:] if module.startswith('app.') else module}.{frame.f_code.co_name}"
+
+
+def _timed_repository_method(label: str, func: Callable) -> Callable:
+    span_name = f"repository {label}"
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        caller_token = None
+        if _caller_tracking and current_repository_method.get() == "other":
+            caller_token = current_repository_caller.set(_caller_name(sys._getframe(1)))
+        token = current_repository_method.set(label)
+        started = time.perf_counter()
+        try:
+            with tracer.start_span(span_name, attributes={"code.function": label}):
+                return await func(*args, **kwargs)
+        finally:
+            if METRICS_ENABLED:
+                repository_call_duration.observe(time.perf_counter() - started, (label,))
+            current_repository_method.reset(token)
+            if caller_token is not None:
+                current_repository_caller.reset(caller_token)
+
+    return wrapper
+
+
+def instrument_repository(cls: type) -> type:
+    """
+    Class decorator timing (and tracing) every public async method of a repository.
+
+    SQL statements executed during a method are attributed to it (Class.method)
+    by the statement listeners in database.py and query_tracking.py.
+    """
+    for name, func in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.iscoroutinefunction(func):
+            setattr(cls, name, _timed_repository_method(f"{cls.__name__}.{name}", func))
+    return cls
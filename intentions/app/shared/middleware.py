@@ -1,66 +1,235 @@
 """
 Middleware for request/response logging and processing.
+
+RequestLoggingMiddleware logs requests as RequestLogPolicy decides, so its
+cost scales with problems rather than traffic:
+
+- routine requests (status < 400, not slow) are logged at their route's level
+  (LOG_REQUESTS_ROUTE_LEVELS, default INFO) and only for a sampled fraction
+  (LOG_REQUESTS_SAMPLE_RATE), and never for LOG_REQUESTS_EXCLUDED_PATHS;
+- client errors, server errors, failures and requests slower than
+  LOG_SLOW_REQUEST_SECONDS are always logged, whatever the path or sample.
+  LOG_SLOW_REQUEST_ROUTE_SECONDS overrides the threshold per path prefix
+  ("off" never flags); by default change-feed long-polls, which wait on
+  purpose, are never flagged.
 """
 
+import logging
+import os
+import random
 import time
+from typing import Callable, Dict, Optional, Sequence, Tuple
 
-from fastapi import Request
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .logging_config import logger
+from .metrics import METRICS_ENABLED, http_request_duration
 
 
-async def log_requests_middleware(request: Request, call_next):
-    """
-    Log all incoming requests and responses with structured data.
+def _parse_route_levels(value: str) -> Dict[str, int]:
+    """Parse "/health=DEBUG,/mcp=WARNING" into {path prefix: level}."""
+    levels: Dict[str, int] = {}
+    for item in value.split(","):
+        prefix, _, level_name = item.partition("=")
+        if not prefix.strip() or not level_name.strip():
+            continue
+        level = logging.getLevelName(level_name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level in LOG_REQUESTS_ROUTE_LEVELS: {level_name.strip()}")
+        levels[prefix.strip()] = level
+    return levels
+
+
+LOG_REQUESTS_SAMPLE_RATE = float(os.getenv("LOG_REQUESTS_SAMPLE_RATE", "1.0"))
+LOG_REQUESTS_EXCLUDED_PATHS = tuple(p.strip() for p in os.getenv("LOG_REQUESTS_EXCLUDED_PATHS", "").split(",") if p.strip())
+LOG_REQUESTS_ROUTE_LEVELS = _parse_route_levels(os.getenv("LOG_REQUESTS_ROUTE_LEVELS", ""))
+
+
+def _parse_route_seconds(value: str) -> Dict[str, float]:
+    """Parse "/intents/changes=off,/admin=5" into {path prefix: seconds}; "off" is infinity."""
+    thresholds: Dict[str, float] = {}
+    for item in value.split(","):
+        prefix, _, seconds = item.partition("=")
+        if not prefix.strip() or not seconds.strip():
+            continue
+        seconds = seconds.strip().lower()
+        try:
+            thresholds[prefix.strip()] = float("inf") if seconds == "off" else float(seconds)
+        except ValueError:
+            raise ValueError(f"Invalid threshold in LOG_SLOW_REQUEST_ROUTE_SECONDS: {seconds}") from None
+    return thresholds
+
+
+LOG_SLOW_REQUEST_SECONDS = float(os.getenv("LOG_SLOW_REQUEST_SECONDS", "1.0"))
+LOG_SLOW_REQUEST_ROUTE_SECONDS = _parse_route_seconds(os.getenv("LOG_SLOW_REQUEST_ROUTE_SECONDS", "/intents/changes=off"))
+
+
+class RequestLogPolicy:
+    """Decides whether and at which level a request is logged."""
+
+    def __init__(
+        self,
+        sample_rate: float = LOG_REQUESTS_SAMPLE_RATE,
+        excluded_paths: Sequence[str] = LOG_REQUESTS_EXCLUDED_PATHS,
+        route_levels: Optional[Dict[str, int]] = None,
+        slow_seconds: float = LOG_SLOW_REQUEST_SECONDS,
+        slow_route_seconds: Optional[Dict[str, float]] = None,
+        random_func: Callable[[], float] = random.random,
+    ):
+        self.sample_rate = sample_rate
+        self.excluded_paths = tuple(excluded_paths)
+        # Longest prefix first, so "/intents/changes" can override "/intents"
+        levels = LOG_REQUESTS_ROUTE_LEVELS if route_levels is None else route_levels
+        self.route_levels: Tuple[Tuple[str, int], ...] = tuple(sorted(levels.items(), key=lambda item: -len(item[0])))
+        self.slow_seconds = slow_seconds
+        slow_routes = LOG_SLOW_REQUEST_ROUTE_SECONDS if slow_route_seconds is None else slow_route_seconds
+        self.slow_routes: Tuple[Tuple[str, float], ...] = tuple(sorted(slow_routes.items(), key=lambda item: -len(item[0])))
+        self._random = random_func
+
+    def route_level(self, path: str) -> int:
+        for prefix, level in self.route_levels:
+            if path.startswith(prefix):
+                return level
+        return logging.INFO
+
+    def slow_threshold(self, path: str) -> float:
+        """Time to first byte from which a request on this path is slow."""
+        for prefix, seconds in self.slow_routes:
+            if path.startswith(prefix):
+                return seconds
+        return self.slow_seconds
+
+    def sample(self, path: str) -> bool:
+        """Whether the routine lines of this request are logged (decided when it arrives)."""
+        if self.excluded_paths and path.startswith(self.excluded_paths):
+            return False
+        if not logger.isEnabledFor(self.route_level(path)):
+            return False
+        return self.sample_rate >= 1.0 or self._random() < self.sample_rate
 
-    Args:
-        request: The FastAPI request object
-        call_next: Function to call the next middleware/route handler
+    def completion_level(self, path: str, status_code: int, duration: float, sampled: bool) -> Optional[int]:
+        """Level for the completion line, or None to skip it; duration is the time to first byte."""
+        if status_code >= 500 or duration >= self.slow_threshold(path):
+            return logging.WARNING
+        if status_code >= 400:
+            return max(self.route_level(path), logging.INFO)
+        return self.route_level(path) if sampled else None
 
-    Returns:
-        Response from the route handler
+
+request_log_policy = RequestLogPolicy()
+
+
+class RequestLoggingMiddleware:
+    """
+    Pure ASGI request timing and logging, as decided by request_log_policy.
+
+    Unlike a call_next middleware, the response is not re-wrapped in a stream
+    and a background task, so streaming responses pass through untouched.
+    Timing uses the monotonic perf_counter_ns: time to first byte (when the
+    app starts the response; this is what the slow threshold applies to, so
+    long-lived SSE streams are not flagged) and total duration until the last
+    body chunk. response_size counts body bytes as sent by the app, i.e.
+    before compression.
     """
-    start_time = time.time()
-
-    # Log incoming request with structured data
-    logger.info(
-        "Incoming request",
-        extra={
-            "method": request.method,
-            "path": request.url.path,
-            "client_ip": request.client.host if request.client else "unknown",
-            "user_agent": request.headers.get("user-agent", "unknown"),
-            "origin": request.headers.get("origin", None),
-        },
-    )
-
-    # Process the request
-    try:
-        response = await call_next(request)
-        duration = time.time() - start_time
-
-        # Log response with structured data
-        logger.info(
-            "Request completed",
-            extra={
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "duration": round(duration, 3),
-            },
-        )
-
-        return response
-    except Exception as e:
-        duration = time.time() - start_time
-        logger.error(
-            "Request failed",
-            extra={
-                "method": request.method,
-                "path": request.url.path,
-                "duration": round(duration, 3),
-                "error_message": str(e),
-            },
-            exc_info=True,
-        )
-        raise
+
+    def __init__(self, app: ASGIApp, policy: Optional[RequestLogPolicy] = None):
+        self.app = app
+        self.policy = policy
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.policy or request_log_policy
+        start_ns = time.perf_counter_ns()
+        path = scope["path"]
+        headers = Headers(scope=scope)
+        client = scope.get("client")
+        request_data = {
+            "method": scope["method"],
+            "path": path,
+            "client_ip": client[0] if client else "unknown",
+            "user_agent": headers.get("user-agent", "unknown"),
+            "origin": headers.get("origin", None),
+        }
+        sampled = policy.sample(path)
+
+        # Log incoming request with structured data
+        if sampled:
+            logger.log(policy.route_level(path), "Incoming request", extra=request_data)
+
+        status_code = 500
+        first_byte_ns = 0
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, first_byte_ns, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                first_byte_ns = time.perf_counter_ns()
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        # Process the request
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            duration = (time.perf_counter_ns() - start_ns) / 1e9
+            logger.error(
+                "Request failed",
+                extra={
+                    **request_data,
+                    "duration": round(duration, 3),
+                    "error_message": str(e),
+                },
+                exc_info=True,
+            )
+            raise
+        finally:
+            # status_code stays 500 when the app raised before starting the response
+            self._observe_duration(scope, status_code, start_ns)
+
+        self._log_completion(policy, request_data, sampled, status_code, start_ns, first_byte_ns, response_size)
+
+    @staticmethod
+    def _observe_duration(scope: Scope, status_code: int, start_ns: int) -> None:
+        if not METRICS_ENABLED:
+            return
+        # Route template (set on the scope by the router), so ids in paths do not explode the label set
+        route = getattr(scope.get("route"), "path", "<unmatched>")
+        http_request_duration.observe((time.perf_counter_ns() - start_ns) / 1e9, (scope["method"], route, str(status_code)))
+
+    @staticmethod
+    def _log_completion(
+        policy: RequestLogPolicy,
+        request_data: Dict,
+        sampled: bool,
+        status_code: int,
+        start_ns: int,
+        first_byte_ns: int,
+        response_size: int,
+    ) -> None:
+        """Log the completion line if the policy asks for it."""
+        end_ns = time.perf_counter_ns()
+        path = request_data["path"]
+        ttfb = ((first_byte_ns or end_ns) - start_ns) / 1e9
+        level = policy.completion_level(path, status_code, ttfb, sampled)
+        if level is None:
+            return
+        extra = {
+            "method": request_data["method"],
+            "path": path,
+            "status_code": status_code,
+            "duration": round((end_ns - start_ns) / 1e9, 3),
+            "ttfb_seconds": round(ttfb, 3),
+            "response_size": response_size,
+        }
+        if ttfb >= policy.slow_threshold(path):
+            extra["slow"] = True
+        if not sampled:
+            # The incoming line was skipped; keep the client details on this one
+            extra.update(request_data)
+        logger.log(level, "Request completed", extra=extra)
@@ -0,0 +1,248 @@
+"""
+On-demand profiling without a redeploy (standard library only).
+
+- Sampling profiler: POST /admin/profile?seconds=N samples the event loop
+  thread's stack every PROFILE_SAMPLE_INTERVAL_MS from a background thread for
+  N seconds and returns the samples as collapsed stacks ("a;b;c 42" per
+  line), the input format of flamegraph.pl, speedscope and similar viewers.
+  Sampling reads sys._current_frames(), so the application is not slowed
+  down beyond the sampler thread's own (GIL) time.
+- Per-request cProfile: a request with the X-Profile header is run under
+  cProfile by ProfilingMiddleware (REST routers and both MCP transports). The
+  response carries X-Profile-Id; GET /admin/profile/requests/{id} returns the
+  report (or the raw pstats data). cProfile sees the whole event loop thread,
+  so work of concurrent requests during that request is included.
+
+Profiling is off by default (PROFILING_ENABLED). Both are gated by
+verify_api_key: the routes through the router dependencies like every other
+admin route, the header by checking the request's Authorization header
+(without a valid key the header is ignored). With API key auth disabled,
+anyone could profile any request, so the routes answer 403 and the header is
+ignored unless PROFILING_ALLOW_UNAUTHENTICATED opts in (local development).
+"""
+
+import asyncio
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse, Response
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .dependencies import verify_api_key
+from .logging_config import logger
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+# Honour X-Profile while API key auth is disabled (never in a shared deployment)
+PROFILING_ALLOW_UNAUTHENTICATED = os.getenv("PROFILING_ALLOW_UNAUTHENTICATED", "false").lower() == "true"
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+# Per-request profiles kept for download (oldest evicted first)
+PROFILE_MAX_STORED = int(os.getenv("PROFILE_MAX_STORED", "20"))
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "x-profile-id"
+
+
+def _collapse(frame) -> str:
+    """Collapsed stack of a frame, outermost first: "module:function;module:function"."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}")
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+class StackSampler:
+    """Samples one thread's stack at a fixed interval from a daemon thread."""
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL_MS / 1000, thread_id: Optional[int] = None):
+        self.interval = interval
+        # The thread to sample; the thread calling start() by default
+        self.thread_id = thread_id
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            raise RuntimeError("Sampler is already running")
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+                self.samples += 1
+            # Drop the reference so the sampled frames can be freed
+            frame = None
+
+    def collapsed(self) -> str:
+        """Samples in the collapsed-stack format, most frequent stack first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiles:
+    """Most recent per-request cProfile results, by profile id."""
+
+    def __init__(self, max_stored: int = PROFILE_MAX_STORED):
+        self.max_stored = max_stored
+        self._profiles: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def add(self, profile_id: str, stats: Dict) -> None:
+        self._profiles[profile_id] = stats
+        while len(self._profiles) > self.max_stored:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        return self._profiles.get(profile_id)
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+
+request_profiles = RequestProfiles()
+_sampler_lock = asyncio.Lock()
+
+
+def _authorized(headers: Headers) -> bool:
+    if os.getenv("ENABLE_API_KEY_AUTH", "false").lower() != "true":
+        return PROFILING_ALLOW_UNAUTHENTICATED
+    try:
+        verify_api_key(headers.get("authorization"))
+    except HTTPException:
+        return False
+    return True
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware running requests that send X-Profile under cProfile."""
+
+    def __init__(self, app: ASGIApp, profiles: Optional[RequestProfiles] = None):
+        self.app = app
+        self.profiles = profiles or request_profiles
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if PROFILE_HEADER not in headers or not _authorized(headers):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER.encode(), profile_id.encode())]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiled request (or profiler) is active on this thread
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            profiler.create_stats()
+            self.profiles.add(profile_id, profiler.stats)
+            logger.info(
+                "Request profiled",
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "profile_id": profile_id,
+                    "duration": round(time.perf_counter() - started, 3),
+                },
+            )
+
+
+def _require_authorized(request: Request) -> None:
+    """Router dependency: the routes follow the same rule as the X-Profile header."""
+    if not _authorized(request.headers):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Profiling needs API key auth or PROFILING_ALLOW_UNAUTHENTICATED=true",
+        )
+
+
+router = APIRouter(prefix="/admin/profile", tags=["admin"], dependencies=[Depends(_require_authorized)])
+
+
+@router.post("", response_class=PlainTextResponse, operation_id="sampleProfile")
+async def sample_profile(
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(PROFILE_SAMPLE_INTERVAL_MS, ge=1, le=100),
+):
+    """Sample the event loop's stack for the given time and return collapsed stacks (flamegraph input)."""
+    if _sampler_lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already being captured")
+    async with _sampler_lock:
+        sampler = StackSampler(interval=interval_ms / 1000)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+    logger.info("Profile captured", extra={"duration": seconds, "samples": sampler.samples})
+    filename = f"profile-{time.strftime('%Y%m%dT%H%M%S')}.collapsed"
+    return PlainTextResponse(sampler.collapsed(), headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@router.get("/requests/{profile_id}", operation_id="getRequestProfile")
+async def get_request_profile(
+    profile_id: str,
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+    limit: int = Query(50, ge=1, le=1000),
+    raw: bool = Query(False, description="Return the pstats data (load with pstats.Stats) instead of a text report"),
+):
+    """Report of a request profiled with the X-Profile header."""
+    stats = request_profiles.get(profile_id)
+    if stats is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Profile {profile_id} not found")
+    if raw:
+        return Response(
+            content=marshal.dumps(stats),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'},
+        )
+    report = io.StringIO()
+    profile_stats = pstats.Stats(stream=report)
+    profile_stats.stats = stats
+    profile_stats.get_top_level_stats()
+    profile_stats.sort_stats(sort).print_stats(limit)
+    return PlainTextResponse(report.getvalue())
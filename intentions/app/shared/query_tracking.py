@@ -0,0 +1,218 @@
+"""
+Opt-in SQL statement tracking and N+1 detection.
+
+With QUERY_TRACKING=true every HTTP request gets a QueryTracker: each SQL
+statement is recorded with its duration, the repository method running it
+and the service function that called that method. A request that runs more
+than QUERY_BUDGET statements, or the same statement QUERY_REPEAT_THRESHOLD
+times or more (the N+1 pattern: one query per item of a list), is logged as
+a warning with a per-method breakdown.
+
+Tests use track_queries() / assert_max_queries() (see the query_tracker and
+assert_max_queries fixtures in tests/conftest.py) to pin query counts.
+
+Tracking hooks the Engine class events, so it covers every engine
+(including test engines); it costs one frame lookup per repository call and
+a small record per statement, which is why it is off by default. The hooks
+are reference counted: they are removed again when the last tracking block
+exits (the middleware holds them for the app's lifetime).
+"""
+
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .logging_config import logger
+from .metrics import current_repository_caller, current_repository_method, set_caller_tracking
+
+QUERY_TRACKING = os.getenv("QUERY_TRACKING", "false").lower() == "true"
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "50"))
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "10"))
+
+
+@dataclass
+class QueryRecord:
+    """One executed SQL statement."""
+
+    statement: str
+    duration: float
+    repository_method: str
+    caller: str
+
+
+@dataclass
+class QueryTracker:
+    """Statements recorded while the tracker is active."""
+
+    queries: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_duration(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def by_repository_method(self) -> Dict[str, int]:
+        return dict(Counter(query.repository_method for query in self.queries))
+
+    def by_caller(self) -> Dict[str, int]:
+        return dict(Counter(query.caller for query in self.queries))
+
+    def repeated_statements(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statements executed at least threshold times, most repeated first (likely N+1)."""
+        counts = Counter(query.statement for query in self.queries)
+        return [(statement, count) for statement, count in counts.most_common() if count >= threshold]
+
+    def summary(self) -> Dict[str, object]:
+        """Counts and timings for a log line or an assertion message."""
+        return {
+            "query_count": self.count,
+            "query_seconds": round(self.total_duration, 4),
+            "queries_by_method": self.by_repository_method(),
+            "queries_by_caller": self.by_caller(),
+        }
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by assert_max_queries when a block runs more statements than allowed."""
+
+
+# Tracker of the current request or block, and trackers that see every statement (test fixtures)
+_current_tracker: ContextVar[Optional[QueryTracker]] = ContextVar("current_query_tracker", default=None)
+_global_trackers: List[QueryTracker] = []
+# Active users of the listeners (track_queries blocks, middlewares); listening while > 0
+_tracking_users = 0
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._query_tracking_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    tracker = _current_tracker.get()
+    if tracker is None and not _global_trackers:
+        return
+    started = getattr(context, "_query_tracking_started", None)
+    record = QueryRecord(
+        statement=statement,
+        duration=time.perf_counter() - started if started is not None else 0.0,
+        repository_method=current_repository_method.get(),
+        caller=current_repository_caller.get(),
+    )
+    if tracker is not None:
+        tracker.queries.append(record)
+    for global_tracker in _global_trackers:
+        if global_tracker is not tracker:
+            global_tracker.queries.append(record)
+
+
+def enable_query_tracking() -> None:
+    """Attach the statement listeners to every engine; pair each call with disable_query_tracking()."""
+    global _tracking_users
+    _tracking_users += 1
+    if _tracking_users > 1:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    set_caller_tracking(True)
+
+
+def disable_query_tracking() -> None:
+    """Release one enable_query_tracking(); the listeners are detached when the last user releases."""
+    global _tracking_users
+    if _tracking_users == 0:
+        return
+    _tracking_users -= 1
+    if _tracking_users > 0:
+        return
+    event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+    set_caller_tracking(False)
+
+
+def query_tracking_enabled() -> bool:
+    return _tracking_users > 0
+
+
+@contextmanager
+def track_queries(all_contexts: bool = False) -> Iterator[QueryTracker]:
+    """
+    Record the statements run inside the block.
+
+    Args:
+        all_contexts: Also record statements from other tasks and threads
+            (e.g. an app served by TestClient), not only this context
+
+    Yields:
+        The QueryTracker filled while the block runs
+    """
+    enable_query_tracking()
+    tracker = QueryTracker()
+    token = _current_tracker.set(tracker)
+    if all_contexts:
+        _global_trackers.append(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+        if all_contexts:
+            _global_trackers.remove(tracker)
+        disable_query_tracking()
+
+
+@contextmanager
+def assert_max_queries(budget: int, all_contexts: bool = False) -> Iterator[QueryTracker]:
+    """Fail with a per-method breakdown when the block runs more than budget statements."""
+    with track_queries(all_contexts=all_contexts) as tracker:
+        yield tracker
+    if tracker.count > budget:
+        details = "\n".join(f"  {count:>4}  {method}" for method, count in sorted(tracker.by_repository_method().items()))
+        raise QueryBudgetExceeded(f"Expected at most {budget} queries, ran {tracker.count}:\n{details}")
+
+
+class QueryTrackingMiddleware:
+    """Pure ASGI middleware tracking the statements of each HTTP request and warning about outliers."""
+
+    def __init__(self, app: ASGIApp, budget: int = QUERY_BUDGET, repeat_threshold: int = QUERY_REPEAT_THRESHOLD):
+        self.app = app
+        self.budget = budget
+        self.repeat_threshold = repeat_threshold
+        # Held for the app's lifetime
+        enable_query_tracking()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        tracker = QueryTracker()
+        token = _current_tracker.set(tracker)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_tracker.reset(token)
+            self._report(scope, tracker)
+
+    def _report(self, scope: Scope, tracker: QueryTracker) -> None:
+        if not tracker.count:
+            return
+        extra = {"method": scope["method"], "path": scope["path"], **tracker.summary()}
+        repeated = tracker.repeated_statements(self.repeat_threshold)
+        if tracker.count > self.budget:
+            logger.warning("Query budget exceeded", extra={**extra, "query_budget": self.budget})
+        if repeated:
+            statement, count = repeated[0]
+            logger.warning(
+                "Repeated query (possible N+1)", extra={**extra, "repeated_statement": statement, "repeat_count": count}
+            )
+        if tracker.count <= self.budget and not repeated:
+            logger.debug("Request queries", extra=extra)
@@ -0,0 +1,372 @@
+"""
+Lightweight tracing with OpenTelemetry-compatible spans.
+
+Spans use OpenTelemetry's data model: 128-bit trace ids, 64-bit span ids,
+parent ids, kind, attributes, status and nanosecond timestamps. Context
+crosses process boundaries as a W3C traceparent header. Finished spans go to
+an exporter that works offline:
+
+- memory: the last TRACING_MAX_SPANS spans, kept for tests and debugging;
+- console: one structured log line per span through the app logger.
+
+Instrumented: HTTP requests (TracingMiddleware), MCP tool calls, service
+functions (@traced), repository methods, SQL statements and EventBus
+handlers. The current span lives in a contextvar, so it follows awaits and
+is copied into tasks created with asyncio.create_task. Event handlers run
+inline in EventBus.publish and nest under the publishing span.
+
+Sampling is decided once per trace at the root (TRACING_SAMPLE_RATE) or
+taken from an incoming traceparent. Spans of unsampled traces only mark the
+context (no ids, timestamps or export), and with TRACING_ENABLED=false every
+call returns one shared no-op span. Log records written inside a recording
+span carry its trace_id and span_id (TraceContextFilter).
+"""
+
+import functools
+import logging
+import os
+import random
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+# "memory" or "console"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "memory").lower()
+TRACING_MAX_SPANS = int(os.getenv("TRACING_MAX_SPANS", "1000"))
+# SQL text is truncated in db.statement to keep span size bounded
+MAX_STATEMENT_LENGTH = 1000
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes", "status", "_token")
+
+    recording = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = "unset"
+        self._token = None
+
+    @property
+    def duration_seconds(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str) -> None:
+        self.status = status
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.record_exception(exc)
+        _current_span.reset(self._token)
+        self.end()
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            tracer.exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """OTLP-style JSON representation."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+class _NonRecordingSpan:
+    """Stand-in span of an unsampled trace; it stays current so children are not sampled either."""
+
+    recording = False
+    trace_id = None
+    span_id = None
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def __enter__(self) -> "_NonRecordingSpan":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_span.reset(self._token)
+
+    def end(self) -> None:
+        pass
+
+
+class _NoopSpan(_NonRecordingSpan):
+    """Returned while tracing is disabled; does not even touch the context."""
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Any]] = ContextVar("current_span", default=None)
+
+
+class InMemorySpanExporter:
+    """Keeps the most recent finished spans."""
+
+    def __init__(self, max_spans: int = TRACING_MAX_SPANS):
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        return [span for span in self._spans if trace_id is None or span.trace_id == trace_id]
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class ConsoleSpanExporter:
+    """Writes each finished span as a structured log line."""
+
+    def __init__(self, span_logger: Optional[logging.Logger] = None):
+        # The app logger, looked up by name: logging_config imports metrics, which imports this module
+        self.logger = span_logger or logging.getLogger("fastapi_app")
+
+    def export(self, span: Span) -> None:
+        self.logger.info(
+            "Span finished", extra={"span": span.to_dict(), "span_duration_seconds": round(span.duration_seconds, 6)}
+        )
+
+
+EXPORTERS = {"memory": InMemorySpanExporter, "console": ConsoleSpanExporter}
+
+
+class Tracer:
+    """Creates spans under the current context, applying the sampling decision."""
+
+    def __init__(self, enabled: bool = TRACING_ENABLED, sample_rate: float = TRACING_SAMPLE_RATE, exporter: Any = None):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.exporter = exporter if exporter is not None else EXPORTERS.get(TRACING_EXPORTER, InMemorySpanExporter)()
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[Tuple[str, str, bool]] = None,
+    ):
+        """
+        Create a span; use it as a context manager to make it current.
+
+        Args:
+            name: Span name
+            kind: "server", "client" or "internal"
+            attributes: Initial attributes
+            parent: (trace_id, span_id, sampled) from an incoming traceparent,
+                used instead of the current span
+
+        Returns:
+            A Span, or a non-recording span when disabled or not sampled
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            current = _current_span.get()
+            if current is not None:
+                if not current.recording:
+                    return _NonRecordingSpan()
+                trace_id, parent_id, sampled = current.trace_id, current.span_id, True
+            else:
+                trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+                sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        if not sampled:
+            return _NonRecordingSpan()
+        return Span(name, trace_id, parent_id, kind, attributes if attributes is not None else {})
+
+
+tracer = Tracer()
+
+
+def start_span(name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None):
+    """Start a span under the current one on the global tracer."""
+    return tracer.start_span(name, kind, attributes)
+
+
+def current_span():
+    """The span of the current context (None outside any span)."""
+    return _current_span.get()
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent span_id, sampled) from a W3C traceparent header, or None if absent/invalid."""
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+def inject(headers: Dict[str, str]) -> Dict[str, str]:
+    """Add the current span's traceparent to outgoing headers (no-op outside a recording span)."""
+    span = _current_span.get()
+    if span is not None and span.recording:
+        headers["traceparent"] = span.traceparent
+    return headers
+
+
+class TraceContextFilter(logging.Filter):
+    """Adds trace_id and span_id to records logged inside a recording span (on the calling thread, before queueing)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = _current_span.get()
+        if span is not None and span.recording:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return True
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator wrapping an async function in an internal span (default name: module.function)."""
+
+    def decorator(func: Callable) -> Callable:
+        module = func.__module__
+        span_name = name or f"{module[4:] if module.startswith('app.') else module}.{func.__name__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return await func(*args, **kwargs)
+            with tracer.start_span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware opening a server span per HTTP request (continuing an incoming traceparent)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        enable_sql_spans()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        parent = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        span = tracer.start_span(
+            f"{method} {scope['path']}",
+            kind="server",
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+            parent=parent,
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_status("error")
+            await send(message)
+
+        with span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None and span.recording:
+                    span.name = f"{method} {route.path}"
+                    span.set_attribute("http.route", route.path)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    span = tracer.start_span(
+        "db.query",
+        kind="client",
+        attributes={"db.system": conn.dialect.name, "db.statement": statement[:MAX_STATEMENT_LENGTH]},
+    )
+    if span.recording:
+        context._tracing_span = span
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    span = getattr(context, "_tracing_span", None)
+    if span is not None:
+        span.end()
+
+
+def _handle_error(exception_context) -> None:
+    span = getattr(exception_context.execution_context, "_tracing_span", None)
+    if span is not None:
+        span.record_exception(exception_context.original_exception)
+        span.end()
+
+
+_sql_spans = False
+
+
+def enable_sql_spans() -> None:
+    """Trace SQL statements on every engine (idempotent)."""
+    global _sql_spans
+    if _sql_spans:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _sql_spans = True
@@ -9,10 +9,13 @@ from typing import List, Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.shared.metrics import instrument_repository
+
 from .db_models import UserDBModel
 from .models import User
 
 
+@instrument_repository
 class UserRepository:
     """
     Repository for user data access using SQLAlchemy.
@@ -8,7 +8,7 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.shared.dependencies import get_user_repository
+from app.shared.dependencies import SessionReleasingRoute, get_user_repository
 
 from . import service
 from .repository import UserRepository
@@ -17,6 +17,7 @@ from .schemas import UserCreateRequest, UserResponse, UserUpdateRequest
 router = APIRouter(
     prefix="/users",
     tags=["users"],
+    route_class=SessionReleasingRoute,
 )
 
 
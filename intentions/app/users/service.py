@@ -8,6 +8,7 @@ from typing import List, Optional
 
 from app.shared.events import event_bus
 from app.shared.logging_config import logger
+from app.shared.tracing import traced
 
 from .events import UserCreatedEvent, UserDeletedEvent, UserUpdatedEvent
 from .models import User
@@ -15,6 +16,7 @@ from .repository import UserRepository
 from .schemas import UserCreateRequest, UserUpdateRequest
 
 
+@traced()
 async def get_all_users(repository: UserRepository) -> List[User]:
     """
     Get all users.
@@ -31,6 +33,7 @@ async def get_all_users(repository: UserRepository) -> List[User]:
     return users
 
 
+@traced()
 async def get_user(user_id: int, repository: UserRepository) -> Optional[User]:
     """
     Get a specific user by ID.
@@ -53,6 +56,7 @@ async def get_user(user_id: int, repository: UserRepository) -> Optional[User]:
     return user
 
 
+@traced()
 async def create_user(request: UserCreateRequest, repository: UserRepository) -> User:
     """
     Create a new user.
@@ -92,6 +96,7 @@ async def create_user(request: UserCreateRequest, repository: UserRepository) ->
     return created_user
 
 
+@traced()
 async def update_user(user_id: int, request: UserUpdateRequest, repository: UserRepository) -> Optional[User]:
     """
     Update an existing user.
@@ -138,6 +143,7 @@ async def update_user(user_id: int, request: UserUpdateRequest, repository: User
     return updated_user
 
 
+@traced()
 async def delete_user(user_id: int, repository: UserRepository) -> bool:
     """
     Delete a user.
@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the intentions backend.
+
+Benchmarks run offline against SQLite and are not collected by pytest.
+Run them from the intentions/ directory, e.g. ``python -m benchmarks.bench_sqlite_profiles``.
+"""
@@ -0,0 +1,218 @@
+"""
+Shared helpers for benchmark scripts.
+
+Provides timing primitives, result formatting, JSON result files with
+baseline comparison, and database profile switching.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.intents import db_models as _intents_db_models  # noqa: F401 - register all intents tables
+from app.shared import database
+from app.shared.logging_config import logger
+from app.users import db_models as _users_db_models  # noqa: F401 - register users table
+
+DATABASE_PROFILES = ("memory", "sqlite-file")
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing samples for one benchmark case."""
+
+    name: str
+    samples_ns: List[int] = field(default_factory=list)
+    total_seconds: float = 0.0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def iterations(self) -> int:
+        return len(self.samples_ns)
+
+    @property
+    def mean_us(self) -> float:
+        return statistics.fmean(self.samples_ns) / 1000 if self.samples_ns else 0.0
+
+    def percentile_us(self, pct: float) -> float:
+        if not self.samples_ns:
+            return 0.0
+        ordered = sorted(self.samples_ns)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index] / 1000
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.iterations / self.total_seconds if self.total_seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "iterations": self.iterations,
+            "mean_us": round(self.mean_us, 3),
+            "p50_us": round(self.percentile_us(50), 3),
+            "p95_us": round(self.percentile_us(95), 3),
+            "p99_us": round(self.percentile_us(99), 3),
+            "ops_per_second": round(self.ops_per_second, 1),
+            **self.extra,
+        }
+
+
+def measure(name: str, func: Callable[[], Any], iterations: int, warmup: int = 10) -> BenchmarkResult:
+    """Time a synchronous callable."""
+    for _ in range(warmup):
+        func()
+    result = BenchmarkResult(name=name)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter_ns()
+        func()
+        result.samples_ns.append(time.perf_counter_ns() - t0)
+    result.total_seconds = time.perf_counter() - started
+    return result
+
+
+async def measure_async(
+    name: str,
+    func: Callable[[], Awaitable[Any]],
+    iterations: int,
+    warmup: int = 5,
+    concurrency: int = 1,
+) -> BenchmarkResult:
+    """Time an async callable, optionally running several workers concurrently."""
+    for _ in range(warmup):
+        await func()
+    result = BenchmarkResult(name=name, extra={"concurrency": concurrency})
+    remaining = iterations
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            t0 = time.perf_counter_ns()
+            await func()
+            result.samples_ns.append(time.perf_counter_ns() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.total_seconds = time.perf_counter() - started
+    return result
+
+
+def quiet_logging(level: str = "WARNING") -> None:
+    """Raise the app logger level so log I/O does not dominate the measurements."""
+    logger.setLevel(level)
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """Render results as a fixed-width table."""
+    header = f"{'benchmark':<56} {'iters':>7} {'mean us':>10} {'p95 us':>10} {'ops/s':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.name:<56} {r.iterations:>7} {r.mean_us:>10.1f} {r.percentile_us(95):>10.1f} {r.ops_per_second:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def save_results(path: str, results: List[BenchmarkResult], metadata: Optional[Dict[str, Any]] = None) -> None:
+    """Write results (and the run's metadata) as JSON, e.g. to keep as a baseline."""
+    document = {
+        "metadata": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            **(metadata or {}),
+        },
+        "results": [result.as_dict() for result in results],
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    """Results of a file written by save_results, by benchmark name."""
+    with open(path) as f:
+        return {result["name"]: result for result in json.load(f)["results"]}
+
+
+@dataclass
+class Comparison:
+    """One benchmark against its baseline; change is relative (0.25 = 25% slower)."""
+
+    name: str
+    baseline_us: float
+    current_us: float
+
+    @property
+    def change(self) -> float:
+        return self.current_us / self.baseline_us - 1 if self.baseline_us else 0.0
+
+
+def compare_results(
+    results: List[BenchmarkResult], baseline: Dict[str, Dict[str, Any]], metric: str = "p50_us"
+) -> List[Comparison]:
+    """Compare results with a loaded baseline on one latency metric; cases missing from the baseline are skipped."""
+    comparisons = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is not None and metric in previous:
+            comparisons.append(Comparison(result.name, previous[metric], result.as_dict()[metric]))
+    return comparisons
+
+
+def format_comparison(comparisons: List[Comparison], threshold: float) -> str:
+    """Render comparisons as a table, marking changes slower than the threshold."""
+    header = f"{'benchmark':<56} {'baseline us':>12} {'current us':>12} {'change':>9}"
+    lines = [header, "-" * len(header)]
+    for c in comparisons:
+        flag = "  REGRESSION" if c.change > threshold else ""
+        lines.append(f"{c.name:<56} {c.baseline_us:>12.1f} {c.current_us:>12.1f} {c.change:>+9.1%}{flag}")
+    return "\n".join(lines)
+
+
+async def _reset_database_globals() -> None:
+    await database.close_db()
+    database._engine = None
+    database._session_factory = None
+    database._read_engine = None
+    database._read_session_factory = None
+
+
+@asynccontextmanager
+async def database_profile(profile: str, directory: Optional[str] = None) -> AsyncIterator[None]:
+    """
+    Point the app's global engine at a fresh database for the given profile.
+
+    Args:
+        profile: "memory" (in-memory SQLite, StaticPool) or "sqlite-file" (WAL file profile)
+        directory: Directory for the SQLite file (a temporary one by default)
+    """
+    if profile not in DATABASE_PROFILES:
+        raise ValueError(f"Unknown database profile: {profile}")
+    saved = {key: os.environ.get(key) for key in ("DATABASE_TYPE", "SQLITE_PATH")}
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        os.environ["DATABASE_TYPE"] = "sqlite"
+        if profile == "sqlite-file":
+            os.environ["SQLITE_PATH"] = os.path.join(tmp, "bench.db")
+        else:
+            os.environ.pop("SQLITE_PATH", None)
+        await _reset_database_globals()
+        await database.init_db()
+        try:
+            yield
+        finally:
+            await _reset_database_globals()
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
@@ -0,0 +1,70 @@
+"""
+Benchmark: Accept header normalization in front of the SDK Streamable HTTP transport.
+
+Compares the byte-level _normalize_accept_header with the former
+implementation (decode the header, copy the header list and scope on every
+request), kept here as the baseline. Cases:
+
+- "complete": spec-compliant clients sending both transport types (hot path);
+- "partial": clients accepting only application/json (rewritten);
+- "missing": no Accept header (added).
+
+Usage:
+    python -m benchmarks.bench_accept_header [--iterations 50000]
+"""
+
+import argparse
+from typing import List
+
+from app.intents.mcp_sdk_http import _MCP_ACCEPT, _normalize_accept_header
+
+from ._common import BenchmarkResult, format_results, measure
+
+
+def legacy_normalize_accept_header(scope: dict) -> dict:
+    """The former decode-and-copy implementation, kept here as the baseline."""
+    headers = list(scope.get("headers", []))
+    accept_index = None
+    accept_value = None
+    for i, (key, value) in enumerate(headers):
+        if key.lower() == b"accept":
+            accept_index = i
+            accept_value = value.decode(errors="ignore").lower()
+            break
+    if accept_value is None:
+        headers.append((b"accept", b"application/json, text/event-stream"))
+    else:
+        has_json = "application/json" in accept_value
+        has_sse = "text/event-stream" in accept_value
+        has_wildcard = "*/*" in accept_value or "application/*" in accept_value
+        if not (has_json and has_sse) and (has_wildcard or has_json or has_sse):
+            headers[accept_index] = (b"accept", b"application/json, text/event-stream")
+    new_scope = dict(scope)
+    new_scope["headers"] = headers
+    return new_scope
+
+
+def _scope(accept: List[tuple]) -> dict:
+    headers = [(b"host", b"localhost"), (b"user-agent", b"mcp-client"), (b"content-type", b"application/json")]
+    return {"type": "http", "method": "POST", "path": "/mcp", "headers": headers + accept}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    cases = {
+        "complete": _scope([(b"accept", _MCP_ACCEPT)]),
+        "partial": _scope([(b"accept", b"application/json")]),
+        "missing": _scope([]),
+    }
+    results: List[BenchmarkResult] = []
+    for case, scope in cases.items():
+        for variant, func in (("legacy", legacy_normalize_accept_header), ("current", _normalize_accept_header)):
+            results.append(measure(f"accept {case} {variant}", lambda: func(scope), args.iterations))
+    print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: response compression and compact MCP JSON for large intents.
+
+Seeds one intent with many prompts and insights, then:
+
+- calls GET /intents/{id} through the full ASGI app (including the
+  compression middleware) once per Accept-Encoding and reports bytes on the
+  wire and request latency;
+- times each available compressor on the same body to isolate CPU cost;
+- compares the MCP get_intent text indented (the former format) and compact.
+
+zstd and br rows appear only when the zstandard / brotli packages are installed.
+
+Usage:
+    python -m benchmarks.bench_compression [--prompts 60] [--iterations 200]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List, Optional
+
+from app.intents import service
+from app.intents.mcp_server import _intent_to_dict_for_mcp
+from app.intents.repository import IntentRepository
+from app.intents.schemas import AspectCreate, InsightCreateRequest, IntentCreateRequest, PromptCreateRequest
+from app.main import app
+from app.shared.compression import COMPRESSORS
+from app.shared.database import get_session_factory
+
+from ._common import BenchmarkResult, database_profile, format_results, measure, quiet_logging
+
+_PARAGRAPH = (
+    "Summarize the quarterly report for an executive audience, keeping the tone neutral, "
+    "highlighting risks first and citing the section each claim comes from. "
+)
+
+
+async def _seed(prompts: int) -> int:
+    async with get_session_factory()() as session:
+        repository = IntentRepository(session)
+        request = IntentCreateRequest(
+            name="Large intent",
+            description=_PARAGRAPH * 4,
+            aspects=[AspectCreate(name=f"Aspect {a}", description=_PARAGRAPH) for a in range(10)],
+        )
+        intent = await service.create_intent(request, repository)
+        for n in range(prompts):
+            await service.add_prompt(intent.id, PromptCreateRequest(content=f"Version {n}. " + _PARAGRAPH * 6), repository)
+            await service.add_insight(intent.id, InsightCreateRequest(content=f"Insight {n}. " + _PARAGRAPH), repository)
+        await session.commit()
+        return intent.id
+
+
+async def _get(path: str, accept_encoding: Optional[str]) -> int:
+    """Run one GET through the app; returns the number of body bytes sent."""
+    headers = [(b"host", b"bench")]
+    if accept_encoding:
+        headers.append((b"accept-encoding", accept_encoding.encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "scheme": "http",
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+        "headers": headers,
+    }
+    size = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def run_http(intent_id: int, iterations: int) -> List[BenchmarkResult]:
+    results = []
+    path = f"/intents/{intent_id}"
+    for encoding in ["identity", *sorted(COMPRESSORS)]:
+        result = BenchmarkResult(name=f"GET /intents/{{id}} Accept-Encoding: {encoding}")
+        size = await _get(path, encoding)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            t0 = time.perf_counter_ns()
+            await _get(path, encoding)
+            result.samples_ns.append(time.perf_counter_ns() - t0)
+        result.total_seconds = time.perf_counter() - started
+        result.extra["wire_bytes"] = size
+        results.append(result)
+    return results
+
+
+def run_compressors(body: bytes, iterations: int) -> List[BenchmarkResult]:
+    results = []
+    for encoding, factory in sorted(COMPRESSORS.items()):
+
+        def compress(factory=factory) -> bytes:
+            compressor = factory()
+            return compressor.compress(body) + compressor.finish()
+
+        result = measure(f"compress {len(body)} B with {encoding}", compress, iterations)
+        result.extra["wire_bytes"] = len(compress())
+        results.append(result)
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=60)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    quiet_logging()
+    async with database_profile("memory"):
+        intent_id = await _seed(args.prompts)
+        results = await run_http(intent_id, args.iterations)
+        async with get_session_factory()() as session:
+            intent = await service.get_intent(intent_id, IntentRepository(session))
+        mcp_dict = _intent_to_dict_for_mcp(intent)
+
+    rest_body = json.dumps(mcp_dict, separators=(",", ":")).encode()
+    results += run_compressors(rest_body, args.iterations)
+    print(format_results(results))
+    print()
+    for result in results:
+        print(f"{result.name:<64} {result.extra['wire_bytes']:>10} B")
+
+    indented = json.dumps(mcp_dict, indent=2).encode()
+    compact = json.dumps(mcp_dict, separators=(",", ":")).encode()
+    print(f"\nMCP get_intent text: indent=2 {len(indented)} B, compact {len(compact)} B")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
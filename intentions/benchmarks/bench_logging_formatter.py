@@ -0,0 +1,125 @@
+"""
+Benchmark: StructuredFormatter cost per record.
+
+Formats a typical request-log record (a handful of extras) and one with an
+exception, with:
+
+- "legacy": the former formatter, kept here as the baseline (set literal
+  rebuilt per call, datetime.utcnow(), json.dumps with default settings);
+- "json": the current formatter with the standard library encoder;
+- "orjson": the current formatter with orjson (only when installed).
+
+Usage:
+    python -m benchmarks.bench_logging_formatter [--iterations 100000]
+"""
+
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime
+from typing import Any, Dict, List
+
+from app.shared.logging_config import JSON_ENCODERS, StructuredFormatter
+
+from ._common import BenchmarkResult, format_results, measure
+
+
+class LegacyStructuredFormatter(logging.Formatter):
+    """The former StructuredFormatter.format, kept here as the baseline."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_data: Dict[str, Any] = {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        standard_attrs = {
+            "name",
+            "msg",
+            "args",
+            "created",
+            "filename",
+            "funcName",
+            "levelname",
+            "levelno",
+            "lineno",
+            "module",
+            "msecs",
+            "message",
+            "pathname",
+            "process",
+            "processName",
+            "relativeCreated",
+            "thread",
+            "threadName",
+            "exc_info",
+            "exc_text",
+            "stack_info",
+            "getMessage",
+            "asctime",
+        }
+        for key, value in record.__dict__.items():
+            if key not in standard_attrs and not key.startswith("_"):
+                if key == "duration":
+                    log_data["duration_seconds"] = value
+                else:
+                    log_data[key] = value
+        if record.exc_info:
+            log_data["exception"] = {
+                "type": record.exc_info[0].__name__ if record.exc_info[0] else None,
+                "message": str(record.exc_info[1]) if record.exc_info[1] else None,
+                "traceback": self.formatException(record.exc_info),
+            }
+        return json.dumps(log_data)
+
+
+def _request_record() -> logging.LogRecord:
+    record = logging.LogRecord("fastapi_app", logging.INFO, __file__, 1, "Request completed", None, None)
+    record.__dict__.update(
+        {
+            "method": "GET",
+            "path": "/intents/42",
+            "status_code": 200,
+            "duration": 0.0042,
+            "client_host": "127.0.0.1",
+            "request_id": "6f1c2a9e-3d4b-4c55-9a0e-1b2c3d4e5f60",
+        }
+    )
+    return record
+
+
+def _exception_record() -> logging.LogRecord:
+    try:
+        raise ValueError("Intent 42 not found")
+    except ValueError:
+        exc_info = sys.exc_info()
+    return logging.LogRecord("fastapi_app", logging.ERROR, __file__, 1, "Failed", None, exc_info)
+
+
+def run(iterations: int) -> List[BenchmarkResult]:
+    formatters: Dict[str, logging.Formatter] = {"legacy": LegacyStructuredFormatter()}
+    for encoder in JSON_ENCODERS:
+        formatters[encoder] = StructuredFormatter(encoder)
+
+    results = []
+    for label, make_record in (("request record", _request_record), ("exception record", _exception_record)):
+        record = make_record()
+        for name, formatter in formatters.items():
+            # The current formatter caches the traceback on the record like logging.Formatter; measure it uncached
+            results.append(
+                measure(f"{label}: {name}", lambda: (setattr(record, "exc_text", None), formatter.format(record)), iterations)
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+    print(format_results(run(args.iterations)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: request throughput with logging off, synchronous and queued.
+
+Drives GET /intents/{id} through the full ASGI app (middleware request lines
+plus service lines, at least four records per request) against in-memory
+SQLite. Log output goes to a file in a temporary directory, or to stderr with
+--stderr (which shows the cost of a blocking terminal or pipe).
+
+- off: logger level WARNING, nothing is formatted or written
+- sync: INFO, StructuredFormatter and the write run on the event loop thread
+- queue: INFO, records are queued and formatted/written by LogPipeline's thread
+
+Usage:
+    python -m benchmarks.bench_logging_pipeline [--requests 2000] [--concurrency 8] [--stderr]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+from typing import List
+
+from app.intents import service
+from app.intents.repository import IntentRepository
+from app.intents.schemas import AspectCreate, IntentCreateRequest
+from app.main import app
+from app.shared.database import get_session_factory
+from app.shared.logging_config import log_pipeline, logger
+
+from ._common import BenchmarkResult, database_profile, format_results, measure_async
+
+
+async def _seed() -> int:
+    async with get_session_factory()() as session:
+        request = IntentCreateRequest(
+            name="Logged intent", description="Benchmark intent", aspects=[AspectCreate(name=f"Aspect {a}") for a in range(5)]
+        )
+        intent = await service.create_intent(request, IntentRepository(session))
+        await session.commit()
+        return intent.id
+
+
+async def _get(path: str) -> None:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "scheme": "http",
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+        "headers": [(b"host", b"bench")],
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def run_mode(mode: str, path: str, requests: int, concurrency: int) -> BenchmarkResult:
+    log_pipeline.stop()
+    logger.setLevel(logging.WARNING if mode == "off" else logging.INFO)
+    if mode == "queue":
+        log_pipeline.start()
+    dropped_before = log_pipeline.dropped
+    result = await measure_async(f"GET /intents/{{id}} logging {mode}", lambda: _get(path), requests, concurrency=concurrency)
+    # Include the time to drain what is still queued so the comparison stays honest
+    log_pipeline.stop()
+    result.extra["dropped"] = log_pipeline.dropped - dropped_before
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--stderr", action="store_true", help="Write logs to stderr instead of a file")
+    args = parser.parse_args()
+
+    results: List[BenchmarkResult] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        stream = sys.stderr if args.stderr else open(os.path.join(tmp, "app.log"), "w")
+        previous = log_pipeline.handler.setStream(stream)
+        try:
+            async with database_profile("memory"):
+                path = f"/intents/{await _seed()}"
+                for mode in ("off", "sync", "queue"):
+                    results.append(await run_mode(mode, path, args.requests, args.concurrency))
+        finally:
+            log_pipeline.handler.setStream(previous)
+            if stream is not sys.stderr:
+                stream.close()
+
+    print(format_results(results), file=sys.stdout)
+    for result in results:
+        if result.extra["dropped"]:
+            print(f"{result.name}: {result.extra['dropped']} records dropped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
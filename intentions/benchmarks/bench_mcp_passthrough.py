@@ -0,0 +1,160 @@
+"""
+Benchmark: buffered versus passthrough POST /mcp responses.
+
+Seeds intents so that the list_intents tool returns a large result, then calls
+the POST /mcp handler through raw ASGI and records time-to-first-byte, total
+time and peak traced memory. "buffered" is the former handler, which collected
+every body chunk and re-wrapped them in a new Response; "passthrough" is the
+current handler, which lets the SDK write to the client directly. Both JSON and
+SSE response modes of the SDK are measured.
+
+Usage:
+    python -m benchmarks.bench_mcp_passthrough [--intents 500] [--iterations 20]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import Callable, List
+
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.intents import mcp_sdk_http, service
+from app.intents.repository import IntentRepository
+from app.intents.schemas import AspectCreate, IntentCreateRequest, QualityCreate
+from app.shared.database import get_session_factory
+
+from ._common import BenchmarkResult, database_profile, format_results, quiet_logging
+
+_BODY = json.dumps(
+    {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "list_intents", "arguments": {}}}
+).encode()
+
+
+async def _buffered_handler(request: Request) -> Response:
+    """The former POST /mcp handler, kept here as the baseline."""
+    response_status: int | None = None
+    response_headers: list[tuple[bytes, bytes]] = []
+    body_chunks: list[bytes] = []
+
+    async def _send(message: dict) -> None:
+        nonlocal response_status, response_headers
+        if message["type"] == "http.response.start":
+            response_status = message["status"]
+            response_headers = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            body_chunks.append(message.get("body", b""))
+
+    scope = mcp_sdk_http._normalize_accept_header(request.scope)
+    await mcp_sdk_http.mcp_session_manager.handle_request(scope, request.receive, _send)
+
+    headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in response_headers}
+    return Response(content=b"".join(body_chunks), status_code=response_status or 500, headers=headers)
+
+
+async def _seed(count: int) -> None:
+    async with get_session_factory()() as session:
+        repository = IntentRepository(session)
+        for n in range(count):
+            request = IntentCreateRequest(
+                name=f"Intent {n}",
+                description="Benchmark intent " * 10,
+                aspects=[AspectCreate(name=f"Aspect {a}", description="aspect " * 10) for a in range(5)],
+                qualities=[QualityCreate(criterion=f"Criterion {q}") for q in range(5)],
+            )
+            await service.create_intent(request, repository)
+        await session.commit()
+
+
+async def _call(handler: Callable) -> tuple[int, int, int]:
+    """Run one request; returns (ttfb_ns, total_ns, body_bytes)."""
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/mcp",
+        "raw_path": b"/mcp",
+        "query_string": b"",
+        "root_path": "",
+        "scheme": "http",
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+        "headers": [(b"content-type", b"application/json"), (b"host", b"bench")],
+    }
+    sent = False
+
+    async def receive() -> dict:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": _BODY, "more_body": False}
+        await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    started = time.perf_counter_ns()
+    first_byte = 0
+    size = 0
+
+    async def send(message: dict) -> None:
+        nonlocal first_byte, size
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_byte = first_byte or time.perf_counter_ns()
+            size += len(message["body"])
+
+    response = await handler(Request(scope, receive))
+    await response(scope, receive, send)
+    return first_byte - started, time.perf_counter_ns() - started, size
+
+
+async def run_case(name: str, handler: Callable, iterations: int) -> List[BenchmarkResult]:
+    await _call(handler)
+    ttfb = BenchmarkResult(name=f"{name}: time to first byte")
+    total = BenchmarkResult(name=f"{name}: full response")
+    started = time.perf_counter()
+    for _ in range(iterations):
+        first, whole, size = await _call(handler)
+        ttfb.samples_ns.append(first)
+        total.samples_ns.append(whole)
+    ttfb.total_seconds = total.total_seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    await _call(handler)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total.extra.update(body_bytes=size, peak_traced_kib=round(peak / 1024))
+    return [ttfb, total]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--intents", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    quiet_logging()
+    results: List[BenchmarkResult] = []
+    async with database_profile("memory"):
+        await _seed(args.intents)
+        for mode, json_response in (("json", True), ("sse", False)):
+            mcp_sdk_http.mcp_session_manager = StreamableHTTPSessionManager(
+                app=mcp_sdk_http.server,
+                json_response=json_response,
+                stateless=True,
+                security_settings=mcp_sdk_http._SECURITY_SETTINGS,
+            )
+            async with mcp_sdk_http.mcp_session_manager.run():
+                results += await run_case(f"{mode} buffered", _buffered_handler, args.iterations)
+                results += await run_case(f"{mode} passthrough", mcp_sdk_http.mcp_sdk_request_handler, args.iterations)
+
+    print(format_results(results))
+    print()
+    for result in results:
+        if "peak_traced_kib" in result.extra:
+            print(f"{result.name:<56} body {result.extra['body_bytes']:>10} B  peak {result.extra['peak_traced_kib']:>8} KiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Benchmark: agent-style MCP loops in stateless versus stateful session mode.
+
+Drives POST /mcp through the full ASGI app. Each agent step reads its working
+intent several times and then modifies it (add_insight), like an agent
+refining one intent. In stateless mode every request spins up a fresh server
+session; in stateful mode the session is initialized once and repeated reads
+are served from the per-session intent cache until the write invalidates it.
+
+Usage:
+    python -m benchmarks.bench_mcp_sessions [--steps 200] [--reads-per-write 4]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import httpx
+
+from app.intents import mcp_sdk_http, mcp_sessions, service
+from app.intents.repository import IntentRepository
+from app.intents.schemas import AspectCreate, IntentCreateRequest
+from app.main import app
+from app.shared.database import get_session_factory
+
+from ._common import BenchmarkResult, database_profile, format_results, quiet_logging
+
+
+async def _seed() -> int:
+    async with get_session_factory()() as session:
+        request = IntentCreateRequest(
+            name="Working intent",
+            description="Benchmark intent",
+            aspects=[AspectCreate(name=f"Aspect {a}") for a in range(5)],
+        )
+        intent = await service.create_intent(request, IntentRepository(session))
+        await session.commit()
+        return intent.id
+
+
+def _tool_call(name: str, arguments: dict) -> dict:
+    return {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": name, "arguments": arguments}}
+
+
+async def _open_session(client: httpx.AsyncClient) -> Dict[str, str]:
+    response = await client.post(
+        "/mcp",
+        json={
+            "jsonrpc": "2.0",
+            "id": 0,
+            "method": "initialize",
+            "params": {"protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "bench", "version": "0"}},
+        },
+    )
+    headers = {"mcp-session-id": response.headers["mcp-session-id"]}
+    await client.post("/mcp", json={"jsonrpc": "2.0", "method": "notifications/initialized"}, headers=headers)
+    return headers
+
+
+async def run_mode(stateful: bool, steps: int, reads_per_write: int) -> List[BenchmarkResult]:
+    mode = "stateful" if stateful else "stateless"
+    mcp_sessions.MCP_STATEFUL_SESSIONS = stateful
+    mcp_sessions.session_caches.clear()
+    mcp_sdk_http.mcp_session_manager = mcp_sdk_http.create_session_manager(stateful)
+    read = BenchmarkResult(name=f"{mode}: get_intent")
+    write = BenchmarkResult(name=f"{mode}: add_insight")
+    step = BenchmarkResult(name=f"{mode}: agent step ({reads_per_write} reads + 1 write)")
+
+    async with database_profile("memory"), mcp_sdk_http.mcp_session_manager.run():
+        intent_id = await _seed()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            headers = await _open_session(client) if stateful else {}
+
+            async def call(result: BenchmarkResult, payload: dict) -> None:
+                t0 = time.perf_counter_ns()
+                response = await client.post("/mcp", json=payload, headers=headers)
+                result.samples_ns.append(time.perf_counter_ns() - t0)
+                response.raise_for_status()
+
+            started = time.perf_counter()
+            for n in range(steps):
+                t0 = time.perf_counter_ns()
+                for _ in range(reads_per_write):
+                    await call(read, _tool_call("get_intent", {"intent_id": intent_id}))
+                await call(write, _tool_call("add_insight", {"intent_id": intent_id, "content": f"Insight {n}"}))
+                step.samples_ns.append(time.perf_counter_ns() - t0)
+            step.total_seconds = time.perf_counter() - started
+            if stateful:
+                read.extra["cache_hits"] = mcp_sessions.session_caches.get(headers["mcp-session-id"]).hits
+
+    for result in (read, write):
+        result.total_seconds = sum(result.samples_ns) / 1e9
+    return [read, write, step]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--reads-per-write", type=int, default=4)
+    args = parser.parse_args()
+
+    quiet_logging()
+    results = await run_mode(False, args.steps, args.reads_per_write)
+    results += await run_mode(True, args.steps, args.reads_per_write)
+    print(format_results(results))
+    for result in results:
+        if "cache_hits" in result.extra:
+            print(f"\n{result.name}: {result.extra['cache_hits']} of {result.iterations} reads served from the session cache")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
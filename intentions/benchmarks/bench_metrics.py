@@ -0,0 +1,57 @@
+"""
+Benchmark: cost of metrics on the hot path and of a scrape.
+
+Times Counter.inc and Histogram.observe for an existing label set (the
+steady state on every request), the repository method wrapper around a no-op
+coroutine, and rendering /metrics with many route/status label sets.
+
+Usage:
+    python -m benchmarks.bench_metrics [--iterations 200000] [--routes 50]
+"""
+
+import argparse
+import asyncio
+from typing import List
+
+from app.shared.metrics import MetricsRegistry, _timed_repository_method
+
+from ._common import BenchmarkResult, format_results, measure, measure_async
+
+
+async def _noop() -> None:
+    return None
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--routes", type=int, default=50)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter("bench_total", "Benchmark counter", ("tool", "outcome"))
+    histogram = registry.histogram("bench_seconds", "Benchmark histogram", ("method", "route", "status"))
+    labels = ("GET", "/intents/{intent_id}", "200")
+    counter_labels = ("get_intent", "ok")
+    timed_noop = _timed_repository_method("Bench.noop", _noop)
+
+    results: List[BenchmarkResult] = [
+        measure("Counter.inc (existing label set)", lambda: counter.inc(counter_labels), args.iterations),
+        measure("Histogram.observe (existing label set)", lambda: histogram.observe(0.0042, labels), args.iterations),
+        await measure_async("await no-op coroutine", _noop, args.iterations),
+        await measure_async("await instrumented no-op repository method", timed_noop, args.iterations),
+    ]
+
+    for n in range(args.routes):
+        for status in ("200", "404", "500"):
+            histogram.observe(0.01, ("GET", f"/route/{n}", status))
+    render = measure(f"render with {args.routes * 3 + 1} histogram label sets", registry.render, 200)
+    render.extra["bytes"] = len(registry.render())
+    results.append(render)
+
+    print(format_results(results))
+    print(f"\n/metrics body: {render.extra['bytes']} B")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
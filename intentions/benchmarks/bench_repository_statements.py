@@ -0,0 +1,87 @@
+"""
+Benchmark: per-call statement construction versus module-level cached statements.
+
+Compares building the find_by_id select() with its nine selectinload options on
+every call against executing the prebuilt statement from the repository with
+bound parameters. Measures construction + cache-key generation on its own (the
+Python overhead paid before the compiled cache is consulted) and the full
+repository call against the in-memory database.
+
+Usage:
+    python -m benchmarks.bench_repository_statements [--intents 50] [--iterations 5000]
+"""
+
+import argparse
+import asyncio
+import random
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.intents import repository as intents_repository
+from app.intents.db_models import IntentDBModel
+from app.intents.repository import IntentRepository
+from app.shared.database import get_session_factory
+
+from ._common import BenchmarkResult, database_profile, format_results, measure, measure_async, quiet_logging
+from .bench_sqlite_profiles import _seed
+
+
+def _build_find_by_id(intent_id: int):
+    # The statement as the repository built it before caching
+    return (
+        select(IntentDBModel)
+        .options(
+            selectinload(IntentDBModel.aspects),
+            selectinload(IntentDBModel.inputs),
+            selectinload(IntentDBModel.choices),
+            selectinload(IntentDBModel.pitfalls),
+            selectinload(IntentDBModel.assumptions),
+            selectinload(IntentDBModel.qualities),
+            selectinload(IntentDBModel.examples),
+            selectinload(IntentDBModel.prompts),
+            selectinload(IntentDBModel.insights),
+        )
+        .where(IntentDBModel.id == intent_id)
+    )
+
+
+async def run(intents: int, iterations: int) -> List[BenchmarkResult]:
+    cached = intents_repository._FIND_INTENT_BY_ID
+    results = [
+        measure("build + cache key: per call", lambda: _build_find_by_id(1)._generate_cache_key(), iterations),
+        measure("build + cache key: cached statement", lambda: cached._generate_cache_key(), iterations),
+    ]
+
+    async with database_profile("memory"):
+        ids = await _seed(intents)
+        async with get_session_factory()() as session:
+            repository = IntentRepository(session)
+
+            async def per_call() -> None:
+                result = await session.execute(_build_find_by_id(random.choice(ids)))
+                result.scalar_one_or_none()
+                session.expunge_all()
+
+            async def cached_call() -> None:
+                await repository.find_by_id(random.choice(ids))
+                session.expunge_all()
+
+            results.append(await measure_async("find_by_id: per-call statement", per_call, iterations // 5))
+            results.append(await measure_async("find_by_id: cached statement", cached_call, iterations // 5))
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--intents", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    quiet_logging()
+    print(format_results(await run(args.intents, args.iterations)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+"""
+Benchmark: per-request overhead of the request logging middleware.
+
+Serves a small JSON endpoint and a 20-chunk streamed endpoint from minimal
+FastAPI apps through raw ASGI:
+
+- "none": no logging middleware (the floor);
+- "call_next": the former @app.middleware("http") function, kept here as the
+  baseline (Starlette's BaseHTTPMiddleware machinery, time.time());
+- "asgi": the current pure ASGI RequestLoggingMiddleware.
+
+App logging is at WARNING so the numbers isolate middleware machinery from
+log output (which bench_logging_pipeline covers).
+
+Usage:
+    python -m benchmarks.bench_request_middleware [--iterations 5000]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from app.shared.logging_config import logger
+from app.shared.middleware import RequestLoggingMiddleware, request_log_policy
+
+from ._common import BenchmarkResult, format_results, measure_async, quiet_logging
+
+
+async def legacy_log_requests_middleware(request: Request, call_next):
+    """The former log_requests_middleware, kept here as the baseline."""
+    start_time = time.time()
+    path = request.url.path
+    request_data = {
+        "method": request.method,
+        "path": path,
+        "client_ip": request.client.host if request.client else "unknown",
+        "user_agent": request.headers.get("user-agent", "unknown"),
+        "origin": request.headers.get("origin", None),
+    }
+    sampled = request_log_policy.sample(path)
+    if sampled:
+        logger.log(request_log_policy.route_level(path), "Incoming request", extra=request_data)
+    try:
+        response = await call_next(request)
+        duration = time.time() - start_time
+        level = request_log_policy.completion_level(path, response.status_code, duration, sampled)
+        if level is not None:
+            extra = {
+                "method": request.method,
+                "path": path,
+                "status_code": response.status_code,
+                "duration": round(duration, 3),
+            }
+            if not sampled:
+                extra.update(request_data)
+            logger.log(level, "Request completed", extra=extra)
+        return response
+    except Exception as e:
+        duration = time.time() - start_time
+        logger.error("Request failed", extra={**request_data, "duration": round(duration, 3), "error_message": str(e)})
+        raise
+
+
+def _app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "healthy"}
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            for n in range(20):
+                yield f"data: event {n}\n\n"
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    if variant == "call_next":
+        app.middleware("http")(legacy_log_requests_middleware)
+    elif variant == "asgi":
+        app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+async def _get(app: FastAPI, path: str, chunks: Optional[List[int]] = None) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "scheme": "http",
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+    }
+    disconnected = asyncio.Event()
+
+    async def receive() -> dict:
+        # Block like a real server until the response is done (StreamingResponse listens for disconnects)
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body":
+            if chunks is not None:
+                chunks.append(len(message.get("body", b"")))
+            if not message.get("more_body", False):
+                disconnected.set()
+
+    await app(scope, receive, send)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    quiet_logging()
+    results: List[BenchmarkResult] = []
+    for path in ("/ping", "/stream"):
+        for variant in ("none", "call_next", "asgi"):
+            app = _app(variant)
+            chunks: List[int] = []
+            await _get(app, path, chunks)
+            result = await measure_async(f"GET {path} middleware {variant}", lambda: _get(app, path), args.iterations)
+            result.extra["body_messages"] = len(chunks)
+            results.append(result)
+    print(format_results(results))
+    print()
+    for result in results:
+        print(f"{result.name:<40} {result.extra['body_messages']:>4} body messages")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+"""
+Benchmark: intent response serialization, per-child Pydantic models vs. pre-encoded dicts.
+
+Builds an in-memory intent with N children of each entity type (no database)
+and serves it from two minimal FastAPI endpoints through raw ASGI:
+
+- "models": the former path - one validated Pydantic model per child, then
+  FastAPI validates and encodes response_model again;
+- "bytes": the current path - plain dicts encoded once by pydantic-core and
+  returned as a Response, so response_model is only used for OpenAPI.
+
+The converters alone are timed as well, for REST and for the MCP dict.
+
+Usage:
+    python -m benchmarks.bench_serialization [--children 1,100,1000] [--iterations 200]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List
+
+from fastapi import FastAPI
+from pydantic_core import to_json
+
+from app.intents.models import Aspect, Assumption, Choice, Example, Input, Insight, Intent, Pitfall, Prompt, Quality
+from app.intents.schemas import (
+    AspectResponse,
+    AssumptionResponse,
+    ChoiceResponse,
+    ExampleResponse,
+    InputResponse,
+    InsightResponse,
+    IntentResponse,
+    IntentResponseForMCP,
+    PitfallResponse,
+    PromptResponse,
+    QualityResponse,
+)
+from app.intents.serialization import intent_to_dict, intent_to_mcp_dict, json_response
+
+from ._common import BenchmarkResult, format_results, measure, measure_async
+
+
+def _legacy_intent_response(intent: Intent) -> IntentResponse:
+    """The former router._to_intent_response, kept here as the baseline."""
+    return IntentResponse(
+        id=intent.id,
+        name=intent.name,
+        description=intent.description,
+        created_at=intent.created_at,
+        updated_at=intent.updated_at,
+        revision=intent.revision,
+        aspects=[AspectResponse(id=a.id, name=a.name, description=a.description) for a in intent.aspects],
+        inputs=[InputResponse(id=i.id, name=i.name, description=i.description) for i in intent.inputs],
+        choices=[ChoiceResponse(id=c.id, name=c.name, description=c.description) for c in intent.choices],
+        pitfalls=[PitfallResponse(id=p.id, description=p.description) for p in intent.pitfalls],
+        assumptions=[AssumptionResponse(id=a.id, description=a.description) for a in intent.assumptions],
+        qualities=[QualityResponse(id=q.id, criterion=q.criterion, priority=q.priority) for q in intent.qualities],
+        examples=[ExampleResponse(id=e.id, sample=e.sample) for e in intent.examples],
+        prompts=[PromptResponse(id=p.id, version=p.version, content=p.content) for p in intent.prompts],
+        insights=[InsightResponse(id=i.id, content=i.content, status=i.status) for i in intent.insights],
+    )
+
+
+def _legacy_intent_to_dict_for_mcp(intent: Intent) -> Dict[str, Any]:
+    """The former mcp_server._intent_to_dict_for_mcp, kept here as the baseline."""
+    return IntentResponseForMCP(
+        id=intent.id,
+        name=intent.name,
+        description=intent.description,
+        created_at=intent.created_at,
+        updated_at=intent.updated_at,
+        revision=intent.revision,
+        aspects=[AspectResponse(id=a.id, name=a.name, description=a.description) for a in intent.aspects],
+        inputs=[InputResponse(id=i.id, name=i.name, description=i.description) for i in intent.inputs],
+        choices=[ChoiceResponse(id=c.id, name=c.name, description=c.description) for c in intent.choices],
+        pitfalls=[PitfallResponse(id=p.id, description=p.description) for p in intent.pitfalls],
+        assumptions=[AssumptionResponse(id=a.id, description=a.description) for a in intent.assumptions],
+        qualities=[QualityResponse(id=q.id, criterion=q.criterion, priority=q.priority) for q in intent.qualities],
+        prompts=[PromptResponse(id=p.id, version=p.version, content=p.content) for p in intent.prompts],
+        insights=[InsightResponse(id=i.id, content=i.content, status=i.status) for i in intent.insights],
+    ).model_dump(mode="json")
+
+
+def _build_intent(children: int) -> Intent:
+    now = datetime.utcnow()
+    text = "Keep the summary neutral and cite the section each claim comes from. " * 3
+    ids = range(1, children + 1)
+    return Intent(
+        id=1,
+        name="Benchmark intent",
+        description=text,
+        created_at=now,
+        updated_at=now,
+        aspects=[Aspect(id=n, intent_id=1, name=f"Aspect {n}", description=text) for n in ids],
+        inputs=[Input(id=n, intent_id=1, name=f"Input {n}", description=text) for n in ids],
+        choices=[Choice(id=n, intent_id=1, name=f"Choice {n}", description=text) for n in ids],
+        pitfalls=[Pitfall(id=n, intent_id=1, description=text) for n in ids],
+        assumptions=[Assumption(id=n, intent_id=1, description=text) for n in ids],
+        qualities=[Quality(id=n, intent_id=1, criterion=text, priority="must_have") for n in ids],
+        examples=[Example(id=n, intent_id=1, sample=text) for n in ids],
+        prompts=[Prompt(id=n, intent_id=1, content=text * 4, version=n) for n in ids],
+        insights=[Insight(id=n, intent_id=1, content=text, status="pending") for n in ids],
+    )
+
+
+def _app(intent: Intent) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/models", response_model=IntentResponse)
+    async def models():
+        return _legacy_intent_response(intent)
+
+    @app.get("/bytes", response_model=IntentResponse)
+    async def encoded():
+        return json_response(intent_to_dict(intent))
+
+    return app
+
+
+async def _get(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+    }
+    body = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def run(children: int, iterations: int) -> List[BenchmarkResult]:
+    intent = _build_intent(children)
+    app = _app(intent)
+    size = len(await _get(app, "/bytes"))
+    results = [
+        measure(f"{children:>4} children: REST convert (models)", lambda: _legacy_intent_response(intent), iterations),
+        measure(f"{children:>4} children: REST convert (dicts)", lambda: intent_to_dict(intent), iterations),
+        measure(f"{children:>4} children: MCP dict (models)", lambda: _legacy_intent_to_dict_for_mcp(intent), iterations),
+        measure(f"{children:>4} children: MCP dict (dicts)", lambda: intent_to_mcp_dict(intent), iterations),
+        await measure_async(f"{children:>4} children: endpoint (models)", lambda: _get(app, "/models"), iterations),
+        await measure_async(f"{children:>4} children: endpoint (bytes)", lambda: _get(app, "/bytes"), iterations),
+    ]
+    results[-1].extra["body_bytes"] = size
+    assert to_json(intent_to_dict(intent)) == _legacy_intent_response(intent).model_dump_json().encode()
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--children", default="1,100,1000", help="Comma-separated child counts per entity type")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    results: List[BenchmarkResult] = []
+    for children in (int(n) for n in args.children.split(",")):
+        results += await run(children, args.iterations)
+    print(format_results(results))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
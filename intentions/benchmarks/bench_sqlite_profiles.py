@@ -0,0 +1,90 @@
+"""
+Benchmark: in-memory SQLite versus the file-backed WAL profile.
+
+Seeds intents through the service layer, then measures reads (read pool),
+prompt writes (single writer) and a 80/20 mix. The in-memory profile shares one
+StaticPool connection that cannot be used concurrently, so it only runs with a
+single worker; the file profile runs with one worker and with --concurrency.
+
+Usage:
+    python -m benchmarks.bench_sqlite_profiles [--intents 200] [--iterations 2000] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import random
+from typing import List
+
+from app.intents import service
+from app.intents.repository import IntentRepository
+from app.intents.schemas import AspectCreate, IntentCreateRequest, PromptCreateRequest, QualityCreate
+from app.shared.database import get_read_session_factory, get_session_factory
+
+from ._common import DATABASE_PROFILES, BenchmarkResult, database_profile, format_results, measure_async, quiet_logging
+
+
+async def _seed(count: int) -> List[int]:
+    ids = []
+    async with get_session_factory()() as session:
+        repository = IntentRepository(session)
+        for n in range(count):
+            request = IntentCreateRequest(
+                name=f"Intent {n}",
+                description="Benchmark intent",
+                aspects=[AspectCreate(name=f"Aspect {a}") for a in range(3)],
+                qualities=[QualityCreate(criterion=f"Criterion {q}") for q in range(3)],
+            )
+            intent = await service.create_intent(request, repository)
+            ids.append(intent.id)
+        await session.commit()
+    return ids
+
+
+async def _read(intent_ids: List[int]) -> None:
+    async with get_read_session_factory()() as session:
+        await IntentRepository(session).find_by_id(random.choice(intent_ids))
+
+
+async def _write(intent_ids: List[int]) -> None:
+    async with get_session_factory()() as session:
+        await service.add_prompt(random.choice(intent_ids), PromptCreateRequest(content="bench"), IntentRepository(session))
+        await session.commit()
+
+
+async def run_profile(profile: str, intents: int, iterations: int, concurrency: int) -> List[BenchmarkResult]:
+    async with database_profile(profile):
+        ids = await _seed(intents)
+
+        async def mixed() -> None:
+            if random.random() < 0.8:
+                await _read(ids)
+            else:
+                await _write(ids)
+
+        results = []
+        for workers in (1,) if profile == "memory" else (1, concurrency):
+            label = f"{profile} x{workers}"
+            results.append(await measure_async(f"{label}: find_by_id", lambda: _read(ids), iterations, concurrency=workers))
+            results.append(
+                await measure_async(f"{label}: add_prompt", lambda: _write(ids), iterations // 4, concurrency=workers)
+            )
+            results.append(await measure_async(f"{label}: 80/20 read/write", mixed, iterations, concurrency=workers))
+        return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--intents", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    quiet_logging()
+    results: List[BenchmarkResult] = []
+    for profile in DATABASE_PROFILES:
+        results.extend(await run_profile(profile, args.intents, args.iterations, args.concurrency))
+    print(format_results(results))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""
+Benchmark: legacy SSE session lookup and message routing.
+
+Compares a dict behind a global asyncio.Lock (the previous registry) with the
+lock-free sharded SessionRegistry, then measures routed messages/sec when N
+simulated workers share session ownership through the in-process broker.
+Each message is posted to a random worker and delivered to the session's
+owner, where a consumer drains the queue like an SSE stream would.
+
+Usage:
+    python -m benchmarks.bench_sse_routing [--sessions 1000] [--messages 50000] [--workers 1,2,4,8]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from typing import List
+
+from app.intents.mcp_sse_sessions import BrokerSessionRouter, InProcessBroker, SessionRegistry, SseSession
+
+from ._common import BenchmarkResult, format_results, measure_async, quiet_logging
+
+
+def _deliver(session: SseSession, payload: str) -> None:
+    session.queue.put_nowait(payload)
+
+
+async def bench_lookup(sessions: int, iterations: int) -> List[BenchmarkResult]:
+    ids = [str(uuid.uuid4()) for _ in range(sessions)]
+    locked: dict[str, SseSession] = {}
+    lock = asyncio.Lock()
+    registry = SessionRegistry()
+    for session_id in ids:
+        session = SseSession(session_id=session_id, queue=asyncio.Queue())
+        locked[session_id] = session
+        registry.add(session)
+
+    async def locked_get() -> None:
+        async with lock:
+            locked.get(random.choice(ids))
+
+    async def registry_get() -> None:
+        registry.get(random.choice(ids))
+
+    return [
+        await measure_async("lookup: dict + global lock", locked_get, iterations, concurrency=16),
+        await measure_async("lookup: sharded registry", registry_get, iterations, concurrency=16),
+    ]
+
+
+async def bench_routing(workers: int, sessions: int, messages: int) -> BenchmarkResult:
+    broker = InProcessBroker()
+    routers = [BrokerSessionRouter(SessionRegistry(), _deliver, broker, worker_id=f"w{n}") for n in range(workers)]
+    for router in routers:
+        await router.start()
+
+    delivered = 0
+    done = asyncio.Event()
+    ids = []
+
+    async def consume(session: SseSession) -> None:
+        nonlocal delivered
+        while True:
+            await session.queue.get()
+            delivered += 1
+            if delivered == messages:
+                done.set()
+
+    consumers = []
+    for n in range(sessions):
+        session = SseSession(session_id=str(uuid.uuid4()), queue=asyncio.Queue())
+        routers[n % workers].register(session)
+        ids.append(session.session_id)
+        consumers.append(asyncio.create_task(consume(session)))
+
+    result = BenchmarkResult(name=f"routing: {workers} worker(s)", extra={"workers": workers})
+    started = time.perf_counter()
+    for _ in range(messages):
+        t0 = time.perf_counter_ns()
+        await random.choice(routers).deliver(random.choice(ids), "{}")
+        result.samples_ns.append(time.perf_counter_ns() - t0)
+    await done.wait()
+    result.total_seconds = time.perf_counter() - started
+    result.extra["remote_share"] = round(1 - 1 / workers, 2)
+
+    for task in consumers:
+        task.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+    for router in routers:
+        await router.stop()
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args()
+
+    quiet_logging()
+    results = await bench_lookup(args.sessions, args.messages)
+    for workers in (int(w) for w in args.workers.split(",")):
+        results.append(await bench_routing(workers, args.sessions, args.messages))
+    print(format_results(results))
+    print("\nops/s for routing rows is end-to-end delivered messages/sec (post -> owner queue -> consumer).")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+Benchmark: per-request cost of tracing at different sample rates.
+
+Drives GET /intents/{id} through the full ASGI app wrapped in
+TracingMiddleware against in-memory SQLite. A sampled request records a
+server span, the service span, the repository span and one span per SQL
+statement into the in-memory exporter.
+
+- off: TRACING_ENABLED=false, every instrumentation point gets the no-op span
+- sample 0: enabled, no trace sampled (non-recording spans only)
+- sample 0.1 / 1: enabled, that fraction of requests recorded
+
+Usage:
+    python -m benchmarks.bench_tracing [--requests 2000] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import List
+
+from app.intents import service
+from app.intents.repository import IntentRepository
+from app.intents.schemas import AspectCreate, IntentCreateRequest
+from app.main import app
+from app.shared.database import get_session_factory
+from app.shared.tracing import InMemorySpanExporter, TracingMiddleware, tracer
+
+from ._common import BenchmarkResult, database_profile, format_results, measure_async, quiet_logging
+
+traced_app = TracingMiddleware(app)
+
+
+async def _seed() -> int:
+    async with get_session_factory()() as session:
+        request = IntentCreateRequest(
+            name="Traced intent", description="Benchmark intent", aspects=[AspectCreate(name=f"Aspect {a}") for a in range(5)]
+        )
+        intent = await service.create_intent(request, IntentRepository(session))
+        await session.commit()
+        return intent.id
+
+
+async def _get(path: str) -> None:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "scheme": "http",
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+        "headers": [(b"host", b"bench")],
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    await traced_app(scope, receive, send)
+
+
+async def run_mode(
+    name: str, enabled: bool, sample_rate: float, path: str, requests: int, concurrency: int
+) -> BenchmarkResult:
+    exporter = InMemorySpanExporter(max_spans=1_000_000)
+    tracer.enabled, tracer.sample_rate, tracer.exporter = enabled, sample_rate, exporter
+    result = await measure_async(f"GET /intents/{{id}} tracing {name}", lambda: _get(path), requests, concurrency=concurrency)
+    result.extra["spans"] = len(exporter.spans())
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    quiet_logging()
+    previous = tracer.enabled, tracer.sample_rate, tracer.exporter
+    results: List[BenchmarkResult] = []
+    try:
+        async with database_profile("memory"):
+            path = f"/intents/{await _seed()}"
+            for name, enabled, sample_rate in (
+                ("off", False, 1.0),
+                ("sample 0", True, 0.0),
+                ("sample 0.1", True, 0.1),
+                ("sample 1", True, 1.0),
+            ):
+                results.append(await run_mode(name, enabled, sample_rate, path, args.requests, args.concurrency))
+    finally:
+        tracer.enabled, tracer.sample_rate, tracer.exporter = previous
+
+    print(format_results(results), file=sys.stdout)
+    for result in results:
+        print(f"{result.name}: {result.extra['spans']} spans recorded")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
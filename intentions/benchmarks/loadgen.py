@@ -0,0 +1,286 @@
+"""
+Load generator: replay REST and MCP traffic mixes for capacity checks.
+
+Virtual users (--users) run scenarios back to back for --duration seconds,
+each picking its next scenario by the weights in --mix:
+
+- agent: an MCP agent session over POST /mcp: tools/list, get_intent,
+  update_intent_articulation, add_prompt, add_output
+- ui: UI polling: conditional GET /intents/{id} with the last ETag (304 once
+  the intent is cached) and GET /intents/changes from the last cursor
+- bulk: bulk listing: MCP list_intents, POST /intents:batchGet and the NDJSON
+  export GET /admin/intents/export
+
+By default the ASGI app is driven in-process (httpx.ASGITransport) against a
+fresh SQLite database (--profile; the in-memory profile shares one connection,
+so it only supports --users 1); with --url a running server is driven over
+HTTP instead (--api-key sets the Authorization header). Either way intents are
+seeded through POST /intents from the test fixture factory
+(tests/fixtures/intents.py).
+
+Reports throughput, p50/p95/p99 latency and the error rate per operation and
+per scenario; --output writes the same numbers as JSON. Users pick scenarios
+and intents with seeded random generators, so runs replay the same sequence.
+
+Usage:
+    python -m benchmarks.loadgen [--duration 10] [--users 8] [--mix agent=1,ui=3,bulk=1]
+    python -m benchmarks.loadgen --url http://localhost:8000 --api-key "$API_KEY"
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from app.intents import mcp_sdk_http
+from app.intents.models import Aspect
+from app.intents.schemas import AspectCreate, IntentCreateRequest
+from app.main import app
+from tests.fixtures.intents import create_test_intent
+
+from ._common import DATABASE_PROFILES, BenchmarkResult, database_profile, quiet_logging, save_results
+
+SCENARIOS = ("agent", "ui", "bulk")
+SEED = 20240501
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    """Parse "agent=1,ui=3,bulk=1" into scenario weights."""
+    mix: Dict[str, float] = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r} (expected one of {', '.join(SCENARIOS)})")
+        mix[name] = float(weight) if weight.strip() else 1.0
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("At least one scenario needs a positive weight")
+    return mix
+
+
+def _seed_requests(count: int, aspects: int) -> List[IntentCreateRequest]:
+    """Create requests for fixture-factory intents."""
+    requests = []
+    for n in range(1, count + 1):
+        intent = create_test_intent(
+            id=n,
+            name=f"Load intent {n}",
+            description="Seeded by the load generator",
+            aspects=[Aspect(id=None, intent_id=n, name=f"Aspect {a}") for a in range(aspects)],
+        )
+        requests.append(
+            IntentCreateRequest(
+                name=intent.name,
+                description=intent.description,
+                aspects=[AspectCreate(name=a.name, description=a.description) for a in intent.aspects],
+            )
+        )
+    return requests
+
+
+async def _seed(client: httpx.AsyncClient, count: int, aspects: int) -> List[int]:
+    ids = []
+    for request in _seed_requests(count, aspects):
+        response = await client.post("/intents", json=request.model_dump())
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    return ids
+
+
+class LoadStats:
+    """Latency samples and error counts per operation and per scenario."""
+
+    def __init__(self) -> None:
+        self.results: Dict[str, BenchmarkResult] = {}
+        self.errors: Counter = Counter()
+
+    def record(self, name: str, elapsed_ns: int, ok: bool) -> None:
+        result = self.results.get(name)
+        if result is None:
+            result = self.results[name] = BenchmarkResult(name=name)
+        result.samples_ns.append(elapsed_ns)
+        if not ok:
+            self.errors[name] += 1
+
+    def finish(self, seconds: float) -> List[BenchmarkResult]:
+        """Results with throughput over the whole run and error counts in extra."""
+        for name, result in self.results.items():
+            result.total_seconds = seconds
+            result.extra["errors"] = self.errors[name]
+            result.extra["error_rate"] = round(self.errors[name] / result.iterations, 4)
+        return sorted(self.results.values(), key=lambda result: (result.name.startswith("scenario"), result.name))
+
+
+class VirtualUser:
+    """One client running scenarios back to back."""
+
+    def __init__(
+        self, client: httpx.AsyncClient, stats: LoadStats, intent_ids: Sequence[int], rng: random.Random, batch_size: int
+    ):
+        self.client = client
+        self.stats = stats
+        self.intent_ids = intent_ids
+        self.rng = rng
+        self.batch_size = batch_size
+        # UI state: ETags of intents seen so far and the change feed cursor
+        self.etags: Dict[int, str] = {}
+        self.cursor: Optional[int] = None
+
+    async def request(self, name: str, method: str, url: str, expected=(200,), **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter_ns()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            ok = response.status_code in expected
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.stats.record(name, time.perf_counter_ns() - started, ok)
+        return response if ok else None
+
+    async def mcp(self, name: str, method: str, params: Dict[str, Any]) -> Optional[Any]:
+        """
+        JSON-RPC call on POST /mcp.
+
+        Returns the result, or for tools/call the JSON content of the tool's
+        answer; None (counted as an error) when the call fails, the tool reports
+        an error or answers with plain text such as "Intent not found".
+        """
+        payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        started = time.perf_counter_ns()
+        value = None
+        try:
+            response = await self.client.post("/mcp", json=payload)
+            result = response.json().get("result") if response.status_code == 200 else None
+            if result is not None and not result.get("isError", False):
+                value = json.loads(result["content"][0]["text"]) if method == "tools/call" else result
+        except (httpx.HTTPError, ValueError, KeyError, IndexError):
+            pass
+        self.stats.record(f"mcp {name}", time.perf_counter_ns() - started, value is not None)
+        return value
+
+    async def tool(self, name: str, arguments: Dict[str, Any]) -> Optional[Any]:
+        return await self.mcp(name, "tools/call", {"name": name, "arguments": arguments})
+
+    async def agent(self) -> bool:
+        intent_id = self.rng.choice(self.intent_ids)
+        if await self.mcp("tools/list", "tools/list", {}) is None:
+            return False
+        if await self.tool("get_intent", {"intent_id": intent_id}) is None:
+            return False
+        qualities = [{"criterion": f"Criterion {self.rng.randrange(1000)}"}]
+        if await self.tool("update_intent_articulation", {"intent_id": intent_id, "qualities": qualities}) is None:
+            return False
+        prompt = await self.tool("add_prompt", {"intent_id": intent_id, "content": "Load test prompt"})
+        if prompt is None:
+            return False
+        return await self.tool("add_output", {"prompt_id": prompt["id"], "content": "Load test output"}) is not None
+
+    async def ui(self) -> bool:
+        intent_id = self.rng.choice(self.intent_ids)
+        headers = {"If-None-Match": self.etags[intent_id]} if intent_id in self.etags else {}
+        response = await self.request("GET /intents/{id}", "GET", f"/intents/{intent_id}", (200, 304), headers=headers)
+        if response is None:
+            return False
+        if response.status_code == 200:
+            self.etags[intent_id] = response.headers["etag"]
+        # Without a cursor the feed answers with the current one; later polls ask for changes since
+        params = {"cursor": self.cursor} if self.cursor is not None else {}
+        response = await self.request("GET /intents/changes", "GET", "/intents/changes", params=params)
+        if response is None:
+            return False
+        self.cursor = response.json()["cursor"]
+        return True
+
+    async def bulk(self) -> bool:
+        if await self.tool("list_intents", {}) is None:
+            return False
+        ids = self.rng.sample(list(self.intent_ids), min(self.batch_size, len(self.intent_ids)))
+        if await self.request("POST /intents:batchGet", "POST", "/intents:batchGet", json={"intent_ids": ids}) is None:
+            return False
+        return await self.request("GET /admin/intents/export", "GET", "/admin/intents/export") is not None
+
+    async def run(self, mix: Dict[str, float], deadline: float, think_seconds: float) -> None:
+        names, weights = list(mix), list(mix.values())
+        while time.perf_counter() < deadline:
+            scenario = self.rng.choices(names, weights)[0]
+            started = time.perf_counter_ns()
+            ok = await getattr(self, scenario)()
+            self.stats.record(f"scenario {scenario}", time.perf_counter_ns() - started, ok)
+            if think_seconds:
+                await asyncio.sleep(think_seconds)
+
+
+async def drive(client: httpx.AsyncClient, args: argparse.Namespace) -> List[BenchmarkResult]:
+    intent_ids = await _seed(client, args.intents, args.aspects)
+    stats = LoadStats()
+    users = [VirtualUser(client, stats, intent_ids, random.Random(SEED + n), args.batch_size) for n in range(args.users)]
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(user.run(args.mix, deadline, args.think_ms / 1000) for user in users))
+    return stats.finish(time.perf_counter() - started)
+
+
+def format_report(results: List[BenchmarkResult]) -> str:
+    """Per-operation table followed by request totals (scenario rows are not counted as requests)."""
+    header = f"{'operation':<36} {'count':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>8}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.name:<36} {r.iterations:>7} {r.ops_per_second:>8.1f} {r.percentile_us(50) / 1000:>8.1f} "
+            f"{r.percentile_us(95) / 1000:>8.1f} {r.percentile_us(99) / 1000:>8.1f} {r.extra['error_rate']:>8.2%}"
+        )
+    requests = [r for r in results if not r.name.startswith("scenario")]
+    total = sum(r.iterations for r in requests)
+    errors = sum(r.extra["errors"] for r in requests)
+    seconds = requests[0].total_seconds if requests else 0.0
+    lines.append("")
+    lines.append(
+        f"{total} requests in {seconds:.1f}s: {total / seconds if seconds else 0:.1f} req/s, "
+        f"{errors} errors ({errors / total if total else 0:.2%})"
+    )
+    return "\n".join(lines)
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("agent=1,ui=3,bulk=1"), help="Scenario weights")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load after seeding")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause of each user between scenarios")
+    parser.add_argument("--intents", type=int, default=50, help="Intents seeded before the run")
+    parser.add_argument("--aspects", type=int, default=5, help="Aspects per seeded intent")
+    parser.add_argument("--batch-size", type=int, default=20, help="Intent ids per batchGet")
+    parser.add_argument("--profile", choices=DATABASE_PROFILES, default="sqlite-file", help="Database when in-process")
+    parser.add_argument("--url", help="Drive a running server at this base URL instead of the app in-process")
+    parser.add_argument("--api-key", help="API key sent as a Bearer token (with --url)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+    if not args.url and args.profile == "memory" and args.users > 1:
+        parser.error("the memory profile shares one connection that cannot be used concurrently; use --users 1")
+
+    if args.url:
+        headers = {"Authorization": f"Bearer {args.api_key}"} if args.api_key else {}
+        async with httpx.AsyncClient(base_url=args.url, headers=headers, timeout=30.0) as client:
+            results = await drive(client, args)
+    else:
+        quiet_logging()
+        async with database_profile(args.profile), mcp_sdk_http.mcp_session_manager.run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadgen") as client:
+                results = await drive(client, args)
+
+    print(format_report(results))
+    if args.output:
+        metadata = {key: getattr(args, key) for key in ("mix", "users", "duration", "intents", "profile", "url")}
+        save_results(args.output, results, metadata)
+        print(f"\nResults written to {args.output}")
+    return 1 if any(result.extra["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
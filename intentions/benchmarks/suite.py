@@ -0,0 +1,225 @@
+"""
+Benchmark suite: repeatable baselines for the intents backend.
+
+Runs a fixed set of cases per database profile (in-memory SQLite and the
+file-backed WAL profile), optionally writes the results as JSON and compares
+them with a baseline written by an earlier run:
+
+- create_intent with --children children of every entity type (one commit each)
+- find_by_id of a random seeded intent
+- list_all over --intents seeded intents
+- update_intent_articulation replacing aspects and qualities
+- add_prompt with one worker and with --concurrency workers (the in-memory
+  profile shares one StaticPool connection, so it only runs with one)
+- MCP call_tool for get_intent and add_prompt (session, service, JSON result)
+- serialization of an intent with --children children: intent_to_dict plus
+  JSON encoding (REST) and intent_to_mcp_dict (no database, run once)
+
+Random choices use a fixed seed, so two runs do the same work. Cases are
+compared on p50, which is steadier than the mean on short runs; the exit
+status is 1 when any case is slower than the baseline by more than
+--threshold.
+
+Usage:
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --baseline baseline.json [--threshold 0.2] [--output current.json]
+    python -m benchmarks.suite --profile memory --quick
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from pydantic_core import to_json
+
+from app.intents import service
+from app.intents.mcp_server import call_tool
+from app.intents.models import Intent
+from app.intents.repository import IntentRepository
+from app.intents.schemas import (
+    AspectCreate,
+    AssumptionCreate,
+    ChoiceCreate,
+    InputCreate,
+    IntentArticulationUpdateRequest,
+    IntentCreateRequest,
+    PitfallCreate,
+    PromptCreateRequest,
+    QualityCreate,
+)
+from app.intents.serialization import intent_to_dict, intent_to_mcp_dict
+from app.shared.database import get_read_session_factory, get_session_factory
+
+from ._common import (
+    DATABASE_PROFILES,
+    BenchmarkResult,
+    compare_results,
+    database_profile,
+    format_comparison,
+    format_results,
+    load_results,
+    measure,
+    measure_async,
+    quiet_logging,
+    save_results,
+)
+
+SEED = 20240501
+
+
+def _intent_request(name: str, children: int) -> IntentCreateRequest:
+    return IntentCreateRequest(
+        name=name,
+        description="Benchmark intent",
+        aspects=[AspectCreate(name=f"Aspect {n}") for n in range(children)],
+        inputs=[InputCreate(name=f"Input {n}", description="An input") for n in range(children)],
+        choices=[ChoiceCreate(name=f"Choice {n}", description="A choice") for n in range(children)],
+        pitfalls=[PitfallCreate(description=f"Pitfall {n}") for n in range(children)],
+        assumptions=[AssumptionCreate(description=f"Assumption {n}") for n in range(children)],
+        qualities=[QualityCreate(criterion=f"Criterion {n}") for n in range(children)],
+    )
+
+
+async def _seed(count: int, children: int) -> List[int]:
+    ids = []
+    async with get_session_factory()() as session:
+        repository = IntentRepository(session)
+        for n in range(count):
+            intent = await service.create_intent(_intent_request(f"Intent {n}", children), repository)
+            ids.append(intent.id)
+        await session.commit()
+    return ids
+
+
+async def _load(intent_id: int) -> Intent:
+    async with get_read_session_factory()() as session:
+        return await IntentRepository(session).find_by_id(intent_id)
+
+
+Case = Tuple[str, Callable[[], Awaitable[None]], int, int]
+
+
+def _profile_cases(profile: str, args: argparse.Namespace, ids: List[int], iterations: Callable[[int], int]) -> List[Case]:
+    """(name, func, iterations, concurrency) of every database case, against the seeded intent ids."""
+    rng = random.Random(SEED)
+
+    async def create() -> None:
+        async with get_session_factory()() as session:
+            await service.create_intent(_intent_request("Created", args.children), IntentRepository(session))
+            await session.commit()
+
+    async def find() -> None:
+        async with get_read_session_factory()() as session:
+            await IntentRepository(session).find_by_id(rng.choice(ids))
+
+    async def list_all() -> None:
+        async with get_read_session_factory()() as session:
+            await IntentRepository(session).list_all()
+
+    articulation = IntentArticulationUpdateRequest(
+        aspects=[AspectCreate(name=f"Updated aspect {n}") for n in range(args.children)],
+        qualities=[QualityCreate(criterion=f"Updated criterion {n}") for n in range(args.children)],
+    )
+
+    async def update_articulation() -> None:
+        async with get_session_factory()() as session:
+            await service.update_intent_articulation(rng.choice(ids), articulation, IntentRepository(session))
+            await session.commit()
+
+    async def add_prompt() -> None:
+        async with get_session_factory()() as session:
+            request = PromptCreateRequest(content="Benchmark prompt")
+            await service.add_prompt(rng.choice(ids), request, IntentRepository(session))
+            await session.commit()
+
+    async def mcp_get_intent() -> None:
+        await call_tool("get_intent", {"intent_id": rng.choice(ids)})
+
+    async def mcp_add_prompt() -> None:
+        await call_tool("add_prompt", {"intent_id": rng.choice(ids), "content": "Benchmark prompt"})
+
+    cases: List[Case] = [
+        (f"create_intent ({args.children} children)", create, iterations(200), 1),
+        ("find_by_id", find, iterations(2000), 1),
+        (f"list_all ({args.intents} intents)", list_all, iterations(20), 1),
+        ("update_intent_articulation", update_articulation, iterations(200), 1),
+        ("add_prompt x1", add_prompt, iterations(500), 1),
+    ]
+    if profile != "memory":
+        cases.append((f"add_prompt x{args.concurrency}", add_prompt, iterations(500), args.concurrency))
+    cases += [
+        ("mcp call_tool get_intent", mcp_get_intent, iterations(1000), 1),
+        ("mcp call_tool add_prompt", mcp_add_prompt, iterations(500), 1),
+    ]
+    return cases
+
+
+async def run_profile(profile: str, args: argparse.Namespace, scale: float) -> List[BenchmarkResult]:
+    def iterations(count: int) -> int:
+        return max(5, int(count * scale))
+
+    results: List[BenchmarkResult] = []
+    async with database_profile(profile):
+        ids = await _seed(args.intents, args.children)
+        for name, func, count, concurrency in _profile_cases(profile, args, ids, iterations):
+            if args.cases and not any(selected in name for selected in args.cases):
+                continue
+            results.append(await measure_async(f"{profile}: {name}", func, count, concurrency=concurrency))
+    return results
+
+
+async def run_serialization(args: argparse.Namespace, scale: float) -> List[BenchmarkResult]:
+    async with database_profile("memory"):
+        [intent_id] = await _seed(1, args.children)
+        intent = await _load(intent_id)
+
+    count = max(5, int(2000 * scale))
+    cases = [
+        (f"serialize intent_to_dict + JSON ({args.children} children)", lambda: to_json(intent_to_dict(intent))),
+        (f"serialize intent_to_mcp_dict ({args.children} children)", lambda: intent_to_mcp_dict(intent)),
+    ]
+    return [measure(name, func, count) for name, func in cases if not args.cases or any(s in name for s in args.cases)]
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=(*DATABASE_PROFILES, "all"), default="all")
+    parser.add_argument("--intents", type=int, default=200, help="Intents seeded before measuring")
+    parser.add_argument("--children", type=int, default=10, help="Children per entity type of each intent")
+    parser.add_argument("--concurrency", type=int, default=8, help="Workers of the concurrent add_prompt case")
+    parser.add_argument("--quick", action="store_true", help="A tenth of the iterations (smoke run, noisy)")
+    parser.add_argument("--cases", nargs="*", help="Only run cases whose name contains one of these strings")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare with the results JSON of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative p50 slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    quiet_logging()
+    scale = 0.1 if args.quick else 1.0
+    profiles = DATABASE_PROFILES if args.profile == "all" else (args.profile,)
+    results: List[BenchmarkResult] = []
+    for profile in profiles:
+        results.extend(await run_profile(profile, args, scale))
+    results.extend(await run_serialization(args, scale))
+    print(format_results(results))
+
+    if args.output:
+        metadata = {key: getattr(args, key) for key in ("profile", "intents", "children", "concurrency", "quick")}
+        save_results(args.output, results, metadata)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        comparisons = compare_results(results, load_results(args.baseline))
+        print()
+        print(format_comparison(comparisons, args.threshold))
+        regressions = [c for c in comparisons if c.change > args.threshold]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%} against {args.baseline}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,82 @@
+"""
+Command-line entry point for bulk intent export/import (NDJSON).
+
+Uses the same database configuration as the app (DATABASE_TYPE, DATABASE_URL,
+SQLITE_PATH); the default in-memory SQLite database is empty on every run.
+
+Usage:
+    python intents_transfer.py export [--output intents.ndjson] [--batch-size 500]
+    python intents_transfer.py import [--input intents.ndjson] [--batch-size 500]
+
+Without --output/--input the export writes to stdout and the import reads stdin.
+An import runs in one transaction: an invalid line rolls back everything.
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator, BinaryIO
+
+from app.intents import transfer
+from app.intents.repository import IntentRepository
+from app.shared.database import close_db, get_read_session_factory, get_session_factory, init_db
+
+
+async def _read_lines(stream: BinaryIO) -> AsyncIterator[bytes]:
+    for line in stream:
+        yield line
+
+
+async def export_command(output: BinaryIO, batch_size: int) -> int:
+    count = 0
+    async with get_read_session_factory()() as session:
+        async for line in transfer.export_intents_ndjson(IntentRepository(session), batch_size):
+            output.write(line)
+            count += 1
+    output.flush()
+    print(f"Exported {count} intents", file=sys.stderr)
+    return 0
+
+
+async def import_command(source: BinaryIO, batch_size: int) -> int:
+    async with get_session_factory()() as session:
+        try:
+            summary = await transfer.import_intents(_read_lines(source), IntentRepository(session), batch_size)
+        except ValueError as e:
+            await session.rollback()
+            print(f"Import failed: {e}", file=sys.stderr)
+            return 1
+        await session.commit()
+    print(f"Imported {summary.imported} intents in {summary.batches} batches", file=sys.stderr)
+    return 0
+
+
+def _batch_size(value: str) -> int:
+    size = int(value)
+    if not 1 <= size <= transfer.MAX_BATCH_SIZE:
+        raise argparse.ArgumentTypeError(f"batch size must be between 1 and {transfer.MAX_BATCH_SIZE}")
+    return size
+
+
+async def run(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    export_parser = subcommands.add_parser("export", help="Write all intents as NDJSON")
+    export_parser.add_argument("--output", type=argparse.FileType("wb"), default=sys.stdout.buffer)
+    export_parser.add_argument("--batch-size", type=_batch_size, default=transfer.DEFAULT_BATCH_SIZE)
+    import_parser = subcommands.add_parser("import", help="Load intents from NDJSON")
+    import_parser.add_argument("--input", type=argparse.FileType("rb"), default=sys.stdin.buffer)
+    import_parser.add_argument("--batch-size", type=_batch_size, default=transfer.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    await init_db()
+    try:
+        if args.command == "export":
+            return await export_command(args.output, args.batch_size)
+        return await import_command(args.input, args.batch_size)
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(sys.argv[1:])))
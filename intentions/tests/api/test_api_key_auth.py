@@ -13,7 +13,7 @@ from fastapi.testclient import TestClient
 
 from app.intents.repository import IntentRepository
 from app.main import app
-from app.shared.dependencies import get_intent_repository, get_user_repository, verify_api_key
+from app.shared.dependencies import get_intent_repository, get_read_intent_repository, get_user_repository, verify_api_key
 from app.users.repository import UserRepository
 
 
@@ -29,6 +29,7 @@ def client(test_db_session):
 
     app.dependency_overrides[get_user_repository] = override_get_user_repository
     app.dependency_overrides[get_intent_repository] = override_get_intent_repository
+    app.dependency_overrides[get_read_intent_repository] = override_get_intent_repository
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -69,6 +70,7 @@ def client_with_auth(test_db_session):
 
     test_app.dependency_overrides[get_user_repository] = override_get_user_repository
     test_app.dependency_overrides[get_intent_repository] = override_get_intent_repository
+    test_app.dependency_overrides[get_read_intent_repository] = override_get_intent_repository
 
     # Override verify_api_key BEFORE including routers
     def override_verify_api_key(authorization: str = None):
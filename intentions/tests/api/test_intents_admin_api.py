@@ -0,0 +1,74 @@
+"""
+API tests for intents admin endpoints (NDJSON export/import).
+
+Tests full HTTP stack with TestClient.
+"""
+
+import json
+from contextlib import nullcontext
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.intents.repository import IntentRepository
+from app.main import app
+from app.shared.database import get_read_session_factory
+from app.shared.dependencies import get_intent_repository, get_read_intent_repository
+
+
+@pytest.fixture
+def client(test_db_session):
+    """Create a test client whose repositories and export session use the test database."""
+
+    def override_get_intent_repository():
+        return IntentRepository(test_db_session)
+
+    app.dependency_overrides[get_intent_repository] = override_get_intent_repository
+    app.dependency_overrides[get_read_intent_repository] = override_get_intent_repository
+    app.dependency_overrides[get_read_session_factory] = lambda: lambda: nullcontext(test_db_session)
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.api
+class TestIntentsAdminEndpoints:
+    """Test /admin/intents/export and /admin/intents/import."""
+
+    def test_export_streams_one_ndjson_line_per_intent(self, client):
+        """Test export returns NDJSON with full composition."""
+        client.post(
+            "/intents",
+            json={"name": "First", "description": "d", "aspects": [{"name": "SEO"}]},
+        )
+        client.post("/intents", json={"name": "Second", "description": "d"})
+
+        response = client.get("/admin/intents/export", params={"batch_size": 1})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["name"] for r in records] == ["First", "Second"]
+        assert records[0]["aspects"][0]["name"] == "SEO"
+        assert "examples" in records[0]
+
+    def test_import_creates_intents_in_batches(self, client):
+        """Test import inserts every record and reports the batch count."""
+        body = "\n".join(json.dumps({"name": f"Intent {n}", "description": "d"}) for n in range(3)) + "\n"
+
+        response = client.post(
+            "/admin/intents/import",
+            params={"batch_size": 2},
+            content=body,
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"imported": 3, "batches": 2}
+        assert len(client.get("/admin/intents/export").text.splitlines()) == 3
+
+    def test_import_invalid_record_returns_400(self, client):
+        """Test a malformed line is rejected with its line number."""
+        response = client.post("/admin/intents/import", content='{"name": "only name"}\n')
+
+        assert response.status_code == 400
+        assert "line 1" in response.json()["detail"]
@@ -4,12 +4,18 @@ API tests for intents endpoints (V2).
 Tests full HTTP stack with TestClient.
 """
 
+import json
+from contextlib import nullcontext
+
 import pytest
 from fastapi.testclient import TestClient
 
 from app.intents.repository import IntentRepository
+from app.intents.router import stream_intent_changes
 from app.main import app
-from app.shared.dependencies import get_intent_repository
+from app.shared.database import get_read_session_factory
+from app.shared.dependencies import get_intent_repository, get_read_intent_repository
+from tests.fixtures.intents import create_test_intent
 
 
 @pytest.fixture
@@ -20,6 +26,9 @@ def client(test_db_session):
         return IntentRepository(test_db_session)
 
     app.dependency_overrides[get_intent_repository] = override_get_intent_repository
+
+    app.dependency_overrides[get_read_intent_repository] = override_get_intent_repository
+    app.dependency_overrides[get_read_session_factory] = lambda: lambda: nullcontext(test_db_session)
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -80,6 +89,13 @@ class TestGetIntentByIdEndpoint:
         assert "aspects" in data
         assert isinstance(data["aspects"], list)
 
+    def test_get_intent_query_count(self, client, assert_max_queries):
+        """Test reading an intent stays within its query budget (one statement per loaded relation)."""
+        intent = client.post("/intents", json={"name": "Test Intent", "description": "d"}).json()
+
+        with assert_max_queries(10):
+            client.get(f"/intents/{intent['id']}")
+
     def test_get_intent_when_not_exists_returns_404(self, client):
         """Test getting a non-existent intent."""
         response = client.get("/intents/999")
@@ -87,6 +103,125 @@ class TestGetIntentByIdEndpoint:
         assert "not found" in response.json()["detail"].lower()
 
 
+@pytest.mark.api
+class TestGetIntentConditionalEndpoint:
+    """Test ETag / If-None-Match on GET /intents/{intent_id}."""
+
+    def test_matching_etag_returns_304_without_body(self, client):
+        """Test an unchanged intent answers 304 with the same ETag."""
+        intent = client.post("/intents", json={"name": "Test Intent", "description": "d"}).json()
+        etag = client.get(f"/intents/{intent['id']}").headers["etag"]
+
+        response = client.get(f"/intents/{intent['id']}", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    def test_change_produces_new_etag(self, client):
+        """Test a write bumps the revision so the old ETag no longer matches."""
+        intent = client.post("/intents", json={"name": "Test Intent", "description": "d"}).json()
+        first = client.get(f"/intents/{intent['id']}")
+        client.patch(f"/intents/{intent['id']}/name", json={"name": "Renamed"})
+
+        response = client.get(f"/intents/{intent['id']}", headers={"If-None-Match": f'"other", W/{first.headers["etag"]}'})
+
+        assert response.status_code == 200
+        assert response.json()["revision"] == first.json()["revision"] + 1
+        assert response.headers["etag"] != first.headers["etag"]
+
+    def test_if_none_match_for_missing_intent_returns_404(self, client):
+        """Test conditional reads of a missing intent are not 304."""
+        response = client.get("/intents/999", headers={"If-None-Match": "*"})
+        assert response.status_code == 404
+
+
+@pytest.mark.api
+class TestBatchGetIntentsEndpoint:
+    """Test POST /intents:batchGet endpoint."""
+
+    def test_batch_get_returns_results_in_request_order(self, client):
+        """Test found intents and not-found markers follow the requested order."""
+        first = client.post("/intents", json={"name": "First", "description": "d"}).json()
+        second = client.post("/intents", json={"name": "Second", "description": "d"}).json()
+
+        response = client.post("/intents:batchGet", json={"intent_ids": [second["id"], 999, first["id"]]})
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["intent_id"] for r in results] == [second["id"], 999, first["id"]]
+        assert [r["found"] for r in results] == [True, False, True]
+        assert results[0]["intent"]["name"] == "Second"
+        assert results[1]["intent"] is None
+        assert results[2]["intent"]["name"] == "First"
+
+    def test_batch_get_with_empty_ids_returns_422(self, client):
+        """Test an empty ID list is rejected."""
+        response = client.post("/intents:batchGet", json={"intent_ids": []})
+        assert response.status_code == 422
+
+
+@pytest.mark.api
+class TestIntentChangesEndpoint:
+    """Test GET /intents/changes and GET /intents/changes/stream."""
+
+    def test_changes_since_cursor(self, client):
+        """Test changes are listed once per intent with the next cursor."""
+        first = client.post("/intents", json={"name": "First", "description": "d"}).json()
+        second = client.post("/intents", json={"name": "Second", "description": "d"}).json()
+        client.patch(f"/intents/{first['id']}/name", json={"name": "Renamed"})
+
+        response = client.get("/intents/changes", params={"cursor": 0})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [(c["intent_id"], c["change_type"]) for c in data["changes"]] == [
+            (second["id"], "created"),
+            (first["id"], "updated"),
+        ]
+        assert data["changes"][1]["intent"]["name"] == "Renamed"
+        assert data["cursor"] == data["changes"][1]["cursor"]
+        assert client.get("/intents/changes", params={"cursor": data["cursor"]}).json() == {
+            "changes": [],
+            "cursor": data["cursor"],
+        }
+
+    def test_omitted_cursor_starts_at_latest_change(self, client):
+        """Test a client without a cursor gets only later changes."""
+        client.post("/intents", json={"name": "Old", "description": "d"})
+
+        data = client.get("/intents/changes").json()
+
+        assert data["changes"] == []
+        assert data["cursor"] > 0
+
+    def test_timeout_above_maximum_returns_422(self, client):
+        """Test long-poll timeouts are capped."""
+        assert client.get("/intents/changes", params={"timeout": 3600}).status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_stream_sends_changes_as_sse_events(self, test_db_session):
+        """Test each change is one SSE event whose id is the cursor; Last-Event-ID wins over cursor."""
+        repository = IntentRepository(test_db_session)
+        await repository.create(create_test_intent(id=None, name="First"))
+        second = await repository.create(create_test_intent(id=None, name="Second"))
+        first_cursor = (await repository.list_changes(0, 1))[0].cursor
+
+        response = await stream_intent_changes(
+            cursor=0, last_event_id=first_cursor, session_factory=lambda: nullcontext(test_db_session)
+        )
+        try:
+            event = await response.body_iterator.__anext__()
+        finally:
+            await response.body_iterator.aclose()
+
+        assert response.media_type == "text/event-stream"
+        lines = event.strip().split("\n")
+        assert lines[0] == f"id: {first_cursor + 1}"
+        payload = json.loads(lines[1].removeprefix("data: "))
+        assert (payload["intent_id"], payload["intent"]["name"]) == (second.id, "Second")
+
+
 @pytest.mark.api
 class TestUpdateIntentNameEndpoint:
     """Test PATCH /intents/{intent_id}/name endpoint."""
@@ -11,10 +11,10 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.intents import mcp_sdk_http
+from app.intents import mcp_sdk_http, mcp_sessions
 from app.intents.repository import IntentRepository
 from app.main import app
-from app.shared.dependencies import get_intent_repository
+from app.shared.dependencies import get_intent_repository, get_read_intent_repository
 
 
 @pytest.fixture
@@ -30,6 +30,8 @@ def client(test_db_session: AsyncSession) -> TestClient:
         return repository, test_db_session
 
     app.dependency_overrides[get_intent_repository] = override_get_intent_repository
+
+    app.dependency_overrides[get_read_intent_repository] = override_get_intent_repository
     with patch("app.intents.mcp_server._get_repository", side_effect=mock_get_repository):
         # Fresh manager per test to avoid reusing run() across TestClient lifespans.
         mcp_sdk_http.mcp_session_manager = mcp_sdk_http.StreamableHTTPSessionManager(
@@ -240,3 +242,108 @@ class TestMCPHTTPEndpoint:
         assert data["id"] == 1
         assert "error" in data
         assert data["error"]["code"] in {-32602, -32600}
+
+    def test_sse_mode_response_streams_through(self, client: TestClient) -> None:
+        """Test SDK responses in SSE mode reach the client as an event stream."""
+        # Arrange
+        mcp_sdk_http.mcp_session_manager.json_response = False
+        request_data = {"jsonrpc": "2.0", "id": 7, "method": "tools/list"}
+
+        # Act
+        with client.stream("POST", "/mcp", json=request_data) as response:
+            body = "".join(response.iter_text())
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        data_line = next(line for line in body.splitlines() if line.startswith("data: "))
+        assert json.loads(data_line[6:])["id"] == 7
+
+
+@pytest.fixture
+def stateful_client(test_db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    """Create a test client with the MCP transport in stateful session mode."""
+
+    def override_get_intent_repository() -> IntentRepository:
+        return IntentRepository(test_db_session)
+
+    async def mock_get_repository() -> tuple[IntentRepository, AsyncSession]:
+        return IntentRepository(test_db_session), test_db_session
+
+    monkeypatch.setattr(mcp_sessions, "MCP_STATEFUL_SESSIONS", True)
+    mcp_sessions.session_caches.clear()
+    app.dependency_overrides[get_intent_repository] = override_get_intent_repository
+    app.dependency_overrides[get_read_intent_repository] = override_get_intent_repository
+    with patch("app.intents.mcp_server._get_repository", side_effect=mock_get_repository):
+        mcp_sdk_http.mcp_session_manager = mcp_sessions.StatefulSessionManager(
+            app=mcp_sdk_http.server,
+            json_response=True,
+            security_settings=mcp_sdk_http._SECURITY_SETTINGS,
+        )
+        with TestClient(app) as test_client:
+            yield test_client
+    app.dependency_overrides.clear()
+    mcp_sessions.session_caches.clear()
+
+
+def _open_session(client: TestClient) -> dict[str, str]:
+    response = client.post(
+        "/mcp",
+        json={
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "initialize",
+            "params": {"protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "tests", "version": "0.1"}},
+        },
+    )
+    headers = {"mcp-session-id": response.headers["mcp-session-id"]}
+    client.post("/mcp", json={"jsonrpc": "2.0", "method": "notifications/initialized"}, headers=headers)
+    return headers
+
+
+def _call_tool(client: TestClient, headers: dict[str, str], name: str, arguments: dict) -> dict:
+    response = client.post(
+        "/mcp",
+        json={"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": name, "arguments": arguments}},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    return json.loads(response.json()["result"]["content"][0]["text"])
+
+
+@pytest.mark.api
+class TestMCPStatefulSessions:
+    """Test the optional stateful MCP session mode."""
+
+    def test_reads_are_cached_per_session_and_invalidated_on_change(self, stateful_client: TestClient) -> None:
+        """Test repeated reads hit the session cache and a write invalidates it."""
+        # Arrange
+        headers = _open_session(stateful_client)
+        intent_id = _call_tool(stateful_client, headers, "create_intent", {"name": "Draft", "description": "d"})["id"]
+        cache = mcp_sessions.session_caches.get(headers["mcp-session-id"])
+
+        # Act
+        _call_tool(stateful_client, headers, "get_intent", {"intent_id": intent_id})
+        _call_tool(stateful_client, headers, "get_intent", {"intent_id": intent_id})
+        _call_tool(stateful_client, headers, "update_intent_name", {"intent_id": intent_id, "name": "Final"})
+        reread = _call_tool(stateful_client, headers, "get_intent", {"intent_id": intent_id})
+
+        # Assert
+        assert cache.hits == 1
+        assert reread["name"] == "Final"
+
+    def test_idle_session_is_evicted(self, stateful_client: TestClient) -> None:
+        """Test expired sessions are terminated and answer 404."""
+        # Arrange
+        headers = _open_session(stateful_client)
+        manager = mcp_sdk_http.mcp_session_manager
+        assert manager.session_count == 1
+
+        # Act
+        expired = stateful_client.portal.call(manager.expire_idle_sessions, 0)
+        response = stateful_client.post("/mcp", json={"jsonrpc": "2.0", "id": 3, "method": "tools/list"}, headers=headers)
+
+        # Assert
+        assert expired == 1
+        assert manager.session_count == 0
+        assert response.status_code == 404
@@ -11,6 +11,7 @@ from app.intents import db_models as _intents_db_models  # noqa: F401 - register
 
 # Import all DB models so Base.metadata knows about them
 from app.main import app
+from app.shared import query_tracking
 from app.shared.database import Base
 from app.shared.events import EventBus
 from app.users.db_models import UserDBModel  # noqa: F401
@@ -107,3 +108,28 @@ async def mock_intent_repository(test_db_session):
 def mock_event_bus():
     """Provide a fresh event bus for each test."""
     return EventBus()
+
+
+@pytest.fixture
+def query_tracker():
+    """
+    Record every SQL statement run while the test executes (including by an app behind TestClient).
+
+    The tracker exposes count, by_repository_method(), by_caller() and repeated_statements().
+    """
+    with query_tracking.track_queries(all_contexts=True) as tracker:
+        yield tracker
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Provide a context manager failing the test when a block runs more SQL statements than allowed.
+
+    Usage: ``with assert_max_queries(12): await service.get_intent(...)``
+    """
+
+    def _assert_max_queries(budget: int):
+        return query_tracking.assert_max_queries(budget, all_contexts=True)
+
+    return _assert_max_queries
@@ -0,0 +1,180 @@
+"""
+Integration tests for the intents change feed with real repository (V2).
+
+Tests long-poll waiting, notifier wake-up and streaming without mocks.
+"""
+
+import asyncio
+import os
+from contextlib import nullcontext
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.intents import change_feed
+from app.intents import repository as intent_repository
+from app.intents.change_feed import change_notifier, stream_changes, subscribe_change_notifications, wait_for_changes
+from app.intents.models import Prompt
+from app.intents.repository import IntentRepository
+from app.shared.database import Base
+from tests.fixtures.intents import create_test_intent
+
+
+@pytest.fixture
+def session_factory(test_db_session):
+    return lambda: nullcontext(test_db_session)
+
+
+@pytest.mark.integration
+class TestChangeFeed:
+    """Test wait_for_changes and stream_changes against the test database."""
+
+    @pytest.mark.asyncio
+    async def test_returns_existing_changes_without_waiting(self, test_db_session, session_factory):
+        """Test a cursor behind the latest change returns immediately with the next cursor."""
+        created = await IntentRepository(test_db_session).create(create_test_intent(id=None, name="Existing"))
+
+        changes, cursor = await wait_for_changes(session_factory, 0, timeout=5)
+
+        assert [(c.intent_id, c.intent.name) for c in changes] == [(created.id, "Existing")]
+        assert cursor == changes[0].cursor
+
+    @pytest.mark.asyncio
+    async def test_timeout_returns_no_changes_and_same_cursor(self, session_factory, monkeypatch):
+        """Test an expired long-poll keeps the cursor and leaves no registered waiter."""
+        monkeypatch.setattr(change_feed, "CHANGE_FEED_RECHECK_SECONDS", 0.01)
+
+        assert await wait_for_changes(session_factory, 0, timeout=0.05) == ([], 0)
+        assert len(change_notifier) == 0
+
+    @pytest.mark.asyncio
+    async def test_waiting_reader_is_woken_by_commit(self, test_db_session, session_factory):
+        """Test committing a change ends the wait well before the recheck interval; a rollback does not."""
+        subscribe_change_notifications()
+        subscribe_change_notifications()
+        repository = IntentRepository(test_db_session)
+        _, cursor = await wait_for_changes(session_factory, None)
+
+        waiting = asyncio.create_task(wait_for_changes(session_factory, cursor, timeout=30))
+        await asyncio.sleep(0.05)
+        await repository.create(create_test_intent(id=None, name="Rolled back"))
+        await test_db_session.rollback()
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+
+        created = await repository.create(create_test_intent(id=None, name="New"))
+        await test_db_session.commit()
+        changes, _ = await asyncio.wait_for(waiting, timeout=0.5)
+
+        assert [c.intent_id for c in changes] == [created.id]
+        assert event.contains(Session, "after_commit", change_feed._notify_on_commit)
+
+    @pytest.mark.asyncio
+    async def test_deleted_intent_has_no_intent(self, test_db_session, session_factory):
+        """Test deleted intents are reported with intent None."""
+        repository = IntentRepository(test_db_session)
+        created = await repository.create(create_test_intent(id=None, name="Doomed"))
+        await repository.delete(created.id)
+
+        changes, _ = await wait_for_changes(session_factory, 0)
+
+        assert [(c.change_type, c.intent) for c in changes] == [("deleted", None)]
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_empty_batches_as_heartbeats(self, test_db_session, session_factory, monkeypatch):
+        """Test the stream yields changes, then an empty batch when nothing changes."""
+        monkeypatch.setattr(change_feed, "CHANGE_FEED_HEARTBEAT_SECONDS", 0.01)
+        await IntentRepository(test_db_session).create(create_test_intent(id=None, name="Streamed"))
+        stream = stream_changes(session_factory, 0)
+
+        try:
+            first = await stream.__anext__()
+            second = await stream.__anext__()
+        finally:
+            await stream.aclose()
+
+        assert [c.intent.name for c in first] == ["Streamed"]
+        assert second == []
+
+    @pytest.mark.asyncio
+    async def test_deferred_changes_are_written_at_commit(self, test_db_session, monkeypatch):
+        """Test queued change rows are inserted by the commit and dropped by a rollback (the PostgreSQL path)."""
+        monkeypatch.setattr(intent_repository, "_DEFERRED_CHANGES_DIALECTS", {"sqlite"})
+        repository = IntentRepository(test_db_session)
+
+        await repository.create(create_test_intent(id=None, name="Rolled back"))
+        await test_db_session.rollback()
+        created = await repository.create(create_test_intent(id=None, name="Committed"))
+        assert await repository.get_latest_change_cursor() == 0
+        await test_db_session.commit()
+
+        changes = await repository.list_changes(0, 10)
+        assert [(c.intent_id, c.change_type) for c in changes] == [(created.id, "created")]
+
+
+@pytest.fixture
+async def postgresql_session_factory():
+    """Session factory on a scratch schema of the PostgreSQL server at TEST_POSTGRESQL_URL."""
+    url = os.getenv("TEST_POSTGRESQL_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRESQL_URL is not set")
+    pytest.importorskip("asyncpg")
+    engine = create_async_engine(make_url(url).set(drivername="postgresql+asyncpg"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield async_sessionmaker(engine, expire_on_commit=False)
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+@pytest.mark.postgresql
+@pytest.mark.integration
+class TestChangeFeedPostgreSQL:
+    """Test change ids become visible in order with concurrent PostgreSQL writers."""
+
+    @pytest.mark.asyncio
+    async def test_open_write_does_not_block_other_writers(self, postgresql_session_factory):
+        """Test a writer commits while another write transaction is open, and the late commit gets the later cursor."""
+        async with postgresql_session_factory() as slow, postgresql_session_factory() as fast:
+            late = await IntentRepository(slow).create(create_test_intent(id=None, name="Late"))
+            early = await IntentRepository(fast).create(create_test_intent(id=None, name="Early"))
+            await asyncio.wait_for(fast.commit(), timeout=5)
+
+            changes, cursor = await wait_for_changes(postgresql_session_factory, 0)
+            assert [c.intent_id for c in changes] == [early.id]
+
+            await slow.commit()
+            changes, _ = await wait_for_changes(postgresql_session_factory, cursor)
+            assert [c.intent_id for c in changes] == [late.id]
+
+    @pytest.mark.asyncio
+    async def test_reader_never_skips_a_concurrent_change(self, postgresql_session_factory):
+        """Test a reader following the feed during concurrent writes ends up with every written intent."""
+        written = []
+
+        async def write(n: int) -> None:
+            async with postgresql_session_factory() as session:
+                repository = IntentRepository(session)
+                created = await repository.create(create_test_intent(id=None, name=f"Concurrent {n}"))
+                await asyncio.sleep(0.001 * (n % 5))
+                await repository.add_prompt(created.id, Prompt(id=None, intent_id=created.id, content="Go.", version=1))
+                await session.commit()
+                written.append(created.id)
+
+        seen, cursor = set(), 0
+        writers = asyncio.gather(*(write(n) for n in range(40)))
+        while not writers.done():
+            changes, cursor = await wait_for_changes(postgresql_session_factory, cursor)
+            seen.update(c.intent_id for c in changes)
+            await asyncio.sleep(0)
+        await writers
+        changes, cursor = await wait_for_changes(postgresql_session_factory, cursor)
+        seen.update(c.intent_id for c in changes)
+
+        assert seen == set(written)
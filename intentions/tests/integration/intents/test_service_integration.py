@@ -7,11 +7,19 @@ Tests service + repository integration without mocks.
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import func, select
 
+from app.intents.db_models import IntentChangeDBModel
 from app.intents.events import IntentCreatedEvent, IntentUpdatedEvent
 from app.intents.repository import IntentRepository
-from app.intents.schemas import IntentCreateRequest
-from app.intents.service import create_intent, get_intent, update_intent_description, update_intent_name
+from app.intents.schemas import AspectCreate, InputCreate, IntentArticulationUpdateRequest, IntentCreateRequest
+from app.intents.service import (
+    create_intent,
+    get_intent,
+    update_intent_articulation,
+    update_intent_description,
+    update_intent_name,
+)
 from app.shared.events import EventBus
 
 
@@ -149,6 +157,58 @@ class TestIntentServiceIntegration:
         assert isinstance(published_events[1], IntentUpdatedEvent)
 
 
+@pytest.mark.integration
+class TestIntentWriteBatching:
+    """Test each service write is one revision, one change-feed row and a bounded number of statements."""
+
+    @staticmethod
+    async def _change_rows(session, intent_id: int) -> int:
+        statement = select(func.count()).where(IntentChangeDBModel.intent_id == intent_id)
+        return (await session.execute(statement)).scalar_one()
+
+    @pytest.mark.asyncio
+    async def test_create_with_children(self, test_db_session, assert_max_queries):
+        """Test creating an intent with 20 children stays at revision 1 with one change row."""
+        repository = IntentRepository(test_db_session)
+        request = IntentCreateRequest(
+            name="Batched",
+            description="Twenty children",
+            aspects=[AspectCreate(name=f"Aspect {n}") for n in range(10)],
+            inputs=[InputCreate(name=f"Input {n}", description="An input") for n in range(10)],
+        )
+
+        with patch("app.intents.service.event_bus", EventBus()):
+            with assert_max_queries(73):
+                created = await create_intent(request, repository=repository)
+
+        assert created.revision == 1
+        assert len(created.aspects) == 10 and len(created.inputs) == 10
+        assert await self._change_rows(test_db_session, created.id) == 1
+
+    @pytest.mark.asyncio
+    async def test_articulation_update_is_one_revision(self, test_db_session, assert_max_queries):
+        """Test replacing 10 inputs bumps the revision once and records one change row."""
+        repository = IntentRepository(test_db_session)
+        request = IntentCreateRequest(
+            name="Batched",
+            description="Ten inputs",
+            inputs=[InputCreate(name=f"Input {n}", description="An input") for n in range(10)],
+        )
+        payload = IntentArticulationUpdateRequest(
+            inputs=[InputCreate(name=f"Replaced {n}", description="An input") for n in range(10)]
+        )
+
+        with patch("app.intents.service.event_bus", EventBus()):
+            created = await create_intent(request, repository=repository)
+            with assert_max_queries(62):
+                updated = await update_intent_articulation(created.id, payload, repository=repository)
+
+        assert updated.revision == created.revision + 1
+        assert updated.updated_at >= created.updated_at
+        assert [i.name for i in updated.inputs] == [f"Replaced {n}" for n in range(10)]
+        assert await self._change_rows(test_db_session, created.id) == 2
+
+
 @pytest.mark.integration
 class TestAspectRepositoryIntegration:
     """Test adding aspects to an intent (V2)."""
@@ -0,0 +1,175 @@
+"""
+Integration tests for intents NDJSON export/import with real repository (V2).
+
+Tests round trips, reference remapping and batching without mocks.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.intents import transfer
+from app.intents.events import IntentsImportedEvent
+from app.intents.models import Aspect, Assumption, Example, Input, Insight, Output, Prompt
+from app.intents.repository import IntentRepository
+from app.shared.events import EventBus
+from tests.fixtures.intents import create_test_intent
+
+
+async def _seed_composed_intent(repository: IntentRepository, name: str = "Composed") -> int:
+    intent = await repository.create(create_test_intent(id=None, name=name))
+    aspect = await repository.add_aspect(intent.id, Aspect(id=None, intent_id=intent.id, name="SEO"))
+    await repository.add_input(
+        intent.id, Input(id=None, intent_id=intent.id, name="Doc", description="The document", aspect_id=aspect.id)
+    )
+    assumption = await repository.add_assumption(
+        intent.id, Assumption(id=None, intent_id=intent.id, description="English only", aspect_id=aspect.id)
+    )
+    await repository.add_example(intent.id, Example(id=None, intent_id=intent.id, sample="in -> out"))
+    prompt = await repository.add_prompt(intent.id, Prompt(id=None, intent_id=intent.id, content="Summarize.", version=1))
+    output = await repository.add_output(prompt.id, Output(id=None, prompt_id=prompt.id, content="Summary."))
+    await repository.add_insight(
+        intent.id,
+        Insight(
+            id=None,
+            intent_id=intent.id,
+            content="Too long",
+            source_type="output",
+            source_output_id=output.id,
+            source_prompt_id=prompt.id,
+            source_assumption_id=assumption.id,
+        ),
+    )
+    return intent.id
+
+
+async def _lines(*records: str):
+    for record in records:
+        yield record
+
+
+@pytest.mark.integration
+class TestIntentsTransfer:
+    """Test NDJSON export and import of intents."""
+
+    @pytest.mark.asyncio
+    async def test_export_includes_examples_prompts_and_outputs(self, test_db_session):
+        """Test export records carry the full composition."""
+        repository = IntentRepository(test_db_session)
+        await _seed_composed_intent(repository)
+        await test_db_session.commit()
+
+        records = [record async for record in transfer.export_intents(repository)]
+
+        assert len(records) == 1
+        record = records[0]
+        assert [e.sample for e in record.examples] == ["in -> out"]
+        assert [o.content for o in record.prompts[0].outputs] == ["Summary."]
+        assert record.inputs[0].aspect_id == record.aspects[0].id
+
+    @pytest.mark.asyncio
+    async def test_export_pages_through_all_intents_in_id_order(self, test_db_session):
+        """Test keyset paging returns every intent exactly once."""
+        repository = IntentRepository(test_db_session)
+        ids = [(await repository.create(create_test_intent(id=None, name=f"Intent {n}"))).id for n in range(5)]
+        await test_db_session.commit()
+
+        records = [record async for record in transfer.export_intents(repository, batch_size=2)]
+
+        assert [r.id for r in records] == ids
+
+    @pytest.mark.asyncio
+    async def test_import_round_trip_remaps_references(self, test_db_session):
+        """Test an exported intent re-imports with references pointing at the new rows."""
+        repository = IntentRepository(test_db_session)
+        source_id = await _seed_composed_intent(repository)
+        await test_db_session.commit()
+        ndjson = [line async for line in transfer.export_intents_ndjson(repository)]
+
+        with patch("app.intents.transfer.event_bus", EventBus()):
+            summary = await transfer.import_intents(_lines(*ndjson), repository)
+        await test_db_session.commit()
+
+        assert summary.imported == 1
+        copies = [i for i in await repository.list_all() if i.id != source_id]
+        assert len(copies) == 1
+        copy = copies[0]
+        assert copy.name == "Composed"
+        assert copy.inputs[0].aspect_id == copy.aspects[0].id
+        assert copy.assumptions[0].aspect_id == copy.aspects[0].id
+        assert [e.sample for e in copy.examples] == ["in -> out"]
+        insight = copy.insights[0]
+        assert insight.source_prompt_id == copy.prompts[0].id
+        assert insight.source_assumption_id == copy.assumptions[0].id
+        outputs = await repository.list_outputs_by_prompt_id(copy.prompts[0].id)
+        assert [o.content for o in outputs] == ["Summary."]
+        assert insight.source_output_id == outputs[0].id
+
+    @pytest.mark.asyncio
+    async def test_import_dangling_reference_is_stored_as_null(self, test_db_session):
+        """Test a reference to an id not present in the record is dropped."""
+        repository = IntentRepository(test_db_session)
+        record = (
+            '{"name": "N", "description": "D", "aspects": [{"id": 1, "name": "A"}],'
+            ' "pitfalls": [{"description": "P", "aspect_id": 42}]}'
+        )
+
+        with patch("app.intents.transfer.event_bus", EventBus()):
+            await transfer.import_intents(_lines(record), repository)
+
+        intent = (await repository.list_all())[0]
+        assert intent.pitfalls[0].aspect_id is None
+
+    @pytest.mark.asyncio
+    async def test_import_batches_and_publishes_event(self, test_db_session):
+        """Test batch_size controls the number of insert rounds and one event is published."""
+        repository = IntentRepository(test_db_session)
+        records = [f'{{"name": "Intent {n}", "description": "D"}}' for n in range(5)]
+        bus = EventBus()
+        received = []
+
+        async def handler(event):
+            received.append(event)
+
+        bus.subscribe("intents.imported", handler)
+        with patch("app.intents.transfer.event_bus", bus):
+            summary = await transfer.import_intents(_lines(*records, ""), repository, batch_size=2)
+
+        assert (summary.imported, summary.batches) == (5, 3)
+        assert len(await repository.list_all()) == 5
+        assert len(received) == 1
+        assert isinstance(received[0], IntentsImportedEvent)
+        assert received[0].imported_count == 5
+
+    @pytest.mark.asyncio
+    async def test_import_invalid_line_raises_value_error_with_line_number(self, test_db_session):
+        """Test a malformed record reports its line number."""
+        repository = IntentRepository(test_db_session)
+
+        with pytest.raises(ValueError, match="line 2"):
+            await transfer.import_intents(_lines('{"name": "N", "description": "D"}', '{"name": ""}'), repository)
+
+    @pytest.mark.asyncio
+    async def test_iter_ndjson_lines_splits_across_chunks(self):
+        """Test lines split over chunk boundaries are reassembled."""
+
+        async def chunks():
+            for chunk in (b'{"a"', b": 1}\n{", b'"b": 2}\n', b'{"c": 3}'):
+                yield chunk
+
+        lines = [line async for line in transfer.iter_ndjson_lines(chunks())]
+
+        assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+    @pytest.mark.asyncio
+    async def test_iter_ndjson_lines_long_line_in_small_chunks(self):
+        """Test a line spread over many chunks, blank lines and a trailing newline."""
+        body = b"x" * 10_000 + b"\n\nshort\n"
+
+        async def chunks():
+            for start in range(0, len(body), 7):
+                yield body[start:][:7]
+
+        lines = [line async for line in transfer.iter_ndjson_lines(chunks())]
+
+        assert lines == [b"x" * 10_000, b"", b"short"]
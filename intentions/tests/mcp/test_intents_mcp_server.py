@@ -7,18 +7,23 @@ Tests MCP server functionality with real database and service layer.
 import json
 from unittest.mock import patch
 
+import jsonschema
 import pytest
 from mcp.types import TextContent
 
 from app.intents.mcp_server import (
+    TOOL_NAMES,
     _get_function_docstring,
     _intent_to_dict_for_mcp,
     _pydantic_to_json_schema,
     call_tool,
     list_tools,
+    mcp_tool_calls,
+    mcp_tool_duration,
 )
 from app.intents.repository import IntentRepository
 from app.intents.schemas import IntentCreateRequest
+from app.shared.tracing import InMemorySpanExporter, tracer
 
 
 @pytest.mark.integration
@@ -34,6 +39,7 @@ class TestIntentsMCPServer:
         tool_names = [tool.name for tool in tools]
         assert "create_intent" in tool_names
         assert "get_intent" in tool_names
+        assert "get_intents" in tool_names
         assert "list_intents" in tool_names
         assert "delete_intent" in tool_names
         assert "update_intent_name" in tool_names
@@ -63,6 +69,16 @@ class TestIntentsMCPServer:
             assert "type" in tool.inputSchema
             assert tool.inputSchema["type"] == "object"
 
+    @pytest.mark.asyncio
+    async def test_update_intent_articulation_schema_accepts_entities(self):
+        """Test the articulation schema resolves its entity $refs, as the SDK validates arguments against it."""
+        tools = {tool.name: tool for tool in await list_tools()}
+        arguments = {"intent_id": 1, "aspects": [{"name": "Aspect"}], "qualities": [{"criterion": "Fast"}]}
+
+        jsonschema.validate(arguments, tools["update_intent_articulation"].inputSchema)
+        with pytest.raises(jsonschema.ValidationError):
+            jsonschema.validate({"intent_id": 1, "qualities": [{}]}, tools["update_intent_articulation"].inputSchema)
+
     @pytest.mark.asyncio
     async def test_call_tool_create_intent(self, test_db_session):
         """Test creating an intent via MCP tool (V2)."""
@@ -128,6 +144,29 @@ class TestIntentsMCPServer:
         assert result_data["name"] == "Test Intent"
         assert "examples" not in result_data
 
+    @pytest.mark.asyncio
+    async def test_call_tool_get_intent_if_revision(self, test_db_session):
+        """Test get_intent skips unchanged intents and returns changed ones."""
+        from app.intents import service
+
+        repository = IntentRepository(test_db_session)
+        created = await service.create_intent(IntentCreateRequest(name="Test Intent", description="d"), repository)
+        await test_db_session.commit()
+
+        async def mock_get_repository():
+            return repository, test_db_session
+
+        with patch("app.intents.mcp_server._get_repository", side_effect=mock_get_repository):
+            unchanged = await call_tool("get_intent", {"intent_id": created.id, "if_revision": created.revision})
+            await service.update_intent_name(created.id, "Renamed", repository)
+            await test_db_session.commit()
+            changed = await call_tool("get_intent", {"intent_id": created.id, "if_revision": created.revision})
+
+        assert json.loads(unchanged[0].text) == {"intent_id": created.id, "revision": created.revision, "not_modified": True}
+        changed_data = json.loads(changed[0].text)
+        assert changed_data["name"] == "Renamed"
+        assert changed_data["revision"] == created.revision + 1
+
     @pytest.mark.asyncio
     async def test_call_tool_list_intents(self, test_db_session):
         """Test listing intents via MCP tool."""
@@ -205,6 +244,31 @@ class TestIntentsMCPServer:
         assert isinstance(result[0], TextContent)
         assert result[0].text == "Intent not found"
 
+    @pytest.mark.asyncio
+    async def test_call_tool_get_intents(self, test_db_session):
+        """Test fetching several intents via MCP tool with a not-found marker."""
+        repository = IntentRepository(test_db_session)
+        from app.intents import service
+
+        created = await service.create_intent(IntentCreateRequest(name="Batch", description="d"), repository)
+        await test_db_session.commit()
+
+        async def mock_get_repository():
+            return repository, test_db_session
+
+        with patch(
+            "app.intents.mcp_server._get_repository",
+            side_effect=mock_get_repository,
+        ):
+            result = await call_tool("get_intents", {"intent_ids": [99999, created.id]})
+
+        batch = json.loads(result[0].text)
+        assert [item["intent_id"] for item in batch] == [99999, created.id]
+        assert batch[0] == {"intent_id": 99999, "found": False, "intent": None}
+        assert batch[1]["found"] is True
+        assert batch[1]["intent"]["name"] == "Batch"
+        assert "examples" not in batch[1]["intent"]
+
     @pytest.mark.asyncio
     async def test_call_tool_update_intent_name(self, test_db_session):
         """Test updating intent name via MCP tool."""
@@ -269,6 +333,53 @@ class TestIntentsMCPServer:
             with pytest.raises(ValueError, match="intent_id is required"):
                 await call_tool("get_intent", arguments)
 
+    @pytest.mark.asyncio
+    async def test_tool_names_match_listed_tools(self):
+        """Test the metrics label allowlist covers exactly the listed tools."""
+        assert {tool.name for tool in await list_tools()} == TOOL_NAMES
+
+    @pytest.mark.asyncio
+    async def test_call_tool_records_metrics(self, test_db_session):
+        """Test tool calls are counted by outcome and timed; unknown names share one label."""
+        repository = IntentRepository(test_db_session)
+        ok_before = mcp_tool_calls.value(("list_intents", "ok"))
+        unknown_before = mcp_tool_calls.value(("unknown", "error"))
+        timed_before = mcp_tool_duration.count(("list_intents",))
+
+        async def mock_get_repository():
+            return repository, test_db_session
+
+        with patch("app.intents.mcp_server._get_repository", side_effect=mock_get_repository):
+            await call_tool("list_intents", {})
+            with pytest.raises(ValueError):
+                await call_tool("no_such_tool", {})
+
+        assert mcp_tool_calls.value(("list_intents", "ok")) == ok_before + 1
+        assert mcp_tool_calls.value(("unknown", "error")) == unknown_before + 1
+        assert mcp_tool_duration.count(("list_intents",)) == timed_before + 1
+
+    @pytest.mark.asyncio
+    async def test_call_tool_is_traced(self, test_db_session):
+        """Test a tool call gets a span wrapping the service and repository spans."""
+        repository = IntentRepository(test_db_session)
+        exporter = InMemorySpanExporter()
+        previous = tracer.enabled, tracer.exporter
+        tracer.enabled, tracer.exporter = True, exporter
+
+        async def mock_get_repository():
+            return repository, test_db_session
+
+        try:
+            with patch("app.intents.mcp_server._get_repository", side_effect=mock_get_repository):
+                await call_tool("list_intents", {})
+        finally:
+            tracer.enabled, tracer.exporter = previous
+
+        spans = {span.name: span for span in exporter.spans()}
+        tool_span = spans["mcp.tool list_intents"]
+        assert tool_span.attributes["mcp.tool.name"] == "list_intents"
+        assert spans["intents.service.list_intents"].parent_id == tool_span.span_id
+
     @pytest.mark.asyncio
     async def test_pydantic_to_json_schema(self):
         """Test Pydantic to JSON Schema conversion (V2)."""
@@ -0,0 +1,118 @@
+"""
+Tests for Accept header normalization in front of the SDK Streamable HTTP transport.
+"""
+
+import pytest
+
+from app.intents.mcp_sdk_http import _MCP_ACCEPT, AcceptHeaderMiddleware, _normalize_accept_header, _normalized_accept
+
+
+def _scope(*headers: tuple[bytes, bytes]) -> dict:
+    return {"type": "http", "method": "POST", "path": "/mcp", "headers": list(headers)}
+
+
+def _legacy_normalize_accept_header(scope: dict) -> dict:
+    """The former decode-and-copy implementation, the reference for behavioural parity."""
+    headers = list(scope.get("headers", []))
+    accept_index = None
+    accept_value = None
+    for i, (key, value) in enumerate(headers):
+        if key.lower() == b"accept":
+            accept_index = i
+            accept_value = value.decode(errors="ignore").lower()
+            break
+    if accept_value is None:
+        headers.append((b"accept", b"application/json, text/event-stream"))
+    else:
+        has_json = "application/json" in accept_value
+        has_sse = "text/event-stream" in accept_value
+        has_wildcard = "*/*" in accept_value or "application/*" in accept_value
+        if not (has_json and has_sse) and (has_wildcard or has_json or has_sse):
+            headers[accept_index] = (b"accept", b"application/json, text/event-stream")
+    new_scope = dict(scope)
+    new_scope["headers"] = headers
+    return new_scope
+
+
+@pytest.mark.unit
+class TestAcceptHeaderNormalization:
+    """Test the byte-level Accept normalization."""
+
+    @pytest.mark.parametrize(
+        "accept",
+        [b"application/json", b"text/event-stream", b"*/*", b"application/*", b"Application/JSON"],
+    )
+    def test_partial_or_wildcard_accept_is_widened(self, accept):
+        """Test clients accepting only one transport format get both."""
+        scope = _scope((b"content-type", b"application/json"), (b"accept", accept))
+
+        normalized = _normalize_accept_header(scope)
+
+        assert normalized["headers"] == [(b"content-type", b"application/json"), (b"accept", _MCP_ACCEPT)]
+        assert scope["headers"][1] == (b"accept", accept)
+
+    @pytest.mark.parametrize("accept", [b"application/json, text/event-stream", b"text/html"])
+    def test_complete_or_unrelated_accept_keeps_scope(self, accept):
+        """Test no copy is made when the header does not need rewriting."""
+        scope = _scope((b"accept", accept))
+
+        assert _normalize_accept_header(scope) is scope
+
+    def test_missing_accept_is_added(self):
+        """Test a request without Accept gets the transport default."""
+        scope = _scope((b"content-type", b"application/json"))
+
+        assert _normalize_accept_header(scope)["headers"][-1] == (b"accept", _MCP_ACCEPT)
+        assert len(scope["headers"]) == 1
+
+    def test_normalization_is_cached_per_value(self):
+        """Test repeated Accept values hit the cache."""
+        _normalized_accept.cache_clear()
+
+        for _ in range(3):
+            _normalized_accept(b"*/*")
+
+        assert _normalized_accept.cache_info().hits == 2
+
+    @pytest.mark.asyncio
+    async def test_middleware_passes_normalized_scope(self):
+        """Test the middleware rewrites http scopes and leaves others alone."""
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(scope)
+
+        middleware = AcceptHeaderMiddleware(app)
+        lifespan = {"type": "lifespan"}
+
+        await middleware(_scope((b"accept", b"*/*")), None, None)
+        await middleware(lifespan, None, None)
+
+        assert seen[0]["headers"] == [(b"accept", _MCP_ACCEPT)]
+        assert seen[1] is lifespan
+
+
+@pytest.mark.unit
+class TestAcceptHeaderParity:
+    """Test the byte-level normalization matches the former implementation."""
+
+    @pytest.mark.parametrize(
+        "accept",
+        [
+            None,
+            b"application/json, text/event-stream",
+            b"application/json",
+            b"text/event-stream",
+            b"*/*",
+            b"application/*",
+            b"Application/JSON",
+            b"text/html",
+            b"text/html, */*;q=0.8",
+        ],
+    )
+    def test_headers_match_former_implementation(self, accept):
+        """Test both implementations produce the same headers for the same request."""
+        headers = [(b"host", b"localhost"), (b"content-type", b"application/json")]
+        scope = _scope(*headers, *([(b"accept", accept)] if accept is not None else []))
+
+        assert _normalize_accept_header(scope)["headers"] == _legacy_normalize_accept_header(scope)["headers"]
@@ -0,0 +1,115 @@
+"""
+Tests for per-session MCP intent caches and their invalidation on commit.
+"""
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.intents import mcp_sessions
+from app.intents.mcp_sessions import SessionIntentCache, get_session_cache, session_caches, subscribe_cache_invalidation
+from app.intents.models import Prompt
+from app.intents.repository import IntentRepository
+from tests.fixtures.intents import create_test_intent
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    session_caches.clear()
+    yield
+    session_caches.clear()
+
+
+@pytest.mark.unit
+class TestSessionIntentCache:
+    """Test the per-session LRU cache."""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the cache keeps at most max_size intents."""
+        cache = SessionIntentCache(max_size=2)
+        cache.put(1, {"id": 1})
+        cache.put(2, {"id": 2})
+        cache.get(1)
+
+        cache.put(3, {"id": 3})
+
+        assert cache.get(2) is None
+        assert cache.get(1) == {"id": 1}
+        assert len(cache) == 2
+
+    def test_entries_expire_after_ttl(self):
+        """Test stale entries are not served."""
+        cache = SessionIntentCache(ttl_seconds=0)
+        cache.put(1, {"id": 1})
+
+        assert cache.get(1) is None
+        assert cache.misses == 1
+
+    def test_cache_is_disabled_outside_stateful_mode(self, monkeypatch):
+        """Test stateless mode and requests without a session id get no cache."""
+        monkeypatch.setattr(mcp_sessions, "MCP_STATEFUL_SESSIONS", False)
+        assert get_session_cache("abc") is None
+
+        monkeypatch.setattr(mcp_sessions, "MCP_STATEFUL_SESSIONS", True)
+        assert get_session_cache(None) is None
+        assert get_session_cache("abc") is session_caches.get("abc")
+
+
+@pytest.mark.integration
+class TestSessionCacheInvalidation:
+    """Test invalidation when a transaction that changed an intent commits."""
+
+    @pytest.mark.asyncio
+    async def test_commit_invalidates_every_session(self, test_db_session):
+        """Test committed intent changes drop the intents from all session caches, not the write itself."""
+        subscribe_cache_invalidation()
+        subscribe_cache_invalidation()
+        repository = IntentRepository(test_db_session)
+        renamed = await repository.create(create_test_intent(id=None, name="Renamed"))
+        prompted = await repository.create(create_test_intent(id=None, name="Prompted"))
+        await test_db_session.commit()
+        first, second = session_caches.get("a"), session_caches.get("b")
+        for cache in (first, second):
+            cache.put(renamed.id, {"id": renamed.id})
+            cache.put(prompted.id, {"id": prompted.id})
+
+        await repository.update(renamed.id, create_test_intent(id=renamed.id, name="Final"))
+        await repository.add_prompt(prompted.id, Prompt(id=None, intent_id=prompted.id, content="Go.", version=1))
+        assert len(first) == 2 and len(second) == 2
+        await test_db_session.commit()
+
+        assert len(first) == 0 and len(second) == 0
+        assert event.contains(Session, "after_commit", mcp_sessions._invalidate_on_commit)
+
+    @pytest.mark.asyncio
+    async def test_rollback_does_not_invalidate(self, test_db_session):
+        """Test a rolled back change keeps the cache."""
+        subscribe_cache_invalidation()
+        repository = IntentRepository(test_db_session)
+        created = await repository.create(create_test_intent(id=None))
+        await test_db_session.commit()
+        session_caches.get("a").put(created.id, {"id": created.id})
+
+        await repository.delete(created.id)
+        await test_db_session.rollback()
+        await test_db_session.commit()
+
+        assert session_caches.get("a").get(created.id) == {"id": created.id}
+
+    @pytest.mark.asyncio
+    async def test_read_between_write_and_commit_is_not_served(self, test_db_session):
+        """Test a read of the old intent that finishes around the commit is never served afterwards."""
+        subscribe_cache_invalidation()
+        repository = IntentRepository(test_db_session)
+        created = await repository.create(create_test_intent(id=None, name="Old"))
+        await test_db_session.commit()
+        cache = session_caches.get("a")
+
+        await repository.update(created.id, create_test_intent(id=created.id, name="New"))
+        cache.put(created.id, {"name": "Old"})  # read of the committed row, cached before the commit
+        invalidations = cache.invalidations  # read of the committed row, cached after the commit
+        await test_db_session.commit()
+        assert cache.get(created.id) is None
+        cache.put(created.id, {"name": "Old"}, invalidations)
+
+        assert cache.get(created.id) is None
@@ -0,0 +1,152 @@
+"""
+Tests for the legacy MCP HTTP+SSE transport session handling.
+
+Tests bounded queues, overflow policies, idle expiry and gauges.
+"""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.intents import mcp_sse
+from app.intents.mcp_sse import _enqueue, _register_session, _sse_stream, expire_idle_sessions, get_sse_stats, sse_stats
+from app.intents.mcp_sse_sessions import LocalSessionRouter, SessionRegistry
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def clean_sessions(monkeypatch):
+    """Isolate the module-level session registry and counters."""
+    monkeypatch.setattr(mcp_sse, "_session_router", LocalSessionRouter(SessionRegistry(), mcp_sse._enqueue))
+    sse_stats.reset()
+    yield
+    sse_stats.reset()
+
+
+@pytest.mark.unit
+class TestSseQueueOverflow:
+    """Test bounded session queues and overflow policies."""
+
+    @pytest.mark.asyncio
+    async def test_queue_is_bounded_by_configured_maxsize(self, monkeypatch):
+        """Test sessions get a queue with the configured bound."""
+        monkeypatch.setattr(mcp_sse, "SSE_QUEUE_MAXSIZE", 3)
+
+        session = _register_session()
+
+        assert session.queue.maxsize == 3
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_keeps_newest_messages(self, monkeypatch):
+        """Test drop_oldest evicts the head of a full queue."""
+        monkeypatch.setattr(mcp_sse, "SSE_QUEUE_MAXSIZE", 2)
+        monkeypatch.setattr(mcp_sse, "SSE_OVERFLOW_POLICY", "drop_oldest")
+        session = _register_session()
+
+        for payload in ("1", "2", "3"):
+            _enqueue(session, payload)
+
+        assert [session.queue.get_nowait() for _ in range(2)] == ["2", "3"]
+        assert sse_stats.dropped_messages == 1
+
+    @pytest.mark.asyncio
+    async def test_drop_newest_discards_incoming_message(self, monkeypatch):
+        """Test drop_newest leaves a full queue unchanged."""
+        monkeypatch.setattr(mcp_sse, "SSE_QUEUE_MAXSIZE", 2)
+        monkeypatch.setattr(mcp_sse, "SSE_OVERFLOW_POLICY", "drop_newest")
+        session = _register_session()
+
+        for payload in ("1", "2", "3"):
+            _enqueue(session, payload)
+
+        assert [session.queue.get_nowait() for _ in range(2)] == ["1", "2"]
+        assert sse_stats.dropped_messages == 1
+
+    @pytest.mark.asyncio
+    async def test_reject_returns_503_before_handling_request(self, monkeypatch):
+        """Test a full queue under the reject policy answers 503 with Retry-After."""
+        monkeypatch.setattr(mcp_sse, "SSE_QUEUE_MAXSIZE", 1)
+        monkeypatch.setattr(mcp_sse, "SSE_OVERFLOW_POLICY", "reject")
+        session = _register_session()
+        session.queue.put_nowait("pending")
+
+        response = TestClient(app).post(
+            f"/mcp/message?sessionId={session.session_id}",
+            json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+        )
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert session.queue.qsize() == 1
+        assert sse_stats.rejected_messages == 1
+
+
+@pytest.mark.unit
+class TestSseIdleExpiry:
+    """Test idle-session expiry and the stream lifecycle."""
+
+    @pytest.mark.asyncio
+    async def test_expire_idle_sessions_removes_stale_sessions_only(self):
+        """Test sessions without recent stream activity are expired and drained."""
+        stale = _register_session()
+        fresh = _register_session()
+        stale.queue.put_nowait("queued")
+        stale.last_activity = time.monotonic() - 60
+
+        expired = await expire_idle_sessions(idle_timeout=30)
+
+        assert expired == 1
+        assert mcp_sse._get_session(stale.session_id) is None
+        assert mcp_sse._get_session(fresh.session_id) is fresh
+        assert stale.queue.empty()
+        assert stale.closed.is_set()
+        assert get_sse_stats()["expired_sessions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_delivers_messages_and_ends_when_closed(self):
+        """Test the stream yields queued messages, records activity and unregisters on close."""
+        session = _register_session()
+        stream = _sse_stream(session)
+
+        assert (await stream.__anext__()).startswith("event: endpoint")
+        session.queue.put_nowait('{"ok": true}')
+        assert await stream.__anext__() == 'event: message\ndata: {"ok": true}\n\n'
+
+        session.close()
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        assert mcp_sse._get_session(session.session_id) is None
+
+
+@pytest.mark.slow
+class TestSseIdleSessionLoad:
+    """Load test: thousands of idle sessions stay bounded and are reaped."""
+
+    @pytest.mark.asyncio
+    async def test_thousands_of_idle_sessions_are_bounded_and_reaped(self, monkeypatch):
+        """Test queue memory is capped per session and the reaper frees every idle session."""
+        monkeypatch.setattr(mcp_sse, "SSE_QUEUE_MAXSIZE", 10)
+        monkeypatch.setattr(mcp_sse, "SSE_OVERFLOW_POLICY", "drop_oldest")
+        session_count = 5000
+        sessions = [_register_session() for _ in range(session_count)]
+
+        # Clients keep posting but never read their streams
+        for session in sessions:
+            for n in range(25):
+                _enqueue(session, f'{{"id": {n}}}')
+
+        stats = get_sse_stats()
+        assert stats["sessions"] == session_count
+        assert stats["max_queue_depth"] == 10
+        assert stats["queued_messages"] == session_count * 10
+        assert stats["dropped_messages"] == session_count * 15
+
+        for session in sessions:
+            session.last_activity -= 3600
+        assert await expire_idle_sessions() == session_count
+
+        stats = get_sse_stats()
+        assert stats["sessions"] == 0
+        assert stats["queued_messages"] == 0
+        assert all(session.queue.empty() for session in sessions)
@@ -0,0 +1,220 @@
+"""
+Tests for the legacy SSE session registry and routing backends.
+"""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+
+import pytest
+
+from app.intents.mcp_sse_sessions import (
+    BrokerSessionRouter,
+    InProcessBroker,
+    LocalSessionRouter,
+    SessionRegistry,
+    SseSession,
+    UnixSocketSessionRouter,
+)
+
+
+def _session(session_id: str) -> SseSession:
+    return SseSession(session_id=session_id, queue=asyncio.Queue())
+
+
+def _deliver(session: SseSession, payload: str) -> None:
+    session.queue.put_nowait(payload)
+
+
+@pytest.mark.unit
+class TestSessionRegistry:
+    """Test the sharded session registry."""
+
+    def test_add_get_remove(self):
+        """Test sessions are found by id across shards and removed."""
+        registry = SessionRegistry(shard_count=4)
+        sessions = [_session(f"s{n}") for n in range(20)]
+        for session in sessions:
+            registry.add(session)
+
+        assert len(registry) == 20
+        assert all(registry.get(s.session_id) is s for s in sessions)
+        assert registry.remove("s3") is sessions[3]
+        assert registry.get("s3") is None
+        assert registry.remove("s3") is None
+        assert len(registry) == 19
+
+    def test_idle_in_shard_scans_one_shard(self):
+        """Test idle lookup covers every session exactly once across shards."""
+        registry = SessionRegistry(shard_count=4)
+        for n in range(20):
+            session = _session(f"s{n}")
+            session.last_activity = time.monotonic() - (100 if n % 2 else 0)
+            registry.add(session)
+
+        cutoff = time.monotonic() - 50
+        idle = [s.session_id for shard in range(4) for s in registry.idle_in_shard(shard, cutoff)]
+
+        assert sorted(idle) == sorted(f"s{n}" for n in range(1, 20, 2))
+
+
+@pytest.mark.unit
+class TestSessionRouters:
+    """Test local and broker-backed message routing."""
+
+    @pytest.mark.asyncio
+    async def test_local_router_delivers_to_registered_session(self):
+        """Test local delivery and unknown-session handling."""
+        router = LocalSessionRouter(SessionRegistry(), _deliver)
+        session = _session(router.new_session_id())
+        router.register(session)
+
+        assert await router.is_known(session.session_id)
+        assert await router.deliver(session.session_id, "hello")
+        assert session.queue.get_nowait() == "hello"
+        assert not await router.deliver("missing", "hello")
+
+    @pytest.mark.asyncio
+    async def test_broker_router_forwards_to_owning_worker(self):
+        """Test a message posted to one worker reaches the session held by another."""
+        broker = InProcessBroker()
+        owner = BrokerSessionRouter(SessionRegistry(), _deliver, broker, worker_id="a")
+        poster = BrokerSessionRouter(SessionRegistry(), _deliver, broker, worker_id="b")
+        await owner.start()
+        await poster.start()
+        session = _session("s1")
+        owner.register(session)
+
+        assert await poster.is_known("s1")
+        assert await poster.deliver("s1", "routed")
+        assert await asyncio.wait_for(session.queue.get(), timeout=1) == "routed"
+
+        owner.unregister("s1")
+        assert not await poster.is_known("s1")
+        await owner.stop()
+        await poster.stop()
+
+    @pytest.mark.asyncio
+    async def test_broker_router_stop_releases_owned_sessions(self):
+        """Test a stopped worker's sessions are no longer routable."""
+        broker = InProcessBroker()
+        worker = BrokerSessionRouter(SessionRegistry(), _deliver, broker, worker_id="a")
+        await worker.start()
+        worker.register(_session("s1"))
+
+        await worker.stop()
+
+        assert broker.owner("s1") is None
+
+
+@pytest.mark.unit
+class TestUnixSocketSessionRouter:
+    """Test forwarding between workers over Unix domain sockets."""
+
+    @pytest.fixture
+    async def workers(self, tmp_path):
+        owner = UnixSocketSessionRouter(SessionRegistry(), _deliver, str(tmp_path))
+        poster = UnixSocketSessionRouter(SessionRegistry(), _deliver, str(tmp_path))
+        await owner.start()
+        await poster.start()
+        yield owner, poster
+        await owner.stop()
+        await poster.stop()
+
+    @pytest.mark.asyncio
+    async def test_session_id_embeds_worker_token(self, workers):
+        """Test new session ids carry the creating worker's token."""
+        owner, _ = workers
+
+        assert owner.new_session_id().startswith(f"{owner.token}-")
+
+    @pytest.mark.asyncio
+    async def test_message_posted_to_other_worker_reaches_owner(self, workers):
+        """Test the posting worker forwards to the socket of the worker holding the stream."""
+        owner, poster = workers
+        session = _session(owner.new_session_id())
+        owner.register(session)
+
+        assert await poster.is_known(session.session_id)
+        for n in range(3):
+            assert await poster.deliver(session.session_id, f'{{"id": {n}}}')
+
+        assert [session.queue.get_nowait() for _ in range(3)] == ['{"id": 0}', '{"id": 1}', '{"id": 2}']
+
+    @pytest.mark.asyncio
+    async def test_unknown_session_on_owner_is_not_delivered(self, workers):
+        """Test the owner acknowledges a closed session as undelivered."""
+        owner, poster = workers
+
+        assert not await poster.deliver(owner.new_session_id(), "lost")
+        assert not await poster.is_known(owner.new_session_id())
+        assert not await poster.is_known(poster.new_session_id())
+        assert not await poster.is_known("not-a-routable-id")
+
+    @pytest.mark.asyncio
+    async def test_stopped_owner_is_unroutable(self, workers):
+        """Test sessions of a stopped worker are unknown and delivery fails cleanly."""
+        owner, poster = workers
+        session_id = owner.new_session_id()
+        owner.register(_session(session_id))
+        assert await poster.deliver(session_id, "first")
+
+        await owner.stop()
+
+        assert not await poster.is_known(session_id)
+        assert not await poster.deliver(session_id, "second")
+
+    @pytest.mark.asyncio
+    async def test_cancelled_send_drops_the_connection(self, tmp_path):
+        """Test a send cancelled before its ack does not leave the ack for the next frame."""
+        token = "deadbeef0000"
+        received = asyncio.Event()
+        release = asyncio.Event()
+
+        async def serve(reader, writer):
+            first = not received.is_set()
+            header = await reader.readexactly(7)
+            await reader.readexactly(int.from_bytes(header[1:3], "big") + int.from_bytes(header[3:], "big"))
+            received.set()
+            if first:
+                await release.wait()
+            writer.write(b"\x01" if first else b"\x00")
+            await writer.drain()
+
+        server = await asyncio.start_unix_server(serve, path=str(tmp_path / f"{token}.sock"))
+        poster = UnixSocketSessionRouter(SessionRegistry(), _deliver, str(tmp_path))
+        session_id = f"{token}-{uuid.uuid4()}"
+        try:
+            pending = asyncio.create_task(poster.deliver(session_id, "first"))
+            await asyncio.wait_for(received.wait(), timeout=1)
+            pending.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await pending
+            release.set()
+
+            assert token not in poster._peers
+            # A fresh connection answers 0; the stale connection would have read the first frame's 1
+            assert not await poster.deliver(session_id, "second")
+        finally:
+            release.set()
+            await poster.stop()
+            server.close()
+
+    @pytest.mark.asyncio
+    async def test_start_removes_stale_sockets(self, tmp_path, workers):
+        """Test sockets nobody listens on are unlinked at start and live ones are kept."""
+        owner, _ = workers
+        stale = str(tmp_path / "0123456789ab.sock")
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.bind(stale)
+
+        router = UnixSocketSessionRouter(SessionRegistry(), _deliver, str(tmp_path))
+        await router.start()
+        try:
+            assert not os.path.exists(stale)
+            assert os.path.exists(owner._socket_path(owner.token))
+            assert not await router.is_known("0123456789ab-session")
+        finally:
+            await router.stop()
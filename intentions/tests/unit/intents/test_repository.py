@@ -133,6 +133,34 @@ class TestIntentRepositoryFindById:
         assert result is None
 
 
+@pytest.mark.unit
+class TestIntentRepositoryFindByIds:
+    """Test IntentRepository.find_by_ids method."""
+
+    @pytest.mark.asyncio
+    async def test_find_by_ids_loads_existing_intents_with_composition(self, test_db_session):
+        """Test existing intents are returned with relationships loaded and missing IDs skipped."""
+        repo = IntentRepository(test_db_session)
+        first = await repo.create(create_test_intent(id=None, name="First"))
+        second = await repo.create(create_test_intent(id=None, name="Second"))
+        await test_db_session.commit()
+        await repo.add_aspect(second.id, Aspect(id=None, intent_id=second.id, name="SEO"))
+        await test_db_session.commit()
+
+        result = await repo.find_by_ids([second.id, 99999, first.id, second.id])
+
+        by_id = {intent.id: intent for intent in result}
+        assert set(by_id) == {first.id, second.id}
+        assert [a.name for a in by_id[second.id].aspects] == ["SEO"]
+
+    @pytest.mark.asyncio
+    async def test_find_by_ids_with_empty_list_returns_empty(self, test_db_session):
+        """Test an empty ID list does not query."""
+        repo = IntentRepository(test_db_session)
+
+        assert await repo.find_by_ids([]) == []
+
+
 @pytest.mark.unit
 class TestIntentRepositoryCreate:
     """Test IntentRepository.create method."""
@@ -490,6 +518,18 @@ class TestChoiceRepository:
         assert found is not None
         assert found.name == "FindMe"
 
+    @pytest.mark.asyncio
+    async def test_find_choice_by_id_scoped_to_intent(self, test_db_session):
+        """Test a choice is not found through a different intent."""
+        repo = IntentRepository(test_db_session)
+        owner = await repo.create(create_test_intent(id=None, name="Owner"))
+        other = await repo.create(create_test_intent(id=None, name="Other"))
+        await test_db_session.commit()
+        added = await repo.add_choice(owner.id, Choice(id=None, intent_id=owner.id, name="Scoped", description="d"))
+        await test_db_session.commit()
+
+        assert await repo.find_choice_by_id(other.id, added.id) is None
+
 
 @pytest.mark.unit
 class TestPitfallRepository:
@@ -753,6 +793,21 @@ class TestOutputRepository:
         assert len(result) == 1
         assert result[0].content == "Output one"
 
+    @pytest.mark.asyncio
+    async def test_get_prompt_id_for_output(self, test_db_session):
+        """Test resolving the prompt that owns an output."""
+        repo = IntentRepository(test_db_session)
+        created_intent = await repo.create(create_test_intent(id=None, name="Test Intent"))
+        await test_db_session.commit()
+        created_prompt = await repo.add_prompt(
+            created_intent.id, Prompt(id=None, intent_id=created_intent.id, content="Prompt.", version=1)
+        )
+        output = await repo.add_output(created_prompt.id, Output(id=None, prompt_id=created_prompt.id, content="Out"))
+        await test_db_session.commit()
+
+        assert await repo.get_prompt_id_for_output(output.id) == created_prompt.id
+        assert await repo.get_prompt_id_for_output(99999) is None
+
 
 @pytest.mark.unit
 class TestInsightRepository:
@@ -798,3 +853,110 @@ class TestInsightRepository:
         result = await repo.list_insights_by_intent_id(created_intent.id)
         assert len(result) == 1
         assert result[0].content == "Insight one"
+
+
+@pytest.mark.unit
+class TestIntentRevision:
+    """Test that writes to an intent or its entities bump the intent revision."""
+
+    @pytest.mark.asyncio
+    async def test_child_writes_bump_revision_and_updated_at(self, test_db_session):
+        """Test adding a prompt, an output and updating an aspect each bump the revision."""
+        repo = IntentRepository(test_db_session)
+        created = await repo.create(create_test_intent(id=None, name="Test Intent"))
+        aspect = await repo.add_aspect(created.id, Aspect(id=None, intent_id=created.id, name="SEO"))
+        revision, updated_at = await repo.get_version(created.id)
+
+        prompt = await repo.add_prompt(created.id, Prompt(id=None, intent_id=created.id, content="Do it", version=1))
+        await repo.add_output(prompt.id, Output(id=None, prompt_id=prompt.id, content="Done"))
+        await repo.update_aspect(created.id, aspect.id, Aspect(id=aspect.id, intent_id=created.id, name="Speed"))
+        await test_db_session.commit()
+
+        reloaded = await repo.find_by_id(created.id)
+        assert created.revision == 1
+        assert reloaded.revision == revision + 3
+        assert reloaded.updated_at >= updated_at
+        assert await repo.get_version(created.id) == (reloaded.revision, reloaded.updated_at)
+
+    @pytest.mark.asyncio
+    async def test_batched_child_writes_bump_revision_once(self, test_db_session):
+        """Test child writes inside batch_changes are one revision and one change; a failed batch records nothing."""
+        repo = IntentRepository(test_db_session)
+        created = await repo.create(create_test_intent(id=None, name="Test Intent"))
+
+        async with repo.batch_changes():
+            for name in ("SEO", "Speed", "Cost"):
+                await repo.add_aspect(created.id, Aspect(id=None, intent_id=created.id, name=name))
+        with pytest.raises(RuntimeError):
+            async with repo.batch_changes():
+                await repo.add_aspect(created.id, Aspect(id=None, intent_id=created.id, name="Lost"))
+                raise RuntimeError("abort")
+
+        assert (await repo.get_version(created.id))[0] == 2
+        assert [c.cursor for c in await repo.list_changes(0, 10)] == [2]
+
+    @pytest.mark.asyncio
+    async def test_no_op_delete_does_not_bump_revision(self, test_db_session):
+        """Test deleting a missing child leaves the revision unchanged."""
+        repo = IntentRepository(test_db_session)
+        created = await repo.create(create_test_intent(id=None, name="Test Intent"))
+
+        assert await repo.delete_aspect(created.id, 999) is False
+        assert (await repo.get_version(created.id))[0] == 1
+        assert await repo.get_version(999) is None
+
+
+@pytest.mark.unit
+class TestIntentChanges:
+    """Test the intent_changes log behind the change feed."""
+
+    @pytest.mark.asyncio
+    async def test_changes_are_folded_per_intent_in_cursor_order(self, test_db_session):
+        """Test each changed intent appears once, at its latest change."""
+        repo = IntentRepository(test_db_session)
+        first = await repo.create(create_test_intent(id=None, name="First"))
+        second = await repo.create(create_test_intent(id=None, name="Second"))
+        prompt = await repo.add_prompt(first.id, Prompt(id=None, intent_id=first.id, content="Do it", version=1))
+        await repo.add_output(prompt.id, Output(id=None, prompt_id=prompt.id, content="Done"))
+
+        changes = await repo.list_changes(0, 10)
+
+        assert [(c.intent_id, c.change_type) for c in changes] == [(second.id, "created"), (first.id, "updated")]
+        assert changes[0].cursor < changes[1].cursor == await repo.get_latest_change_cursor()
+        assert await repo.list_changes(changes[1].cursor, 10) == []
+
+    @pytest.mark.asyncio
+    async def test_limit_keeps_later_changes_for_the_next_page(self, test_db_session):
+        """Test resuming from the last returned cursor yields the remaining intents."""
+        repo = IntentRepository(test_db_session)
+        ids = [(await repo.create(create_test_intent(id=None, name=f"Intent {n}"))).id for n in range(3)]
+
+        page = await repo.list_changes(0, 2)
+        rest = await repo.list_changes(page[-1].cursor, 2)
+
+        assert [c.intent_id for c in page + rest] == ids
+
+    @pytest.mark.asyncio
+    async def test_delete_is_recorded_only_when_a_row_was_deleted(self, test_db_session):
+        """Test deleting an intent records a deleted change and no-op deletes record nothing."""
+        repo = IntentRepository(test_db_session)
+        assert await repo.get_latest_change_cursor() == 0
+        created = await repo.create(create_test_intent(id=None, name="Doomed"))
+        await repo.delete_aspect(created.id, 999)
+        cursor = await repo.get_latest_change_cursor()
+
+        await repo.delete(created.id)
+        await repo.delete(created.id)
+
+        changes = await repo.list_changes(cursor, 10)
+        assert [(c.intent_id, c.change_type) for c in changes] == [(created.id, "deleted")]
+        assert await repo.get_latest_change_cursor() == cursor + 1
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_records_one_change_per_intent(self, test_db_session):
+        """Test imported intents appear in the feed as created."""
+        repo = IntentRepository(test_db_session)
+
+        ids = await repo.bulk_create([(create_test_intent(id=None, name=f"Imported {n}"), []) for n in range(2)])
+
+        assert [(c.intent_id, c.change_type) for c in await repo.list_changes(0, 10)] == [(i, "created") for i in ids]
@@ -0,0 +1,74 @@
+"""
+Unit tests for the fast intent serialization path.
+
+The dict builders must produce exactly what the response schemas produce.
+"""
+
+from datetime import datetime
+
+import pytest
+from pydantic_core import to_json
+
+from app.intents.models import Aspect, Assumption, Choice, Example, Input, Insight, IntentChange, Pitfall, Prompt, Quality
+from app.intents.schemas import IntentBatchGetResponse, IntentChangeItem, IntentResponse, IntentResponseForMCP
+from app.intents.serialization import batch_get_to_dict, change_to_dict, intent_to_dict, intent_to_mcp_dict, json_response
+from tests.fixtures.intents import create_test_intent
+
+
+def _composed_intent():
+    intent = create_test_intent(id=7, updated_at=datetime(2025, 1, 2, 8, 30, 0, 125000))
+    intent.revision = 4
+    intent.aspects = [Aspect(id=1, intent_id=7, name="SEO", description=None)]
+    intent.inputs = [Input(id=2, intent_id=7, name="Doc", description="The document")]
+    intent.choices = [Choice(id=3, intent_id=7, name="Tone", description="Formal or casual")]
+    intent.pitfalls = [Pitfall(id=4, intent_id=7, description="Too long")]
+    intent.assumptions = [Assumption(id=5, intent_id=7, description="English only")]
+    intent.qualities = [Quality(id=6, intent_id=7, criterion="Under 200 words", priority="must_have")]
+    intent.examples = [Example(id=8, intent_id=7, sample="in -> out")]
+    intent.prompts = [Prompt(id=9, intent_id=7, content='Summarize "this" ✓', version=2)]
+    intent.insights = [Insight(id=10, intent_id=7, content="Shorter is better", status="pending")]
+    return intent
+
+
+@pytest.mark.unit
+class TestIntentSerialization:
+    """Test the dict builders against the Pydantic response schemas."""
+
+    def test_intent_matches_intent_response(self):
+        """Test REST output is byte-identical to IntentResponse.model_dump_json()."""
+        intent = _composed_intent()
+
+        expected = IntentResponse.model_validate(intent, from_attributes=True).model_dump_json().encode()
+
+        assert to_json(intent_to_dict(intent)) == expected
+
+    def test_mcp_dict_matches_intent_response_for_mcp(self):
+        """Test the MCP dict equals the schema's JSON-mode dump, without examples."""
+        intent = _composed_intent()
+
+        result = intent_to_mcp_dict(intent)
+
+        assert result == IntentResponseForMCP.model_validate(intent, from_attributes=True).model_dump(mode="json")
+        assert "examples" not in result
+
+    def test_change_and_batch_match_their_schemas(self):
+        """Test change items and batch results, including deleted and missing intents."""
+        intent = _composed_intent()
+        changes = [IntentChange(3, 7, "updated", intent), IntentChange(4, 8, "deleted")]
+        batch = batch_get_to_dict([7, 99], [intent, None])
+
+        for change in changes:
+            assert (
+                to_json(change_to_dict(change))
+                == IntentChangeItem.model_validate(change_to_dict(change)).model_dump_json().encode()
+            )
+        assert to_json(batch) == IntentBatchGetResponse.model_validate(batch).model_dump_json().encode()
+
+    def test_json_response_carries_encoded_body(self):
+        """Test the response holds the pre-encoded bytes with the given status and headers."""
+        response = json_response({"ok": True}, status_code=201, headers={"ETag": '"1"'})
+
+        assert response.body == b'{"ok":true}'
+        assert response.status_code == 201
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["etag"] == '"1"'
@@ -17,6 +17,7 @@ from app.intents.service import (
     create_intent,
     delete_intent,
     get_intent,
+    get_intents,
     list_intents,
     update_intent_articulation,
     update_intent_description,
@@ -107,6 +108,25 @@ class TestGetIntent:
         assert result is None
 
 
+@pytest.mark.unit
+class TestGetIntents:
+    """Test get_intents service function."""
+
+    @pytest.mark.asyncio
+    async def test_get_intents_returns_request_order_with_none_for_missing(self):
+        """Test results follow the requested IDs and missing IDs map to None."""
+        first = create_test_intent(id=1, name="First")
+        third = create_test_intent(id=3, name="Third")
+
+        mock_repo = MagicMock()
+        mock_repo.find_by_ids = AsyncMock(return_value=[first, third])
+
+        result = await get_intents([3, 2, 1, 3], repository=mock_repo)
+
+        assert result == [third, None, first, third]
+        mock_repo.find_by_ids.assert_called_once_with([3, 2, 1, 3])
+
+
 @pytest.mark.unit
 class TestUpdateIntentName:
     """Test update_intent_name service function."""
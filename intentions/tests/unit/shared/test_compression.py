@@ -0,0 +1,152 @@
+"""
+Unit tests for the response compression middleware.
+
+Tests encoding negotiation, size threshold, content-type allowlist, path
+opt-out and per-chunk flushing of streamed responses.
+"""
+
+import asyncio
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.shared.compression import CompressionMiddleware, select_encoding
+
+LARGE = {"items": ["intent articulation"] * 200}
+
+
+def _app(**options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/large")
+    async def large():
+        return JSONResponse(LARGE)
+
+    @app.get("/small")
+    async def small():
+        return JSONResponse({"ok": True})
+
+    @app.get("/tagged")
+    async def tagged():
+        return JSONResponse(LARGE, headers={"ETag": '"3-abc"'})
+
+    @app.get("/image")
+    async def image():
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    @app.get("/raw/large")
+    async def raw_large():
+        return JSONResponse(LARGE)
+
+    @app.get("/events")
+    async def events():
+        async def body():
+            for n in range(3):
+                yield f"data: event {n}\n\n"
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    app.add_middleware(CompressionMiddleware, **options)
+    return app
+
+
+@pytest.mark.unit
+class TestSelectEncoding:
+    """Test Accept-Encoding negotiation."""
+
+    @pytest.mark.parametrize(
+        ("accept_encoding", "expected"),
+        [
+            ("gzip, deflate", "gzip"),
+            ("deflate", None),
+            ("gzip;q=0", None),
+            ("*", "gzip"),
+            ("*, gzip;q=0", None),
+            ("br;q=1.0, GZIP;q=0.5", "gzip"),
+        ],
+    )
+    def test_negotiation(self, accept_encoding, expected):
+        """Test the first available server encoding with q > 0 is chosen."""
+        assert select_encoding(accept_encoding, ("zstd", "br", "gzip")) == expected
+
+
+@pytest.mark.unit
+class TestCompressionMiddleware:
+    """Test which responses are compressed and how."""
+
+    def test_large_json_is_gzipped(self):
+        """Test responses above the threshold are compressed with a matching Content-Length."""
+        client = TestClient(_app(minimum_size=500))
+
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert response.json() == LARGE
+
+    def test_small_disallowed_or_excluded_responses_are_unchanged(self):
+        """Test the size threshold, the content-type allowlist and the path opt-out."""
+        client = TestClient(_app(minimum_size=500, excluded_paths=("/raw",)))
+
+        for path in ("/small", "/image", "/raw/large"):
+            response = client.get(path, headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in response.headers, path
+
+    def test_small_eligible_responses_vary_on_accept_encoding(self):
+        """Test a response below the threshold still tells caches it depends on Accept-Encoding."""
+        client = TestClient(_app(minimum_size=500))
+
+        assert client.get("/small", headers={"Accept-Encoding": "gzip"}).headers["vary"] == "Accept-Encoding"
+        assert "vary" not in client.get("/image", headers={"Accept-Encoding": "gzip"}).headers
+
+    def test_strong_etag_is_weakened_when_encoded(self):
+        """Test the encoded representation does not reuse the identity response's strong ETag."""
+        client = TestClient(_app(minimum_size=500))
+
+        encoded = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+        identity = client.get("/tagged", headers={"Accept-Encoding": "identity"})
+
+        assert encoded.headers["etag"] == 'W/"3-abc"'
+        assert identity.headers["etag"] == '"3-abc"'
+
+    def test_without_acceptable_encoding_nothing_is_compressed(self):
+        """Test clients that do not accept a supported encoding get identity responses."""
+        client = TestClient(_app(minimum_size=500))
+
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_streamed_chunks_are_flushed_individually(self):
+        """Test every SSE chunk decodes on arrival, even below the size threshold."""
+        app = _app(minimum_size=10_000)
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/events",
+            "raw_path": b"/events",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"accept-encoding", b"gzip")],
+        }
+        messages = []
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        async def send(message):
+            messages.append(message)
+
+        await app(scope, receive, send)
+
+        headers = dict(messages[0]["headers"])
+        assert headers[b"content-encoding"] == b"gzip"
+        assert b"content-length" not in headers
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        decoded = [decoder.decompress(m["body"]) for m in messages[1:] if m["body"]]
+        assert decoded[:3] == [f"data: event {n}\n\n".encode() for n in range(3)]
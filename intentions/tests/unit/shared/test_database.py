@@ -0,0 +1,223 @@
+"""
+Unit tests for shared database session management.
+
+Tests lazy connection checkout, early release and pool occupancy counters.
+"""
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, field_serializer
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.shared import database
+from app.shared.database import (
+    LazySession,
+    close_db,
+    get_database_url,
+    get_db,
+    get_engine,
+    get_pool_stats,
+    get_read_engine,
+    get_read_session_factory,
+    get_session_factory,
+    init_db,
+    pool_stats,
+    release_db_session,
+)
+from app.shared.dependencies import SessionReleasingRoute
+
+
+@pytest.fixture
+async def lazy_session_factory(monkeypatch):
+    """Install a session factory backed by a fresh in-memory engine."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    database._register_pool_listeners(engine)
+    factory = async_sessionmaker(engine, class_=AsyncSession, sync_session_class=LazySession, expire_on_commit=False)
+    monkeypatch.setattr(database, "_session_factory", factory)
+    pool_stats.reset()
+    yield factory
+    await engine.dispose()
+    pool_stats.reset()
+
+
+@pytest.mark.unit
+class TestGetDb:
+    """Test get_db lazy session behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_get_db_without_queries_never_checks_out_connection(self, lazy_session_factory):
+        """Test a request that never queries holds no connection."""
+        gen = get_db()
+        await gen.__anext__()
+
+        assert pool_stats.checkouts == 0
+        with pytest.raises(StopAsyncIteration):
+            await gen.__anext__()
+
+        stats = get_pool_stats()
+        assert stats["checkouts"] == 0
+        assert stats["sessions_without_connection"] == 1
+        assert stats["connection_holds"] == 0
+
+    @pytest.mark.asyncio
+    async def test_get_db_with_query_records_connection_hold(self, lazy_session_factory):
+        """Test the connection is checked out on first execute and returned on commit."""
+        gen = get_db()
+        session = await gen.__anext__()
+        await session.execute(text("SELECT 1"))
+        assert pool_stats.checked_out == 1
+
+        with pytest.raises(StopAsyncIteration):
+            await gen.__anext__()
+
+        assert pool_stats.checked_out == 0
+        assert pool_stats.connection_holds == 1
+        assert pool_stats.connection_hold_seconds_max >= 0
+        assert session.info["connection_hold_seconds"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_release_db_session_returns_connection_before_dependency_exit(self, lazy_session_factory):
+        """Test release_db_session commits while the request session is still open."""
+        gen = get_db()
+        session = await gen.__anext__()
+        await session.execute(text("SELECT 1"))
+
+        await release_db_session()
+
+        assert pool_stats.checked_out == 0
+        assert not session.in_transaction()
+        with pytest.raises(StopAsyncIteration):
+            await gen.__anext__()
+
+    @pytest.mark.asyncio
+    async def test_release_db_session_outside_request_is_noop(self, lazy_session_factory):
+        """Test release_db_session does nothing when no request session is active."""
+        await release_db_session()
+
+        assert pool_stats.checkouts == 0
+
+
+class _ProbeResponse(BaseModel):
+    value: int
+
+    @field_serializer("value")
+    def _record_checked_out(self, value: int) -> int:
+        # Report how many connections are checked out while the body is serialized
+        return pool_stats.checked_out
+
+
+@pytest.mark.unit
+class TestSessionReleasingRoute:
+    """Test SessionReleasingRoute commits before response serialization."""
+
+    def test_route_releases_connection_before_serialization(self, lazy_session_factory):
+        """Test no connection is held while the response model is serialized."""
+        router = APIRouter(route_class=SessionReleasingRoute)
+
+        @router.get("/probe", response_model=_ProbeResponse)
+        async def probe(db: AsyncSession = Depends(get_db)):
+            await db.execute(text("SELECT 1"))
+            return _ProbeResponse(value=pool_stats.checked_out)
+
+        app = FastAPI()
+        app.include_router(router)
+
+        response = TestClient(app).get("/probe")
+
+        assert response.status_code == 200
+        assert response.json() == {"value": 0}
+        assert pool_stats.connection_holds == 1
+
+
+@pytest.fixture
+async def sqlite_file_profile(monkeypatch, tmp_path):
+    """Switch the global engine to the file-backed SQLite profile."""
+    monkeypatch.setenv("DATABASE_TYPE", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "intentions.db"))
+    for name in ("_engine", "_session_factory", "_read_engine", "_read_session_factory"):
+        monkeypatch.setattr(database, name, None)
+    await init_db()
+    yield tmp_path / "intentions.db"
+    await close_db()
+
+
+@pytest.mark.unit
+class TestSqliteFileProfile:
+    """Test the file-backed SQLite engine profile."""
+
+    def test_get_database_url_without_sqlite_path_is_in_memory(self, monkeypatch):
+        """Test the default profile stays in-memory."""
+        monkeypatch.setenv("DATABASE_TYPE", "sqlite")
+        monkeypatch.delenv("SQLITE_PATH", raising=False)
+
+        assert get_database_url() == "sqlite+aiosqlite:///:memory:"
+
+    @pytest.mark.asyncio
+    async def test_file_profile_creates_database_file(self, sqlite_file_profile):
+        """Test init_db creates the schema in the configured file."""
+        assert get_database_url() == f"sqlite+aiosqlite:///{sqlite_file_profile}"
+        assert sqlite_file_profile.exists()
+
+    @pytest.mark.asyncio
+    async def test_write_engine_applies_wal_pragmas(self, sqlite_file_profile):
+        """Test writer connections run in WAL mode with tuned pragmas."""
+        async with get_engine().connect() as conn:
+            journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+            synchronous = (await conn.execute(text("PRAGMA synchronous"))).scalar()
+            busy_timeout = (await conn.execute(text("PRAGMA busy_timeout"))).scalar()
+
+        assert journal_mode == "wal"
+        assert synchronous == 1  # NORMAL
+        assert busy_timeout == 5000
+
+    @pytest.mark.asyncio
+    async def test_write_engine_has_single_connection(self, sqlite_file_profile):
+        """Test writes are serialized through one pooled connection."""
+        assert get_engine().sync_engine.pool.size() == 1
+
+    @pytest.mark.asyncio
+    async def test_read_engine_is_separate_and_query_only(self, sqlite_file_profile):
+        """Test the read pool is distinct from the writer and rejects writes."""
+        read_engine = get_read_engine()
+
+        assert read_engine is not get_engine()
+        assert get_read_session_factory() is not get_session_factory()
+        async with read_engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.execute(text("CREATE TABLE forbidden (id INTEGER)"))
+
+    @pytest.mark.asyncio
+    async def test_read_engine_sees_committed_writes(self, sqlite_file_profile):
+        """Test readers see data committed through the writer."""
+        async with get_session_factory()() as session:
+            await session.execute(
+                text(
+                    "INSERT INTO intents (name, description, created_at, updated_at) "
+                    "VALUES ('n', 'd', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+                )
+            )
+            await session.commit()
+
+        async with get_read_session_factory()() as session:
+            count = (await session.execute(text("SELECT COUNT(*) FROM intents"))).scalar()
+
+        assert count == 1
+
+    @pytest.mark.asyncio
+    async def test_in_memory_profile_reads_through_main_engine(self, monkeypatch):
+        """Test profiles without a read pool share the main engine."""
+        monkeypatch.delenv("SQLITE_PATH", raising=False)
+        for name in ("_engine", "_session_factory", "_read_engine", "_read_session_factory"):
+            monkeypatch.setattr(database, name, None)
+
+        assert get_read_engine() is get_engine()
+        assert get_read_session_factory() is get_session_factory()
+        await close_db()
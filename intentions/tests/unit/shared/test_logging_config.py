@@ -0,0 +1,179 @@
+"""
+Unit tests for structured logging and the background log pipeline.
+"""
+
+import io
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.shared.logging_config import BoundedQueueHandler, LogPipeline, StructuredFormatter, orjson
+
+
+class _ThreadRecordingHandler(logging.StreamHandler):
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.threads = set()
+
+    def emit(self, record):
+        self.threads.add(threading.current_thread().name)
+        super().emit(record)
+
+
+class _SlowHandler(logging.StreamHandler):
+    def emit(self, record):
+        time.sleep(0.01)
+        super().emit(record)
+
+
+@pytest.fixture
+def pipeline():
+    stream = io.StringIO()
+    handler = _ThreadRecordingHandler(stream)
+    handler.setFormatter(StructuredFormatter())
+    test_logger = logging.getLogger("test_log_pipeline")
+    test_logger.handlers = [handler]
+    test_logger.setLevel(logging.INFO)
+    test_logger.propagate = False
+    pipeline = LogPipeline(test_logger, handler, queue_size=100)
+    yield pipeline
+    pipeline.stop()
+
+
+def _lines(pipeline):
+    return [json.loads(line) for line in pipeline.handler.stream.getvalue().splitlines()]
+
+
+@pytest.mark.unit
+class TestLogPipeline:
+    """Test queue-based log output."""
+
+    def test_records_are_formatted_on_the_listener_thread(self, pipeline):
+        """Test formatting and output happen off the calling thread and stop flushes everything."""
+        pipeline.start()
+        pipeline.start()
+
+        for n in range(50):
+            pipeline.logger.info("Request %d", n, extra={"path": "/health"})
+        pipeline.stop()
+
+        lines = _lines(pipeline)
+        assert [line["message"] for line in lines] == [f"Request {n}" for n in range(50)]
+        assert lines[0]["path"] == "/health"
+        assert threading.current_thread().name not in pipeline.handler.threads
+        assert pipeline.logger.handlers == [pipeline.handler]
+
+    def test_exception_info_survives_the_queue(self, pipeline):
+        """Test the structured exception block is still produced by the listener."""
+        pipeline.start()
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            pipeline.logger.exception("Failed")
+        pipeline.stop()
+
+        exception = _lines(pipeline)[0]["exception"]
+        assert exception["type"] == "ValueError"
+        assert "boom" in exception["traceback"]
+
+    def test_full_queue_drops_and_counts(self):
+        """Test records beyond the queue size are dropped without blocking."""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+
+        for _ in range(3):
+            handler.handle(record)
+
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 2
+
+    def test_stop_with_a_full_queue_waits_for_the_listener(self):
+        """Test stop writes every queued record and restores the handler when the queue is full."""
+        stream = io.StringIO()
+        handler = _SlowHandler(stream)
+        handler.setFormatter(StructuredFormatter())
+        test_logger = logging.getLogger("test_log_pipeline_full")
+        test_logger.handlers = [handler]
+        test_logger.setLevel(logging.INFO)
+        test_logger.propagate = False
+        pipeline = LogPipeline(test_logger, handler, queue_size=5)
+        pipeline.start()
+
+        for n in range(50):
+            test_logger.info("Record %d", n)
+        assert pipeline.queue.full()
+        pipeline.stop()
+
+        written = len(stream.getvalue().splitlines())
+        assert not pipeline.running
+        assert test_logger.handlers == [handler]
+        assert pipeline.queue.empty()
+        assert written == 50 - pipeline.dropped + 1
+
+    def test_stop_reports_dropped_records(self, pipeline):
+        """Test the drop count is logged when the pipeline stops."""
+        pipeline.start()
+        pipeline.queue_handler.dropped = 3
+        pipeline.stop()
+
+        line = _lines(pipeline)[-1]
+        assert line["message"] == "Log records dropped (queue full)"
+        assert line["dropped_count"] == 3
+
+
+def _record(**extra):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "Intent %s loaded", (7,), None)
+    record.__dict__.update(extra)
+    return record
+
+
+ENCODERS = ["json", pytest.param("orjson", marks=pytest.mark.skipif(orjson is None, reason="orjson not installed"))]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("encoder", ENCODERS)
+class TestStructuredFormatter:
+    """Test the JSON formatter with each available encoder."""
+
+    def test_formats_message_and_extras(self, encoder):
+        """Test standard attributes are left out, extras kept and duration renamed."""
+        line = json.loads(StructuredFormatter(encoder).format(_record(intent_id=7, duration=0.25)))
+
+        assert line["level"] == "INFO"
+        assert line["logger"] == "test"
+        assert line["message"] == "Intent 7 loaded"
+        assert line["intent_id"] == 7
+        assert line["duration_seconds"] == 0.25
+        assert not {"msg", "args", "lineno", "created", "taskName"} & line.keys()
+
+    def test_timestamp_comes_from_record_created(self, encoder):
+        """Test the timestamp is the time of the logging call, not of formatting."""
+        record = _record()
+        record.created = datetime(2024, 5, 17, 8, 30, 15, 123456, tzinfo=timezone.utc).timestamp()
+
+        line = json.loads(StructuredFormatter(encoder).format(record))
+
+        assert line["timestamp"] == "2024-05-17T08:30:15.123456Z"
+
+    def test_unserializable_extras_do_not_raise(self, encoder):
+        """Test values the encoder cannot handle are written as readable fallbacks."""
+
+        class Opaque:
+            def __repr__(self):
+                return "<Opaque>"
+
+        record = _record(obj=Opaque(), tags={"a"}, raw=b"bytes", day=date(2024, 5, 17), big=2**70, by_id={1: "a"})
+
+        line = json.loads(StructuredFormatter(encoder).format(record))
+
+        assert line["obj"] == "<Opaque>"
+        assert line["tags"] == ["a"]
+        assert line["raw"] == "bytes"
+        assert line["day"] == "2024-05-17"
+        assert line["big"] == 2**70
+        assert line["by_id"] == {"1": "a"}
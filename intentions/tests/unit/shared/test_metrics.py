@@ -0,0 +1,158 @@
+"""
+Unit tests for in-process metrics and the /metrics endpoint.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.intents.repository import IntentRepository
+from app.main import app
+from app.shared import events, metrics, middleware
+from app.shared.database import _register_query_listeners
+from app.shared.events import EventBus
+from app.shared.metrics import MetricsRegistry, db_queries, http_request_duration, repository_call_duration
+from app.shared.middleware import RequestLoggingMiddleware
+from app.users.events import UserCreatedEvent
+
+
+@pytest.mark.unit
+class TestMetricsRegistry:
+    """Test metric types and the text exposition format."""
+
+    def test_counter(self):
+        """Test counters add up per label set and render sorted."""
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs run", ("kind",))
+
+        counter.inc(("b",))
+        counter.inc(("a",), 2)
+        counter.inc(("b",))
+
+        assert registry.render() == (
+            "# HELP jobs_total Jobs run\n" "# TYPE jobs_total counter\n" 'jobs_total{kind="a"} 2\n' 'jobs_total{kind="b"} 2\n'
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test observations land in the first bucket whose bound is not below them."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()[2:]
+        assert lines == [
+            'latency_seconds_bucket{le="0.1"} 2',
+            'latency_seconds_bucket{le="1"} 3',
+            'latency_seconds_bucket{le="+Inf"} 4',
+            "latency_seconds_sum 3.65",
+            "latency_seconds_count 4",
+        ]
+        assert histogram.count() == 4
+
+    def test_callback_metric_and_label_escaping(self):
+        """Test callbacks are read at render time and label values are escaped."""
+        registry = MetricsRegistry()
+        state = {'say "hi"\n': 3}
+        registry.callback("queue_depth", "Depth", lambda: {(name,): value for name, value in state.items()}, ("queue",))
+
+        assert 'queue_depth{queue="say \\"hi\\"\\n"} 3' in registry.render()
+
+    def test_registering_twice_returns_the_same_metric(self):
+        """Test modules can register on import without duplicates, but types may not change."""
+        registry = MetricsRegistry()
+        counter = registry.counter("events_total", "Events")
+
+        assert registry.counter("events_total", "Events") is counter
+        with pytest.raises(ValueError):
+            registry.histogram("events_total", "Events")
+
+    def test_metric_types_must_render_lines(self):
+        """Test a metric type without lines() cannot be created."""
+
+        class Incomplete(metrics._Metric):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete("incomplete", "No lines")
+
+    def test_reset_clears_values(self):
+        """Test reset empties counters and histograms."""
+        registry = MetricsRegistry()
+        registry.counter("events_total", "Events").inc()
+
+        registry.reset()
+
+        assert registry.get("events_total").value() == 0
+
+
+@pytest.mark.unit
+class TestRepositoryInstrumentation:
+    """Test repository methods and their SQL statements are measured."""
+
+    async def test_queries_are_labelled_with_the_repository_method(self, test_db_session):
+        """Test statements run inside a repository method are counted under its name."""
+        _register_query_listeners(test_db_session.bind)
+        label = ("IntentRepository.find_by_id",)
+        calls_before = repository_call_duration.count(label)
+        queries_before = db_queries.value(label)
+
+        await IntentRepository(test_db_session).find_by_id(1)
+
+        assert repository_call_duration.count(label) == calls_before + 1
+        assert db_queries.value(label) > queries_before
+
+
+@pytest.mark.unit
+class TestMetricsEndpoint:
+    """Test the /metrics scrape target."""
+
+    def test_exposes_http_metrics_by_route_template(self):
+        """Test requests are recorded under their route and the output is Prometheus text."""
+        client = TestClient(app)
+        client.get("/health")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+        assert "# TYPE db_pool_checked_out gauge" in response.text
+        assert "# TYPE mcp_sse_sessions gauge" in response.text
+
+    def test_failed_requests_are_recorded_as_500(self):
+        """Test a route that raises is recorded with status 500."""
+        app = FastAPI()
+
+        @app.get("/broken")
+        async def broken():
+            raise RuntimeError("boom")
+
+        app.add_middleware(RequestLoggingMiddleware)
+        label = ("GET", "/broken", "500")
+        count_before = http_request_duration.count(label)
+
+        response = TestClient(app, raise_server_exceptions=False).get("/broken")
+
+        assert response.status_code == 500
+        assert http_request_duration.count(label) == count_before + 1
+
+    def test_nothing_is_recorded_when_disabled(self, monkeypatch):
+        """Test METRICS_ENABLED=false also turns off request and event bus timings."""
+        monkeypatch.setattr(middleware, "METRICS_ENABLED", False)
+        monkeypatch.setattr(events, "METRICS_ENABLED", False)
+        app = FastAPI()
+
+        @app.get("/quiet")
+        async def quiet():
+            await EventBus().publish(UserCreatedEvent(user_id=1, username="u", email="u@example.com"))
+            return {}
+
+        app.add_middleware(RequestLoggingMiddleware)
+        published_before = events.event_publish_duration.count(("user.created",))
+
+        TestClient(app).get("/quiet")
+
+        assert http_request_duration.count(("GET", "/quiet", "200")) == 0
+        assert events.event_publish_duration.count(("user.created",)) == published_before
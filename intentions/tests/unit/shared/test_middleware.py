@@ -0,0 +1,189 @@
+"""
+Unit tests for request logging: sampling, path exclusion, per-route levels,
+the slow-request threshold and ASGI timing/size capture.
+"""
+
+import logging
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.shared.logging_config import logger
+from app.shared.middleware import RequestLoggingMiddleware, RequestLogPolicy, _parse_route_levels, _parse_route_seconds
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def records():
+    """Capture app log records synchronously (the pipeline is bypassed while the test runs)."""
+    handler = _ListHandler()
+    previous_handlers, previous_level = logger.handlers, logger.level
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    yield handler.records
+    logger.handlers, logger.level = previous_handlers, previous_level
+
+
+def _client(policy: RequestLogPolicy) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="Not found")
+
+    @app.get("/broken")
+    async def broken():
+        raise RuntimeError("boom")
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            for chunk in (b"first,", b"second"):
+                yield chunk
+
+        return StreamingResponse(body(), media_type="text/plain")
+
+    app.add_middleware(RequestLoggingMiddleware, policy=policy)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def _messages(records):
+    return [(record.getMessage(), record.levelno) for record in records]
+
+
+@pytest.mark.unit
+class TestRequestLogPolicy:
+    """Test the logging decisions."""
+
+    def test_route_levels_match_longest_prefix(self):
+        """Test the most specific prefix wins and other paths default to INFO."""
+        policy = RequestLogPolicy(route_levels={"/intents": logging.WARNING, "/intents/changes": logging.DEBUG})
+
+        assert policy.route_level("/intents/changes/stream") == logging.DEBUG
+        assert policy.route_level("/intents/7") == logging.WARNING
+        assert policy.route_level("/users") == logging.INFO
+
+    def test_sample_rate(self):
+        """Test routine requests are kept when the random draw is below the rate."""
+        assert RequestLogPolicy(sample_rate=0.01, random_func=lambda: 0.005).sample("/intents")
+        assert not RequestLogPolicy(sample_rate=0.01, random_func=lambda: 0.5).sample("/intents")
+
+    def test_problems_are_always_logged(self):
+        """Test errors and slow requests get a level even when not sampled."""
+        policy = RequestLogPolicy(sample_rate=0.0, slow_seconds=1.0)
+
+        assert policy.completion_level("/health", 200, 0.01, sampled=False) is None
+        assert policy.completion_level("/health", 404, 0.01, sampled=False) == logging.INFO
+        assert policy.completion_level("/health", 503, 0.01, sampled=False) == logging.WARNING
+        assert policy.completion_level("/health", 200, 2.5, sampled=False) == logging.WARNING
+
+    def test_slow_threshold_per_route(self):
+        """Test per-prefix slow thresholds, with long-polls on the change feed never flagged by default."""
+        policy = RequestLogPolicy(sample_rate=0.0, slow_seconds=1.0, slow_route_seconds={"/admin": 5.0})
+        default = RequestLogPolicy(sample_rate=0.0, slow_seconds=1.0)
+
+        assert policy.completion_level("/admin/profile", 200, 2.5, sampled=False) is None
+        assert policy.completion_level("/admin/profile", 200, 6.0, sampled=False) == logging.WARNING
+        assert default.completion_level("/intents/changes", 200, 30.0, sampled=False) is None
+        assert default.completion_level("/intents/1", 200, 2.5, sampled=False) == logging.WARNING
+
+    def test_parse_route_seconds(self):
+        """Test the environment format, "off" and rejection of invalid values."""
+        assert _parse_route_seconds("/intents/changes=off, /admin=5,") == {"/intents/changes": float("inf"), "/admin": 5.0}
+        with pytest.raises(ValueError):
+            _parse_route_seconds("/admin=slow")
+
+    def test_parse_route_levels(self):
+        """Test the environment format and rejection of unknown levels."""
+        assert _parse_route_levels("/health=debug, /mcp=WARNING,") == {"/health": logging.DEBUG, "/mcp": logging.WARNING}
+        with pytest.raises(ValueError):
+            _parse_route_levels("/health=LOUD")
+
+
+@pytest.mark.unit
+class TestLogRequestsMiddleware:
+    """Test the middleware applies the policy."""
+
+    def test_default_policy_logs_both_lines(self, records):
+        """Test every request is logged at INFO by default."""
+        _client(RequestLogPolicy(route_levels={})).get("/health")
+
+        assert _messages(records) == [("Incoming request", logging.INFO), ("Request completed", logging.INFO)]
+
+    def test_excluded_path_logs_nothing_when_healthy(self, records):
+        """Test excluded paths are silent for successful requests."""
+        _client(RequestLogPolicy(excluded_paths=["/health"], route_levels={})).get("/health")
+
+        assert records == []
+
+    def test_unsampled_error_is_logged_with_request_details(self, records):
+        """Test a skipped incoming line does not hide a client error."""
+        _client(RequestLogPolicy(sample_rate=0.0, route_levels={})).get("/missing")
+
+        assert _messages(records) == [("Request completed", logging.INFO)]
+        assert records[0].status_code == 404
+        assert records[0].user_agent == "testclient"
+
+    def test_route_level_below_logger_level_is_skipped(self, records):
+        """Test a DEBUG route is not logged when the logger is at INFO."""
+        logger.setLevel(logging.INFO)
+
+        _client(RequestLogPolicy(route_levels={"/health": logging.DEBUG})).get("/health")
+
+        assert records == []
+
+    def test_slow_request_is_logged_as_warning(self, records):
+        """Test the slow threshold overrides exclusion."""
+        policy = RequestLogPolicy(excluded_paths=["/health"], route_levels={}, slow_seconds=0.0)
+
+        _client(policy).get("/health")
+
+        assert _messages(records) == [("Request completed", logging.WARNING)]
+        assert records[0].slow is True
+
+    def test_route_without_slow_threshold_is_not_flagged(self, records):
+        """Test a path whose threshold is off logs as a routine request however long it takes."""
+        policy = RequestLogPolicy(route_levels={}, slow_seconds=0.0, slow_route_seconds={"/health": float("inf")})
+
+        _client(policy).get("/health")
+
+        assert _messages(records) == [("Incoming request", logging.INFO), ("Request completed", logging.INFO)]
+        assert not hasattr(records[1], "slow")
+
+    def test_failure_is_always_logged(self, records):
+        """Test unhandled exceptions are logged even for excluded paths."""
+        _client(RequestLogPolicy(excluded_paths=["/broken"], route_levels={})).get("/broken")
+
+        assert _messages(records) == [("Request failed", logging.ERROR)]
+        assert records[0].exc_info is not None
+
+    def test_streamed_response_is_timed_and_measured(self, records):
+        """Test streaming passes through and the completion line has size and both timings."""
+        response = _client(RequestLogPolicy(route_levels={})).get("/stream")
+
+        assert response.text == "first,second"
+        completed = records[-1]
+        assert completed.getMessage() == "Request completed"
+        assert completed.response_size == len("first,second")
+        assert 0 <= completed.ttfb_seconds <= completed.duration
+
+    def test_non_http_scopes_pass_through(self, records):
+        """Test lifespan and other scopes are not logged."""
+        with _client(RequestLogPolicy(route_levels={})):
+            pass
+
+        assert records == []
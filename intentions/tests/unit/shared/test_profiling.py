@@ -0,0 +1,172 @@
+"""
+Unit tests for the sampling profiler and per-request cProfile capture.
+"""
+
+import marshal
+import os
+import threading
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import main
+from app.shared import profiling
+from app.shared.profiling import PROFILE_ID_HEADER, ProfilingMiddleware, StackSampler, _sampler_lock, router
+
+
+@pytest.fixture
+def test_app(monkeypatch):
+    """An app wired like main with profiling enabled (it is off by default), X-Profile allowed without auth."""
+    monkeypatch.setattr(profiling, "PROFILING_ALLOW_UNAUTHENTICATED", True)
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(router)
+    return app
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(100))
+
+
+@pytest.mark.unit
+class TestStackSampler:
+    """Test stack sampling of a thread."""
+
+    def test_samples_are_collapsed_stacks_of_the_target_thread(self):
+        """Test the busy function shows up at the leaf end of the sampled stacks."""
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_loop, args=(stop,))
+        worker.start()
+        sampler = StackSampler(interval=0.001, thread_id=worker.ident)
+        sampler.start()
+        try:
+            while sampler.samples < 20:
+                stop.wait(0.01)
+        finally:
+            sampler.stop()
+            stop.set()
+            worker.join()
+
+        assert not sampler.running
+        lines = sampler.collapsed().splitlines()
+        assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == sampler.samples
+        assert all(line.startswith("threading:Thread._bootstrap;") for line in lines)
+        assert any(f"{__name__}:_busy_loop" in line for line in lines)
+
+    def test_cannot_start_twice(self):
+        """Test a running sampler refuses a second start."""
+        sampler = StackSampler(interval=0.01)
+        sampler.start()
+        try:
+            with pytest.raises(RuntimeError):
+                sampler.start()
+        finally:
+            sampler.stop()
+
+
+@pytest.mark.unit
+class TestSampleProfileEndpoint:
+    """Test POST /admin/profile."""
+
+    def test_returns_collapsed_stacks_as_attachment(self, test_client):
+        """Test a short capture returns the event loop's stacks as a download."""
+        response = test_client.post("/admin/profile", params={"seconds": 0.1, "interval_ms": 1})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.headers["content-disposition"].startswith('attachment; filename="profile-')
+        first_stack, count = response.text.splitlines()[0].rsplit(" ", 1)
+        assert int(count) > 0 and ";" in first_stack
+
+    async def test_concurrent_capture_is_rejected(self, test_app):
+        """Test a second capture while one is running gets 409."""
+        transport = httpx.ASGITransport(app=test_app)
+        async with _sampler_lock:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post("/admin/profile", params={"seconds": 0.1})
+
+        assert response.status_code == 409
+
+    def test_duration_is_bounded(self, test_client):
+        """Test captures longer than the maximum are rejected."""
+        assert test_client.post("/admin/profile", params={"seconds": 3600}).status_code == 422
+
+
+@pytest.mark.unit
+class TestRequestProfiling:
+    """Test the X-Profile header and profile downloads."""
+
+    def test_profiled_request_report_and_raw_stats(self, test_client):
+        """Test the response names the profile, which can be read as a report or as pstats data."""
+        response = test_client.get("/health", headers={"X-Profile": "1"})
+        profile_id = response.headers[PROFILE_ID_HEADER]
+
+        report = test_client.get(f"/admin/profile/requests/{profile_id}", params={"limit": 5})
+        assert report.status_code == 200
+        assert "function calls" in report.text
+
+        raw = test_client.get(f"/admin/profile/requests/{profile_id}", params={"raw": True})
+        stats = marshal.loads(raw.content)
+        assert any(function == "health_check" for (_, _, function) in stats)
+
+    def test_unprofiled_request_and_unknown_profile(self, test_client):
+        """Test requests without the header are untouched and unknown ids are 404."""
+        response = test_client.get("/health")
+
+        assert PROFILE_ID_HEADER not in response.headers
+        assert test_client.get("/admin/profile/requests/missing").status_code == 404
+
+    def test_header_requires_a_valid_api_key(self, test_client):
+        """Test the header is ignored without a valid key when API key auth is enabled."""
+        with patch.dict(os.environ, {"ENABLE_API_KEY_AUTH": "true", "API_KEY": "secret"}, clear=False):
+            anonymous = test_client.get("/health", headers={"X-Profile": "1"})
+            authorized = test_client.get("/health", headers={"X-Profile": "1", "Authorization": "Bearer secret"})
+
+        assert PROFILE_ID_HEADER not in anonymous.headers
+        assert PROFILE_ID_HEADER in authorized.headers
+
+    def test_header_is_ignored_without_auth_unless_allowed(self, test_client, monkeypatch):
+        """Test X-Profile needs the explicit opt-in while API key auth is disabled."""
+        monkeypatch.setattr(profiling, "PROFILING_ALLOW_UNAUTHENTICATED", False)
+
+        with patch.dict(os.environ, {"ENABLE_API_KEY_AUTH": "false"}, clear=False):
+            response = test_client.get("/health", headers={"X-Profile": "1"})
+
+        assert PROFILE_ID_HEADER not in response.headers
+
+    def test_routes_are_forbidden_without_auth_unless_allowed(self, test_client, monkeypatch):
+        """Test the profile routes answer 403 while API key auth is disabled and the opt-in is not set."""
+        monkeypatch.setattr(profiling, "PROFILING_ALLOW_UNAUTHENTICATED", False)
+
+        with patch.dict(os.environ, {"ENABLE_API_KEY_AUTH": "false"}, clear=False):
+            sample = test_client.post("/admin/profile", params={"seconds": 0.01})
+            report = test_client.get("/admin/profile/requests/missing")
+
+        assert sample.status_code == 403
+        assert report.status_code == 403
+
+    def test_routes_accept_a_valid_api_key(self, test_client, monkeypatch):
+        """Test the profile routes need no opt-in when API key auth is enabled and the key is valid."""
+        monkeypatch.setattr(profiling, "PROFILING_ALLOW_UNAUTHENTICATED", False)
+
+        with patch.dict(os.environ, {"ENABLE_API_KEY_AUTH": "true", "API_KEY": "secret"}, clear=False):
+            anonymous = test_client.get("/admin/profile/requests/missing")
+            authorized = test_client.get("/admin/profile/requests/missing", headers={"Authorization": "Bearer secret"})
+
+        assert anonymous.status_code == 403
+        assert authorized.status_code == 404
+
+    def test_profiling_is_off_by_default(self):
+        """Test the application only has profiling routes when PROFILING_ENABLED opts in."""
+        with patch.object(main, "PROFILING_ENABLED", False):
+            assert "/admin/profile" not in {getattr(route, "path", "") for route in main.create_application().routes}
+        with patch.object(main, "PROFILING_ENABLED", True):
+            assert "/admin/profile" in {getattr(route, "path", "") for route in main.create_application().routes}
@@ -0,0 +1,131 @@
+"""
+Unit tests for SQL statement tracking, query budgets and N+1 detection.
+"""
+
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.intents import service
+from app.intents.models import Intent
+from app.intents.schemas import IntentCreateRequest
+from app.shared import query_tracking
+from app.shared.logging_config import logger
+from app.shared.query_tracking import QueryBudgetExceeded, QueryTrackingMiddleware, query_tracking_enabled, track_queries
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def records():
+    handler = _ListHandler()
+    previous_handlers, previous_level = logger.handlers, logger.level
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    yield handler.records
+    logger.handlers, logger.level = previous_handlers, previous_level
+
+
+async def _create_intent(repository) -> Intent:
+    return await service.create_intent(IntentCreateRequest(name="Tracked", description="d"), repository)
+
+
+@pytest.mark.unit
+class TestTrackQueries:
+    """Test statement attribution."""
+
+    async def test_statements_are_attributed_to_method_and_caller(self, mock_intent_repository):
+        """Test each statement carries the repository method and the service function calling it."""
+        intent = await _create_intent(mock_intent_repository)
+
+        with track_queries() as tracker:
+            await service.get_intent(intent.id, mock_intent_repository)
+
+        assert tracker.count > 0
+        assert tracker.by_repository_method() == {"IntentRepository.find_by_id": tracker.count}
+        assert tracker.by_caller() == {"intents.service.get_intent": tracker.count}
+        assert tracker.total_duration > 0
+
+    async def test_statements_outside_the_block_are_not_recorded(self, mock_intent_repository):
+        """Test the tracker only sees its own block."""
+        with track_queries() as tracker:
+            pass
+        await mock_intent_repository.find_by_id(1)
+
+        assert tracker.count == 0
+
+    def test_listeners_are_removed_when_the_last_block_exits(self):
+        """Test nested blocks keep the engine listeners until the outermost one exits."""
+        before = query_tracking_enabled()
+
+        with track_queries():
+            with track_queries():
+                pass
+            assert event.contains(Engine, "after_cursor_execute", query_tracking._after_cursor_execute)
+
+        assert query_tracking_enabled() == before
+        assert event.contains(Engine, "after_cursor_execute", query_tracking._after_cursor_execute) == before
+
+    async def test_repeated_statement_is_reported(self, mock_intent_repository):
+        """Test the same statement run per item shows up as a likely N+1."""
+        intents = [await _create_intent(mock_intent_repository) for _ in range(3)]
+
+        with track_queries() as tracker:
+            for intent in intents:
+                await mock_intent_repository.get_version(intent.id)
+
+        [(statement, count)] = tracker.repeated_statements(threshold=3)
+        assert count == 3
+        assert "revision" in statement
+
+    async def test_assert_max_queries_fails_with_breakdown(self, mock_intent_repository, assert_max_queries):
+        """Test exceeding the budget raises with the per-method counts."""
+        intent = await _create_intent(mock_intent_repository)
+
+        with pytest.raises(QueryBudgetExceeded, match="IntentRepository.find_by_id"):
+            with assert_max_queries(1):
+                await mock_intent_repository.find_by_id(intent.id)
+
+        with assert_max_queries(1):
+            await mock_intent_repository.get_version(intent.id)
+
+
+@pytest.mark.unit
+class TestQueryTrackingMiddleware:
+    """Test per-request reporting."""
+
+    def _app(self, repository) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/versions")
+        async def versions():
+            found = 0
+            for intent_id in range(1, 4):
+                found += await repository.get_version(intent_id) is not None
+            return {"found": found}
+
+        app.add_middleware(QueryTrackingMiddleware, budget=2, repeat_threshold=3)
+        return app
+
+    async def test_over_budget_and_repeated_queries_are_logged(self, mock_intent_repository, records):
+        """Test a request over budget with an N+1 pattern produces both warnings."""
+        transport = httpx.ASGITransport(app=self._app(mock_intent_repository))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/versions")
+
+        assert response.status_code == 200
+        warnings = {record.getMessage(): record for record in records if record.levelno == logging.WARNING}
+        assert warnings["Query budget exceeded"].query_count == 3
+        assert warnings["Query budget exceeded"].queries_by_caller == {"tests.unit.shared.test_query_tracking.versions": 3}
+        assert warnings["Repeated query (possible N+1)"].repeat_count == 3
@@ -0,0 +1,194 @@
+"""
+Unit tests for spans, sampling, traceparent propagation and instrumentation.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.intents import service
+from app.intents.schemas import IntentCreateRequest
+from app.shared.events import DomainEvent, EventBus
+from app.shared.tracing import (
+    NOOP_SPAN,
+    InMemorySpanExporter,
+    TraceContextFilter,
+    TracingMiddleware,
+    current_span,
+    enable_sql_spans,
+    inject,
+    parse_traceparent,
+    tracer,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def spans():
+    """Enable the global tracer with a fresh in-memory exporter."""
+    exporter = InMemorySpanExporter()
+    previous = tracer.enabled, tracer.sample_rate, tracer.exporter
+    tracer.enabled, tracer.sample_rate, tracer.exporter = True, 1.0, exporter
+    yield exporter
+    tracer.enabled, tracer.sample_rate, tracer.exporter = previous
+
+
+@dataclass
+class _PingEvent(DomainEvent):
+    value: int
+
+
+@pytest.mark.unit
+class TestTracer:
+    """Test span creation and sampling."""
+
+    def test_disabled_tracer_returns_noop_span(self):
+        """Test nothing is recorded or made current while tracing is off."""
+        assert not tracer.enabled
+        with tracer.start_span("work") as span:
+            assert span is NOOP_SPAN
+            assert current_span() is None
+
+    def test_children_share_the_trace_and_point_at_their_parent(self, spans):
+        """Test nesting, export order and timestamps."""
+        with tracer.start_span("parent") as parent:
+            with tracer.start_span("child", attributes={"k": "v"}) as child:
+                assert current_span() is child
+            assert current_span() is parent
+
+        assert [span.name for span in spans.spans()] == ["child", "parent"]
+        assert child.trace_id == parent.trace_id and len(parent.trace_id) == 32
+        assert child.parent_id == parent.span_id and parent.parent_id is None
+        assert child.attributes == {"k": "v"}
+        assert parent.start_ns <= child.start_ns <= child.end_ns <= parent.end_ns
+        assert spans.spans(trace_id=parent.trace_id) == spans.spans()
+
+    def test_unsampled_trace_records_nothing(self, spans):
+        """Test the root sampling decision applies to the whole trace."""
+        tracer.sample_rate = 0.0
+        with tracer.start_span("root") as root:
+            with tracer.start_span("child") as child:
+                assert not root.recording and not child.recording
+
+        assert spans.spans() == []
+
+    def test_exception_marks_span_as_error(self, spans):
+        """Test an exception leaving the span is recorded on it."""
+        with pytest.raises(ValueError):
+            with tracer.start_span("failing"):
+                raise ValueError("boom")
+
+        [span] = spans.spans()
+        assert span.status == "error"
+        assert span.attributes["exception.type"] == "ValueError"
+
+    async def test_context_propagates_into_tasks(self, spans):
+        """Test tasks created inside a span continue its trace."""
+
+        async def background():
+            with tracer.start_span("background"):
+                await asyncio.sleep(0)
+
+        with tracer.start_span("request") as request:
+            await asyncio.create_task(background())
+
+        background_span = spans.spans()[0]
+        assert background_span.name == "background"
+        assert background_span.parent_id == request.span_id
+
+    def test_log_records_carry_trace_ids(self, spans):
+        """Test the logging filter adds the current span's ids."""
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+        with tracer.start_span("logged") as span:
+            TraceContextFilter().filter(record)
+
+        assert (record.trace_id, record.span_id) == (span.trace_id, span.span_id)
+
+
+@pytest.mark.unit
+class TestTraceparent:
+    """Test W3C traceparent parsing and injection."""
+
+    def test_parse_valid_and_invalid_headers(self):
+        """Test ids and the sampled flag are read; malformed or zero ids are rejected."""
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+        assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+        assert parse_traceparent("garbage") is None
+        assert parse_traceparent(None) is None
+
+    def test_inject_current_span(self, spans):
+        """Test outgoing headers continue the current span."""
+        assert inject({}) == {}
+        with tracer.start_span("client") as span:
+            assert inject({}) == {"traceparent": f"00-{span.trace_id}-{span.span_id}-01"}
+
+
+@pytest.mark.unit
+class TestInstrumentation:
+    """Test spans of the instrumented layers."""
+
+    async def test_service_repository_and_sql_spans_nest(self, spans, mock_intent_repository):
+        """Test a service call produces service > repository > SQL spans in one trace."""
+        intent = await service.create_intent(IntentCreateRequest(name="Traced", description="d"), mock_intent_repository)
+        spans.clear()
+
+        enable_sql_spans()
+        await service.get_intent(intent.id, mock_intent_repository)
+
+        by_name = {}
+        for span in spans.spans():
+            by_name.setdefault(span.name, span)
+        service_span = by_name["intents.service.get_intent"]
+        repository_span = by_name["repository IntentRepository.find_by_id"]
+        sql_span = by_name["db.query"]
+        assert repository_span.parent_id == service_span.span_id
+        assert sql_span.parent_id == repository_span.span_id
+        assert sql_span.kind == "client" and sql_span.attributes["db.statement"].startswith("SELECT")
+        assert {span.trace_id for span in spans.spans()} == {service_span.trace_id}
+
+    async def test_event_handlers_get_spans(self, spans):
+        """Test each handler runs in its own span, failures marked as errors."""
+        bus = EventBus()
+
+        async def ok_handler(event):
+            pass
+
+        def failing_handler(event):
+            raise RuntimeError("handler failed")
+
+        bus.subscribe("ping", ok_handler)
+        bus.subscribe("ping", failing_handler)
+        with tracer.start_span("publish") as publish:
+            await bus.publish(_PingEvent(timestamp=datetime.now(), event_type="ping", value=1))
+
+        handler_spans = {span.attributes.get("event.handler"): span for span in spans.spans() if span is not publish}
+        assert handler_spans["ok_handler"].status == "unset"
+        assert handler_spans["failing_handler"].status == "error"
+        assert all(span.parent_id == publish.span_id for span in handler_spans.values())
+
+    async def test_middleware_continues_incoming_trace(self, spans):
+        """Test the server span joins the caller's trace and is named after the route template."""
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int):
+            return {"trace_id": current_span().trace_id}
+
+        app.add_middleware(TracingMiddleware)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/items/7", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+
+        assert response.json() == {"trace_id": TRACE_ID}
+        [server_span] = [span for span in spans.spans() if span.kind == "server"]
+        assert server_span.name == "GET /items/{item_id}"
+        assert server_span.parent_id == PARENT_ID
+        assert server_span.attributes["http.response.status_code"] == 200